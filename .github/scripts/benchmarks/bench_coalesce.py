@@ -0,0 +1,112 @@
+"""
+Edit coalescer: reduction and throughput on bursty synthetic logs.
+
+Edits come in sessions: a user types into a cell a few times within
+seconds, sometimes ending where they started (typed then deleted).
+
+batch        coalesce N edits from scratch (edits/s, records out)
+incremental  one cron-style poll after appending a handful of lines:
+             load state, read the new bytes, expire quiet runs, save state
+
+Run from the repo root:  python .github/scripts/benchmarks/bench_coalesce.py
+"""
+import argparse
+import datetime as dt
+import json
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from bench_sheetlog import SHEETS, USERS, col_name  # noqa: E402
+from sheet_coalesce import EditCoalescer  # noqa: E402
+
+START = dt.datetime(2025, 10, 1, tzinfo=dt.timezone.utc)
+
+
+def sessions(rng: random.Random, n: int, t: dt.datetime):
+    """Yield ``n`` edit records in bursts, starting at ``t``."""
+    made = 0
+    while made < n:
+        t += dt.timedelta(seconds=rng.expovariate(1 / 120))
+        row, col = rng.randint(1, 300), rng.randint(1, 20)
+        sheet, user = rng.choice(SHEETS), rng.choice(USERS)
+        start = rng.choice([None, "12.5", "TBD"])
+        value = start
+        burst = rng.choice([1, 1, 2, 3, 5, 8])
+        for i in range(burst):
+            t += dt.timedelta(seconds=rng.uniform(1, 20))
+            new = start if (i == burst - 1 and rng.random() < 0.25) else f"{value or ''}{rng.choice('0123456789abc')}"
+            yield {"ts": t.isoformat(timespec="milliseconds").replace("+00:00", "Z"), "sheet": sheet,
+                   "a1": f"{col_name(col)}{row}", "row": row, "col": col, "old": value, "new": new, "user": user}
+            value = new
+            made += 1
+
+
+def write(path: Path, records, first: bool):
+    with open(path, "a") as f:
+        for r in records:
+            f.write(("" if first else "\n") + json.dumps(r))
+            first = False
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--edits", type=int, default=200_000)
+    parser.add_argument("--quiet", type=float, default=120.0)
+    parser.add_argument("--polls", type=int, default=50)
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    with tempfile.TemporaryDirectory() as tmp:
+        logs = Path(tmp) / "logs"
+        logs.mkdir()
+        log = logs / "Test_BOMs_changes.ndjson"
+        records = list(sessions(rng, args.edits, START))
+        write(log, records, first=True)
+
+        t0 = time.perf_counter()
+        c = EditCoalescer(args.quiet, logs)
+        changes = c.poll(now=0) + c.flush()
+        batch_s = time.perf_counter() - t0
+
+        state = Path(tmp) / "state.json"
+        c = EditCoalescer(args.quiet, logs, state)
+        c.poll()
+        c.save()
+        last = dt.datetime.fromisoformat(records[-1]["ts"].replace("Z", "+00:00"))
+        stream = sessions(rng, 10 ** 9, last)
+        samples = []
+        for _ in range(args.polls):
+            write(log, [next(stream) for _ in range(10)], first=False)
+            t0 = time.perf_counter()
+            c = EditCoalescer(args.quiet, logs, state)
+            c.poll()
+            c.save()
+            samples.append((time.perf_counter() - t0) * 1e3)
+
+    results = {
+        "edits": len(records),
+        "changes": len(changes),
+        "reduction": 1 - len(changes) / len(records),
+        "batch_s": batch_s,
+        "batch_edits_per_s": len(records) / batch_s,
+        "incremental_10_lines_p50_ms": statistics.median(samples),
+        "incremental_10_lines_max_ms": max(samples),
+    }
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f"batch: {results['edits']:,} edits -> {results['changes']:,} changes "
+          f"({results['reduction']:.0%} fewer) in {batch_s:.2f} s ({results['batch_edits_per_s']:,.0f} edits/s)")
+    print(f"incremental poll, 10 new lines: p50 {results['incremental_10_lines_p50_ms']:.2f} ms, "
+          f"max {results['incremental_10_lines_max_ms']:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""
+Discord delivery against a local webhook stub: throughput, 429s, splits.
+
+A backlog of digests (some with inline code and fenced blocks) is posted
+three ways:
+
+legacy     the old post_to_discord: 1900-character slices, one
+           ``requests.post`` each, no pacing; stops at the first error
+delivery   DiscordDelivery in content mode: boundary splits, packing,
+           token bucket, retries
+embeds     the same, packed into embeds (fewer, larger messages)
+
+``outage`` then checks the outbox: a run during a webhook outage keeps
+its messages, and the next run delivers them.
+
+Run from the repo root:  python .github/scripts/benchmarks/bench_delivery.py
+"""
+import argparse
+import json
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import requests
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from discord_delivery import DiscordDelivery  # noqa: E402
+from stub_servers import StubWebhook  # noqa: E402
+
+WORDS = ("cutter head torque thrust cylinder sensor Modbus register journal telemetry "
+         "BOM vendor quote gearbox `SEW RF127R77` `TBM_DATA_SOURCE` interlock").split()
+
+
+def digest(rng: random.Random) -> str:
+    paragraphs = []
+    for _ in range(rng.randint(2, 8)):
+        sentences = [" ".join(rng.choice(WORDS) for _ in range(rng.randint(6, 25))).capitalize() + "."
+                     for _ in range(rng.randint(2, 8))]
+        paragraphs.append(" ".join(sentences))
+    if rng.random() < 0.3:
+        paragraphs.append("```\n" + "\n".join(f"torque[{i}] = {rng.random():.3f}" for i in range(20)) + "\n```")
+    return "**owner/repo** — branch **main**\nNew commits: 3\n\n" + "\n\n".join(paragraphs)
+
+
+def legacy_post(hook: str, content: str) -> int:
+    """post_to_discord before the delivery engine; returns messages sent."""
+    MAX = 1900
+    chunks = [content[i:i + MAX] for i in range(0, len(content), MAX)] or [content]
+    for i, part in enumerate(chunks, 1):
+        if len(chunks) > 1:
+            part = f"{part}\n\n(part {i}/{len(chunks)})"
+        r = requests.post(hook, json={"content": part}, timeout=30)
+        r.raise_for_status()
+    return len(chunks)
+
+
+def broken_words(messages, texts) -> int:
+    """Message edges that cut through a word of the source text."""
+    vocab = {w for t in texts for w in t.split()}
+    edges = 0
+    for m in messages:
+        bodies = [m["content"]] if "content" in m else [e["description"] for e in m["embeds"]]
+        for b in bodies:
+            b = b.rsplit("\n\n(part ", 1)[0]
+            words = b.split()
+            edges += sum(1 for w in (words[:1] + words[-1:]) if w not in vocab)
+    return edges
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--digests", type=int, default=30)
+    parser.add_argument("--limit", type=int, default=5, help="stub webhook requests per window")
+    parser.add_argument("--window", type=float, default=2.0)
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    texts = [digest(rng) for _ in range(args.digests)]
+    chars = sum(map(len, texts))
+    results = {}
+
+    for case in ("legacy", "delivery", "embeds"):
+        with StubWebhook(limit=args.limit, window=args.window) as hook, tempfile.TemporaryDirectory() as state:
+            t0 = time.perf_counter()
+            error = ""
+            if case == "legacy":
+                try:
+                    for text in texts:
+                        legacy_post(hook.hook, text)
+                except requests.HTTPError as e:
+                    error = str(e.response.status_code)
+            else:
+                d = DiscordDelivery(hook.hook, state_dir=state, embeds=case == "embeds")
+                for text in texts:
+                    d.enqueue(text)
+                d.flush()
+                d.close()
+            elapsed = time.perf_counter() - t0
+            delivered = sum(len(m.get("content", "")) + sum(len(e["description"]) for e in m.get("embeds", []))
+                            for m in hook.messages)
+            results[case] = {"messages": len(hook.messages), "requests": hook.total, "429s": hook.counts[429],
+                             "seconds": elapsed, "chars_delivered": delivered, "chars_total": chars,
+                             "broken_words": broken_words(hook.messages, texts), "error": error}
+
+    with StubWebhook(limit=args.limit, window=args.window) as hook, tempfile.TemporaryDirectory() as state:
+        hook.fail_next = 10 ** 6
+        d = DiscordDelivery(hook.hook, state_dir=state, max_attempts=2, backoff=0.01)
+        for text in texts[:3]:
+            d.enqueue(text)
+        left = d.flush()
+        d.close()
+        hook.fail_next = 0
+        d = DiscordDelivery(hook.hook, state_dir=state)
+        results["outage"] = {"pending_after_failed_run": left, "pending_after_next_run": d.flush(),
+                             "messages": len(hook.messages)}
+        d.close()
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f"{args.digests} digests, {chars:,} chars; webhook allows {args.limit} per {args.window:g} s")
+    print(f"{'case':<9} {'msgs':>5} {'reqs':>5} {'429s':>5} {'s':>6} {'delivered':>10} {'broken':>7}  error")
+    for case in ("legacy", "delivery", "embeds"):
+        r = results[case]
+        print(f"{case:<9} {r['messages']:>5} {r['requests']:>5} {r['429s']:>5} {r['seconds']:>6.2f} "
+              f"{r['chars_delivered'] / chars:>10.0%} {r['broken_words']:>7}  {r['error']}")
+    o = results["outage"]
+    print(f"outage: {o['pending_after_failed_run']} pending after the failed run, "
+          f"{o['pending_after_next_run']} after the next ({o['messages']} delivered)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+"""
+Commit fetching against a local GitHub stub: wall time and request count.
+
+Window mode (every commit in the last 30 days):
+
+legacy      the old loop: fresh ``requests.get`` per page, one after another
+cold        CommitFetcher.fetch with an empty cache (probe, page 1, rest in parallel)
+unchanged   next run, nothing pushed: one conditional probe answered 304
+pushed      next run after a push: probe, then the listing again
+
+Cursor mode (only commits new since the last run), after seeding the cursor:
+
+cursor_idle    nothing pushed: one 304
+cursor_1       one commit on top of the cursor: the probe alone
+cursor_N       ``--burst`` commits: probe plus pages until the cursor
+
+Before timing, ``check_cursor`` seeds a cursor from a ten-minute window on a
+fresh stub and asserts that later runs report exactly the commits pushed
+since, including a late merge dated before the cursor, and none of the
+older history listed on the cursor's page; after a force-push that drops
+the cursor, only the window's commits.
+
+Every stub response is delayed by ``--latency`` to stand in for the round
+trip to api.github.com.
+
+Run from the repo root:  python .github/scripts/benchmarks/bench_fetch.py
+"""
+import argparse
+import datetime as dt
+import hashlib
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import requests
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from github_fetch import CommitFetcher  # noqa: E402
+from stub_servers import StubGitHub, iso  # noqa: E402
+
+REPO = "owner/repo"
+
+
+def legacy_fetch(api_url: str, branch: str, since_iso: str, until_iso: str,
+                 per_page: int = 100, max_pages: int = 5):
+    """poll_commits.fetch_commits before the fetcher, kept as the baseline."""
+    all_items = []
+    for page in range(1, max_pages + 1):
+        params = {"sha": branch, "since": since_iso, "until": until_iso, "per_page": per_page, "page": page}
+        r = requests.get(f"{api_url}/repos/{REPO}/commits", params=params, timeout=30)
+        r.raise_for_status()
+        items = r.json()
+        if not items:
+            break
+        all_items.extend(items)
+        if len(items) < per_page:
+            break
+    return all_items
+
+
+def check_cursor(per_page: int = 30):
+    """A seeded cursor reports what was pushed after it, and nothing older."""
+    with StubGitHub(commits=100) as gh, tempfile.TemporaryDirectory() as state:
+        def run():
+            with CommitFetcher(REPO, "token", api_url=gh.url, state_dir=state) as f:
+                batch = f.new_commits("main", iso(gh.now - dt.timedelta(minutes=10)), per_page=per_page)
+                f.advance(batch)
+                return [c["sha"] for c in batch.items]
+
+        run()
+        pushed = [gh.push()["sha"] for _ in range(2)]
+        assert run() == pushed[::-1]
+        # A merge on top of the cursor whose branch commit is dated before it
+        branch = gh.push(when=iso(gh.now - dt.timedelta(minutes=15)))
+        merge = gh.push()
+        merge["parents"].append({"sha": branch["sha"]})
+        assert run() == [merge["sha"], branch["sha"]]
+        assert run() == []
+
+        # Force-push: the cursor and its parent are replaced by new commits.
+        with gh.lock:
+            del gh.commits[:2]
+        rewritten = [gh.push(), gh.push()]
+        for i, c in enumerate(rewritten):
+            c["sha"] = hashlib.sha1(f"rewrite {i}".encode()).hexdigest()
+        rewritten[1]["parents"] = [{"sha": rewritten[0]["sha"]}]
+        assert run() == [rewritten[1]["sha"], rewritten[0]["sha"]]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--commits", type=int, default=450, help="commits inside the window")
+    parser.add_argument("--latency", type=float, default=0.08, help="seconds per stub response")
+    parser.add_argument("--burst", type=int, default=40, help="commits pushed between runs for cursor_N")
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args()
+
+    check_cursor()
+    results = {}
+    with StubGitHub(commits=args.commits, latency=args.latency) as gh, tempfile.TemporaryDirectory() as state:
+        def window():
+            now = gh.now + dt.timedelta(seconds=1)
+            return iso(now - dt.timedelta(days=30)), iso(now)
+
+        def run(case, fn):
+            gh.reset_counts()
+            t0 = time.perf_counter()
+            n = len(fn())
+            results[case] = {"ms": (time.perf_counter() - t0) * 1e3, "requests": gh.total,
+                             "not_modified": gh.counts[304], "commits": n}
+
+        def fetcher_run():
+            with CommitFetcher(REPO, "token", api_url=gh.url, state_dir=state) as f:
+                return f.fetch("main", *window())[0]
+
+        def cursor_run():
+            with CommitFetcher(REPO, "token", api_url=gh.url, state_dir=state) as f:
+                batch = f.new_commits("main", window()[0])
+                f.advance(batch)
+                return batch.items
+
+        run("legacy", lambda: legacy_fetch(gh.url, "main", *window()))
+        run("cold", fetcher_run)
+        run("unchanged", fetcher_run)
+        gh.push()
+        run("pushed", fetcher_run)
+
+        cursor_run()
+        run("cursor_idle", cursor_run)
+        gh.push()
+        run("cursor_1", cursor_run)
+        for _ in range(args.burst):
+            gh.push()
+        run(f"cursor_{args.burst}", cursor_run)
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f"{args.commits} commits, {args.latency * 1e3:.0f} ms per response")
+    print(f"{'case':<12} {'ms':>8} {'requests':>9} {'304s':>5} {'commits':>8}")
+    for case, r in results.items():
+        print(f"{case:<12} {r['ms']:>8.1f} {r['requests']:>9} {r['not_modified']:>5} {r['commits']:>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+"""
+SheetSearch build, load and query latency on synthetic change logs.
+
+Values mix common words with part numbers drawn from a large catalogue
+("SEW RF127R77DRN100LMA", "6204-2RS", "M8x1.25"), so some queries hit a handful of
+records and some hit a large share of the log.
+
+build        index N records from scratch and save
+load         open the saved index (a new process's first step)
+incremental  refresh() + save() after appending a handful of lines
+             (writes the delta file only)
+queries      rare / common term, phrase, prefix, gear unit of a gearmotor
+             code, sheet + 1-day window, first appearance
+
+Run from the repo root:  python .github/scripts/benchmarks/bench_search.py
+"""
+import argparse
+import datetime as dt
+import json
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from bench_sheetlog import SHEETS, USERS, WORKBOOKS, col_name, timed  # noqa: E402
+from sheet_search import SheetSearch  # noqa: E402
+
+START = dt.datetime(2025, 10, 1, tzinfo=dt.timezone.utc)
+WORDS = ["motor", "gearbox", "bearing", "bolt", "ordered", "TBD", "quote", "shipping", "spare", "steel",
+         "pump", "sensor", "stepper", "coupling", "bracket", "from", "for", "the", "with", "MSC", "McMaster"]
+
+
+def catalogue(rng: random.Random, n: int) -> list:
+    out = []
+    for _ in range(n):
+        kind = rng.randrange(3)
+        if kind == 0:
+            out.append(f"SEW RF{rng.randint(17, 167)}R{rng.randint(37, 137)}"
+                       f"DRN{rng.choice([80, 90, 100, 112, 132])}{rng.choice(['S4', 'M4', 'LMA'])}")
+        elif kind == 1:
+            out.append(f"{rng.randint(6000, 6320)}-{rng.choice(['2RS', 'ZZ', 'C3'])}")
+        else:
+            out.append(f"M{rng.choice([3, 4, 5, 6, 8, 10, 12])}x{rng.choice(['0.5', '0.7', '1.0', '1.25', '1.5'])}"
+                       f"-{rng.randint(6, 120)}")
+    return out
+
+
+def value(rng: random.Random, parts: list):
+    if rng.random() < 0.15:
+        return None
+    text = [rng.choice(WORDS) for _ in range(rng.randint(1, 6))]
+    if rng.random() < 0.5:
+        text.insert(rng.randint(0, len(text)), rng.choice(parts))
+    return " ".join(text)
+
+
+def record(rng: random.Random, t: dt.datetime, parts: list) -> dict:
+    row, col = rng.randint(1, 400), rng.randint(1, 26)
+    return {"ts": t.isoformat(timespec="milliseconds").replace("+00:00", "Z"),
+            "sheet": rng.choice(SHEETS), "a1": f"{col_name(col)}{row}", "row": row, "col": col,
+            "old": value(rng, parts), "new": value(rng, parts), "user": rng.choice(USERS)}
+
+
+def write_logs(root: Path, n: int, rng: random.Random, parts: list, t: dt.datetime, fresh: bool) -> dt.datetime:
+    """Append ``n`` records (no trailing newline, like the Apps Script writer); returns the last time."""
+    for _ in range(n):
+        t += dt.timedelta(seconds=rng.expovariate(1 / 30))
+        path = root / f"{rng.choice(WORKBOOKS)}_changes.ndjson"
+        first = fresh and not path.exists()
+        with open(path, "a") as f:
+            f.write(("" if first else "\n") + json.dumps(record(rng, t, parts)))
+    return t
+
+
+def write_bulk(root: Path, n: int, rng: random.Random, parts: list) -> dt.datetime:
+    files = {w: open(root / f"{w}_changes.ndjson", "w") for w in WORKBOOKS}
+    first = dict.fromkeys(WORKBOOKS, True)
+    t = START
+    for _ in range(n):
+        t += dt.timedelta(seconds=rng.expovariate(1 / 30))
+        w = rng.choice(WORKBOOKS)
+        files[w].write(("" if first[w] else "\n") + json.dumps(record(rng, t, parts)))
+        first[w] = False
+    for f in files.values():
+        f.close()
+    return t
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--records", type=int, default=1_000_000)
+    parser.add_argument("--parts", type=int, default=50_000, help="distinct part numbers")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    parts = catalogue(rng, args.parts)
+    results = {"records": args.records}
+    with tempfile.TemporaryDirectory() as tmp:
+        logs, store = Path(tmp) / "logs", Path(tmp) / "index"
+        logs.mkdir()
+        last = write_bulk(logs, args.records, rng, parts)
+
+        t0 = time.perf_counter()
+        index = SheetSearch(logs, store)
+        index.refresh()
+        index.save()
+        results["build_s"] = time.perf_counter() - t0
+        results["index_mb"] = sum(p.stat().st_size for p in store.iterdir()) / 1e6
+
+        t0 = time.perf_counter()
+        index = SheetSearch(logs, store)
+        results["load_ms"] = (time.perf_counter() - t0) * 1e3
+
+        def append():
+            nonlocal last
+            last = write_logs(logs, 10, rng, parts, last, fresh=False)
+        samples = []
+        for _ in range(20):
+            append()
+            t0 = time.perf_counter()
+            index.refresh()
+            index.save()
+            samples.append((time.perf_counter() - t0) * 1e3)
+        results["incremental_10_lines_ms"] = sorted(samples)[len(samples) // 2]
+
+        sew = [p for p in parts if p.startswith("SEW")]
+        day = (last - dt.timedelta(days=3)).date()
+        queries = {
+            "rare_term": lambda: index.search(rng.choice(parts).split()[-1]),
+            "common_term": lambda: index.search("motor"),
+            "two_terms": lambda: index.search("stepper bearing"),
+            "phrase": lambda: index.search(f'"{rng.choice(sew)}"'),
+            "prefix": lambda: index.search("rf12*"),
+            "gear_unit": lambda: index.search(rng.choice(sew).split()[1].split("DRN")[0]),
+            "part_normalized": lambda: index.search("62042rs"),
+            "sheet_and_day": lambda: index.search("bolt", sheet=SHEETS[0], since=day, until=day + dt.timedelta(days=1)),
+            "first_appearance": lambda: index.first(rng.choice(parts)),
+            "field_new_user": lambda: index.search("gearbox", field="new", user=USERS[3]),
+        }
+        results["queries"] = {name: timed(fn, args.queries) for name, fn in queries.items()}
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f"{results['records']:,} records: build {results['build_s']:.1f} s, index {results['index_mb']:.0f} MB, "
+          f"load {results['load_ms']:.0f} ms, refresh+save of 10 lines {results['incremental_10_lines_ms']:.1f} ms")
+    print(f"{'query':<18}{'p50 ms':>10}{'p95 ms':>10}")
+    for name, r in results["queries"].items():
+        print(f"{name:<18}{r['p50_us'] / 1e3:>10.2f}{r['p95_us'] / 1e3:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+Segmented log storage: size, migration and read costs against plain NDJSON.
+
+Synthetic logs use the bench_search value mix (common words plus part
+numbers), spread over four workbooks like the real logs/.
+
+sizes        bytes stored: plain, zlib blocks, zlib blocks + shared dictionary
+             (and zstd + dictionary when zstandard is installed)
+migrate      first roll of the existing files
+full read    SheetLog.refresh() over every record, plain vs segmented
+range read   one day of edits: scanning the plain file vs read_range()
+record read  SheetLog.record() for random ids (seek + decompress one block)
+
+Run from the repo root:  python .github/scripts/benchmarks/bench_segments.py
+"""
+import argparse
+import datetime as dt
+import json
+import random
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from bench_search import catalogue, write_bulk  # noqa: E402
+from bench_sheetlog import timed  # noqa: E402
+from sheet_segments import BLOCK_SIZE, SUFFIX, Codec, WorkbookLog, _ts_ms, build_dictionary, write_segment, zstandard  # noqa: E402
+from sheetlog import SheetLog  # noqa: E402
+
+
+def stored(log: WorkbookLog) -> int:
+    return sum(s["bytes"] for s in log.segments) + sum(p.stat().st_size for p in log.dir.glob("dict-*.bin"))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--records", type=int, default=300_000)
+    parser.add_argument("--reads", type=int, default=2000)
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    results = {"records": args.records}
+    with tempfile.TemporaryDirectory() as tmp:
+        plain, rolled = Path(tmp) / "plain", Path(tmp) / "rolled"
+        plain.mkdir()
+        last = write_bulk(plain, args.records, rng, catalogue(rng, 50_000))
+        shutil.copytree(plain, rolled)
+        heads = sorted(rolled.glob("*" + SUFFIX))
+        results["plain_bytes"] = sum(p.stat().st_size for p in heads)
+
+        # Codec / dictionary comparison on one workbook's lines.
+        lines = heads[0].read_bytes().split(b"\n")
+        sample = Path(tmp) / "sample.seg"
+        variants = {"zlib": Codec("zlib"), "zlib+dict": Codec("zlib", build_dictionary(lines))}
+        if zstandard is not None:
+            variants["zstd+dict"] = Codec("zstd", build_dictionary(lines))
+        raw = len(b"\n".join(lines))
+        results["ratio"] = {name: write_segment(sample, lines, codec, None, BLOCK_SIZE)["bytes"] / raw
+                            for name, codec in variants.items()}
+
+        t0 = time.perf_counter()
+        for head in heads:
+            WorkbookLog(head).roll(force=True)
+        results["migrate_s"] = time.perf_counter() - t0
+        results["stored_bytes"] = sum(stored(WorkbookLog(h)) for h in heads)
+
+        for name, root in (("plain", plain), ("segmented", rolled)):
+            log = SheetLog(root)
+            t0 = time.perf_counter()
+            log.refresh()
+            results[f"full_read_{name}_s"] = time.perf_counter() - t0
+            ids = [rng.randrange(len(log)) for _ in range(args.reads)]
+            it = iter(ids * 2)
+            results[f"record_{name}"] = timed(lambda: log.record(next(it)), args.reads)
+
+        day = last - dt.timedelta(days=7)
+        lo = int(day.timestamp() * 1000)
+        hi = lo + 86_400_000
+
+        def scan_plain():
+            n = 0
+            for p in sorted(plain.glob("*" + SUFFIX)):
+                with open(p, "rb") as f:
+                    n += sum(1 for line in f if lo <= (_ts_ms(line) or 0) <= hi)
+            return n
+
+        def scan_segments():
+            return sum(1 for h in heads for _ in WorkbookLog(h).read_range(lo, hi))
+
+        assert scan_plain() == scan_segments()
+        results["range_day_plain"] = timed(scan_plain, 3)
+        results["range_day_segmented"] = timed(scan_segments, 20)
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f"{results['records']:,} records, {results['plain_bytes'] / 1e6:.1f} MB plain NDJSON")
+    print("block compression (one workbook): " + ", ".join(f"{k} {v:.1%}" for k, v in results["ratio"].items()))
+    print(f"migrate: {results['migrate_s']:.2f} s -> {results['stored_bytes'] / 1e6:.1f} MB stored "
+          f"({results['stored_bytes'] / results['plain_bytes']:.1%} incl. dictionaries)")
+    print(f"{'':<22}{'plain':>12}{'segmented':>12}")
+    print(f"{'full read (s)':<22}{results['full_read_plain_s']:>12.2f}{results['full_read_segmented_s']:>12.2f}")
+    print(f"{'one-day range (ms)':<22}{results['range_day_plain']['p50_us'] / 1e3:>12.1f}"
+          f"{results['range_day_segmented']['p50_us'] / 1e3:>12.1f}")
+    print(f"{'record p50 (us)':<22}{results['record_plain']['p50_us']:>12.1f}{results['record_segmented']['p50_us']:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""
+SheetLog ingest and query latency on synthetic change logs.
+
+ingest       full parse of N records spread over a few workbooks
+incremental  refresh() after appending a handful of lines to one file
+queries      current(cell), history(cell), edits_by(user, 1-day window)
+
+Run from the repo root:  python .github/scripts/benchmarks/bench_sheetlog.py
+"""
+import argparse
+import datetime as dt
+import json
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from sheetlog import SheetLog  # noqa: E402
+
+WORKBOOKS = ["UATXcavators_Part_Specs", "Test_BOMs", "Cutter_Head_CAD_Iterations", "Sensors_Actuators_Controls_List"]
+SHEETS = ["Cost Breakdown II", "Conditioning BOM", "Forces Test", "Cash Outreach"]
+USERS = [f"user{i}@example.com" for i in range(20)] + [None]
+START = dt.datetime(2025, 10, 1, tzinfo=dt.timezone.utc)
+
+
+def col_name(col: int) -> str:
+    name = ""
+    while col:
+        col, r = divmod(col - 1, 26)
+        name = chr(65 + r) + name
+    return name
+
+
+def record(rng: random.Random, t: dt.datetime) -> dict:
+    row, col = rng.randint(1, 400), rng.randint(1, 26)
+    return {
+        "ts": t.isoformat(timespec="milliseconds").replace("+00:00", "Z"),
+        "sheet": rng.choice(SHEETS), "a1": f"{col_name(col)}{row}", "row": row, "col": col,
+        "old": rng.choice([None, "SEW RF127R77", "12.5", "TBD"]),
+        "new": rng.choice([None, "SEW RF127R77DRN100LM4", "13.0", "ordered"]),
+        "user": rng.choice(USERS),
+    }
+
+
+def write_logs(root: Path, n: int, seed: int = 0) -> float:
+    """Write ``n`` records (no trailing newline, like the Apps Script writer); returns the last ts."""
+    rng = random.Random(seed)
+    files = {w: open(root / f"{w}_changes.ndjson", "w") for w in WORKBOOKS}
+    first = {w: True for w in WORKBOOKS}
+    t = START
+    for _ in range(n):
+        t += dt.timedelta(seconds=rng.expovariate(1 / 30))
+        w = rng.choice(WORKBOOKS)
+        files[w].write(("" if first[w] else "\n") + json.dumps(record(rng, t)))
+        first[w] = False
+    for f in files.values():
+        f.close()
+    return t.timestamp()
+
+
+def timed(fn, repeat: int) -> dict:
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - t0) * 1e6)
+    samples.sort()
+    return {"p50_us": statistics.median(samples), "p95_us": samples[int(0.95 * (len(samples) - 1))]}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--records", type=int, default=1_000_000)
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args()
+
+    rng = random.Random(1)
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        last = write_logs(root, args.records)
+        log = SheetLog(root)
+        t0 = time.perf_counter()
+        log.refresh()
+        ingest_s = time.perf_counter() - t0
+
+        def append_and_refresh():
+            nonlocal last
+            with open(root / f"{WORKBOOKS[0]}_changes.ndjson", "a") as f:
+                for _ in range(5):
+                    last += 10
+                    f.write("\n" + json.dumps(record(rng, dt.datetime.fromtimestamp(last, dt.timezone.utc))))
+            log.refresh()
+
+        def cell():
+            return rng.choice(SHEETS), f"{col_name(rng.randint(1, 26))}{rng.randint(1, 400)}"
+
+        def window():
+            t = START + dt.timedelta(days=rng.uniform(0, 300))
+            return t, t + dt.timedelta(days=1)
+
+        results = {
+            "records": len(log),
+            "ingest_s": ingest_s,
+            "ingest_records_per_s": len(log) / ingest_s,
+            "incremental_5_lines": timed(append_and_refresh, 50),
+            "current": timed(lambda: log.current(*cell()), args.queries),
+            "history": timed(lambda: log.history(*cell()), args.queries),
+            "edits_by_1_day": timed(lambda: log.edits_by(rng.choice(USERS[:-1]), *window()), args.queries // 10),
+        }
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f"ingest: {results['records']:,} records in {ingest_s:.2f} s "
+          f"({results['ingest_records_per_s']:,.0f}/s)")
+    print(f"{'case':<22} {'p50 us':>10} {'p95 us':>10}")
+    for case in ("incremental_5_lines", "current", "history", "edits_by_1_day"):
+        r = results[case]
+        print(f"{case:<22} {r['p50_us']:>10.1f} {r['p95_us']:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Workbook rebuild time: full replay vs checkpoint + tail.
+
+For each log size, one workbook is rebuilt three ways:
+
+full_replay   apply every line of the log (no checkpoints)
+checkpoint    load the newest checkpoint, apply the lines after it
+as_of_mid     reconstruct the workbook as of the middle of the log
+
+Checkpoints are written every ``--every`` edits, so the tail after the
+newest one is never longer than that; checkpoint time should stay flat
+while full replay grows with the log.
+
+Run from the repo root:  python .github/scripts/benchmarks/bench_snapshots.py
+"""
+import argparse
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from bench_sheetlog import START, WORKBOOKS, write_logs  # noqa: E402
+from sheet_snapshots import WorkbookSnapshots  # noqa: E402
+
+
+def best_of(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best * 1e3
+
+
+def run(n: int, every: int, repeat: int) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        last = write_logs(root, n)
+        log = root / f"{WORKBOOKS[0]}_changes.ndjson"
+
+        full_ms = best_of(lambda: WorkbookSnapshots(log, root=root / "none").current(checkpoint=False), repeat)
+
+        snaps = WorkbookSnapshots(log, root=root / "cp", every=every, keep=10 ** 6)
+        t0 = time.perf_counter()
+        state = snaps.current()           # first pass writes checkpoints as it goes
+        build_s = time.perf_counter() - t0
+        # Mid-log checkpoints for as_of; the incremental pass above only
+        # writes at its end, so walk the log once in `every`-sized steps.
+        step = WorkbookSnapshots(log, root=root / "cp", every=every, keep=10 ** 6)
+        t = START.timestamp()
+        while t < last:
+            t += (last - START.timestamp()) / max(1, n // every)
+            step.write_checkpoint(step.as_of(t))
+
+        cp_ms = best_of(lambda: WorkbookSnapshots(log, root=root / "cp").current(checkpoint=False), repeat)
+        mid = START.timestamp() + (last - START.timestamp()) / 2
+        as_of_ms = best_of(lambda: WorkbookSnapshots(log, root=root / "cp").as_of(mid), repeat)
+        return {
+            "records": n,
+            "workbook_edits": state.edits,
+            "cells": len(state),
+            "checkpoints": len(snaps.checkpoints()),
+            "first_build_s": build_s,
+            "full_replay_ms": full_ms,
+            "checkpoint_ms": cp_ms,
+            "as_of_mid_ms": as_of_ms,
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--records", type=int, nargs="+", default=[50_000, 200_000, 800_000],
+                        help="total records across all workbooks")
+    parser.add_argument("--every", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args()
+
+    results = [run(n, args.every, args.repeat) for n in args.records]
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f"{'records':>10} {'wb edits':>10} {'cells':>7} {'full ms':>10} {'ckpt ms':>10} {'as_of ms':>10}")
+    for r in results:
+        print(f"{r['records']:>10,} {r['workbook_edits']:>10,} {r['cells']:>7,} "
+              f"{r['full_replay_ms']:>10.1f} {r['checkpoint_ms']:>10.1f} {r['as_of_mid_ms']:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
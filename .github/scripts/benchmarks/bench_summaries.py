@@ -0,0 +1,128 @@
+"""
+AI summary cache: completions, latency and prompt size over a day of runs.
+
+Runs every ``--every`` minutes over a stream of commits, each summarizing
+the commits in the trailing ``--hours`` window (poll_commits.py --window),
+with ``--reruns`` of the runs repeated as if re-dispatched by hand.  The
+same schedule is replayed twice against a fake completion endpoint:
+
+uncached   the old behaviour, one completion per run with commits
+cached     CommitSummarizer with a SummaryStore persisted between runs
+
+Each run loads and saves the store, as a real cron run would.
+
+Run from the repo root:  python .github/scripts/benchmarks/bench_summaries.py
+"""
+import argparse
+import datetime as dt
+import hashlib
+import json
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import requests
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from stub_servers import StubCompletions  # noqa: E402
+from summary_cache import CommitSummarizer, SummaryStore  # noqa: E402
+
+MODEL = "gpt-4.1-mini"
+SUBJECTS = ["Tune cutter head torque limit", "Add thrust cylinder sensor", "Fix Modbus register map",
+            "Update Part Specs BOM", "Refactor telemetry journal", "Bump Streamlit"]
+
+
+def responses_complete(base_url: str):
+    """The request the OpenAI SDK's ``responses.create`` sends, over a pooled session."""
+    session = requests.Session()
+
+    def complete(prompt: str, max_output_tokens: int) -> str:
+        r = session.post(f"{base_url}/v1/responses", timeout=60,
+                         json={"model": MODEL, "input": prompt, "temperature": 0.4,
+                               "max_output_tokens": max_output_tokens})
+        r.raise_for_status()
+        return "".join(part["text"] for item in r.json()["output"] for part in item["content"]
+                       if part["type"] == "output_text")
+    return complete
+
+
+def commit_stream(hours: float, mean_gap_min: float, seed: int):
+    rng = random.Random(seed)
+    t = dt.datetime(2025, 11, 3, 8, tzinfo=dt.timezone.utc)
+    end = t + dt.timedelta(hours=hours)
+    out = []
+    while t < end:
+        t += dt.timedelta(minutes=rng.expovariate(1 / mean_gap_min))
+        sha = hashlib.sha1(str(len(out)).encode()).hexdigest()
+        out.append((t, {"sha": sha, "commit": {"message": f"{rng.choice(SUBJECTS)} (#{len(out)})",
+                                               "author": {"name": f"dev{rng.randint(0, 4)}"}}}))
+    return out
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=144, help="cron runs to simulate")
+    parser.add_argument("--every", type=float, default=5.0, help="minutes between runs")
+    parser.add_argument("--hours", type=float, default=6.0, help="window per run")
+    parser.add_argument("--gap", type=float, default=20.0, help="mean minutes between commits")
+    parser.add_argument("--reruns", type=float, default=0.1, help="fraction of runs repeated by hand")
+    parser.add_argument("--latency", type=float, default=0.1, help="seconds per completion")
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args()
+
+    span = args.runs * args.every / 60
+    commits = commit_stream(args.hours + span, args.gap, seed=0)
+    start = commits[0][0] + dt.timedelta(hours=args.hours)
+    rng = random.Random(1)
+    schedule = []
+    for i in range(args.runs):
+        now = start + dt.timedelta(minutes=i * args.every)
+        window = [c for t, c in commits if now - dt.timedelta(hours=args.hours) < t <= now]
+        schedule.extend([window] * (2 if rng.random() < args.reruns else 1))
+
+    results = {}
+    with StubCompletions(latency=args.latency) as llm, tempfile.TemporaryDirectory() as state:
+        complete = responses_complete(llm.url)
+        for case in ("uncached", "cached"):
+            llm.reset_counts()
+            llm.prompt_chars.clear()
+            hits = 0
+            t0 = time.perf_counter()
+            for window in schedule:
+                if not window:
+                    continue
+                if case == "uncached":
+                    # Fresh, empty store each run: nothing carries over.
+                    store = SummaryStore(Path(state) / "none.json")
+                    CommitSummarizer(complete, store, MODEL).summarize("owner/repo", "main", "", window)
+                    continue
+                store = SummaryStore(Path(state) / "summaries.json")
+                summarizer = CommitSummarizer(complete, store, MODEL)
+                summarizer.summarize("owner/repo", "main", "", window)
+                hits += summarizer.hits
+                store.save()
+            runs = sum(1 for w in schedule if w)
+            results[case] = {
+                "runs": runs,
+                "completions": llm.total,
+                "hit_rate": hits / runs if runs else 0.0,
+                "total_s": time.perf_counter() - t0,
+                "mean_prompt_chars": sum(llm.prompt_chars) / max(1, len(llm.prompt_chars)),
+            }
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f"{len(schedule)} runs every {args.every:g} min over a {args.hours:g} h window, "
+          f"{args.latency * 1e3:.0f} ms per completion")
+    print(f"{'case':<10} {'runs':>6} {'calls':>6} {'hit rate':>9} {'total s':>8} {'prompt chars':>13}")
+    for case, r in results.items():
+        print(f"{case:<10} {r['runs']:>6} {r['completions']:>6} {r['hit_rate']:>9.0%} "
+              f"{r['total_s']:>8.2f} {r['mean_prompt_chars']:>13.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,246 @@
+"""
+Local stand-ins for the HTTP services the digest scripts call, so their
+latency and request counts can be benchmarked offline.
+
+StubGitHub       ``GET /repos/<owner>/<repo>/commits`` with ``sha``, ``since``,
+                 ``until``, ``per_page`` and ``page``; ``Link`` pagination,
+                 ``ETag`` / ``If-None-Match`` -> 304, fixed per-request latency.
+StubCompletions  ``POST /v1/responses`` in the OpenAI Responses API shape.
+                 Replies to the digest prompt with the JSON it asks for;
+                 point the SDK at it with ``OPENAI_BASE_URL=<url>/v1``.
+StubWebhook      ``POST /api/webhooks/<id>/<token>`` with Discord's payload limits
+                 and rate limiting: a fixed ``limit`` per ``window`` seconds,
+                 ``X-RateLimit-*`` headers, 429 + ``Retry-After`` beyond it.
+                 ``fail_next`` injects 5xx responses (or a dead server).
+
+Each server runs on 127.0.0.1 in a daemon thread and counts the requests
+it answers by status code.
+
+    with StubGitHub(commits=450, latency=0.08) as gh:
+        os.environ["GITHUB_API_URL"] = gh.url
+"""
+import datetime as dt
+import hashlib
+import json
+import re
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List
+from urllib.parse import parse_qs, urlencode, urlparse
+
+START = dt.datetime(2025, 11, 1, tzinfo=dt.timezone.utc)
+
+
+def iso(t: dt.datetime) -> str:
+    return t.strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+class _StubServer:
+    """Threaded server on an ephemeral port; subclasses implement ``handle``."""
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency              # seconds slept before every response
+        self.counts: Counter = Counter()    # status code -> requests answered
+        self.lock = threading.Lock()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"   # keep-alive, like the real services
+
+            def _dispatch(self):
+                if stub.latency:
+                    time.sleep(stub.latency)
+                length = int(self.headers.get("Content-Length") or 0)
+                body = self.rfile.read(length) if length else b""
+                status, headers, payload = stub.handle(self.command, self.path, self.headers, body)
+                with stub.lock:
+                    stub.counts[status] += 1
+                self.send_response(status)
+                for k, v in headers.items():
+                    self.send_header(k, v)
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            do_GET = do_POST = _dispatch
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    def handle(self, method: str, path: str, headers, body: bytes):
+        raise NotImplementedError
+
+    @property
+    def total(self) -> int:
+        return sum(self.counts.values())
+
+    def reset_counts(self):
+        with self.lock:
+            self.counts.clear()
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class StubGitHub(_StubServer):
+    def __init__(self, commits: int = 450, latency: float = 0.0, every: dt.timedelta = dt.timedelta(minutes=2)):
+        super().__init__(latency)
+        self.every = every
+        self.commits: List[Dict] = []       # newest first, like the API
+        for _ in range(commits):
+            self.push()
+
+    def push(self, message: str = "", when: str = "") -> Dict:
+        """
+        Add a commit at the head of the branch.  An explicit older ``when``
+        stands in for a commit merged in late: listings sort by committer
+        date, so it lands below newer commits, as on GitHub.
+        """
+        n = len(self.commits)
+        when = when or iso(START + n * self.every)
+        sha = hashlib.sha1(str(n).encode()).hexdigest()
+        commit = {
+            "sha": sha,
+            "html_url": f"https://github.com/owner/repo/commit/{sha}",
+            "parents": [{"sha": self.commits[0]["sha"]}] if self.commits else [],
+            "commit": {
+                "message": message or f"Commit {n}: adjust cutter head torque limits",
+                "author": {"name": f"dev{n % 5}", "date": when},
+                "committer": {"name": f"dev{n % 5}", "date": when},
+            },
+        }
+        with self.lock:
+            self.commits.insert(0, commit)
+            self.commits.sort(key=lambda c: c["commit"]["committer"]["date"], reverse=True)
+        return commit
+
+    @property
+    def now(self) -> dt.datetime:
+        """Timestamp of the newest regular commit."""
+        return START + (len(self.commits) - 1) * self.every
+
+    def handle(self, method, path, headers, body):
+        url = urlparse(path)
+        if method != "GET" or not url.path.endswith("/commits"):
+            return 404, {}, b'{"message":"Not Found"}'
+        q = {k: v[0] for k, v in parse_qs(url.query).items()}
+        per_page, page = int(q.get("per_page", 30)), int(q.get("page", 1))
+        with self.lock:
+            items = [c for c in self.commits
+                     if q.get("since", "") <= c["commit"]["committer"]["date"] <= q.get("until", "~")]
+        pages = max(1, -(-len(items) // per_page))
+        payload = json.dumps(items[(page - 1) * per_page:page * per_page]).encode()
+        etag = '"%s"' % hashlib.sha1(payload).hexdigest()
+        if headers.get("If-None-Match") == etag:
+            return 304, {"ETag": etag}, b""
+        out = {"Content-Type": "application/json", "ETag": etag}
+        if pages > 1:
+            def link(p):
+                return f"<{self.url}{url.path}?{urlencode({**q, 'page': p})}>"
+            rels = []
+            if page < pages:
+                rels.append(f'{link(page + 1)}; rel="next"')
+            rels.append(f'{link(pages)}; rel="last"')
+            out["Link"] = ", ".join(rels)
+        return 200, out, payload
+
+
+class StubCompletions(_StubServer):
+    _LINE = re.compile(r"^\[([0-9a-f]{7})\] (NEW )?(.*)$", re.M)
+
+    def __init__(self, latency: float = 1.0):
+        super().__init__(latency)
+        self.prompt_chars: List[int] = []   # input size of every request
+
+    def handle(self, method, path, headers, body):
+        if method != "POST" or not path.rstrip("/").endswith("/responses"):
+            return 404, {}, b'{"error":{"message":"Not Found"}}'
+        request = json.loads(body)
+        prompt = request["input"]
+        with self.lock:
+            self.prompt_chars.append(len(prompt))
+        lines = self._LINE.findall(prompt)
+        text = json.dumps({
+            "summary": f"{len(lines)} change(s), mostly to the cutter head and the sensor list.",
+            "commits": {sha: rest.split(" — ")[0][:80] for sha, new, rest in lines if new},
+        })
+        reply = {
+            "id": "resp_stub", "object": "response", "created_at": int(time.time()),
+            "model": request.get("model"), "status": "completed",
+            "output": [{"type": "message", "id": "msg_stub", "status": "completed", "role": "assistant",
+                        "content": [{"type": "output_text", "text": text, "annotations": []}]}],
+            "usage": {"input_tokens": len(prompt) // 4, "output_tokens": len(text) // 4,
+                      "total_tokens": (len(prompt) + len(text)) // 4},
+        }
+        return 200, {"Content-Type": "application/json"}, json.dumps(reply).encode()
+
+
+class StubWebhook(_StubServer):
+    def __init__(self, limit: int = 5, window: float = 2.0, latency: float = 0.0):
+        super().__init__(latency)
+        self.limit = limit
+        self.window = window
+        self.messages: List[Dict] = []      # accepted payloads, in order
+        self.fail_next = 0                  # answer this many requests with fail_status
+        self.fail_status = 503
+        self._window_start = time.monotonic()
+        self._used = 0
+
+    @property
+    def hook(self) -> str:
+        return f"{self.url}/api/webhooks/1/token"
+
+    @staticmethod
+    def _invalid(payload: Dict) -> str:
+        content, embeds = payload.get("content") or "", payload.get("embeds") or []
+        if not content and not embeds:
+            return "Cannot send an empty message"
+        if len(content) > 2000:
+            return "content: Must be 2000 or fewer in length."
+        if len(embeds) > 10 or any(len(e.get("description", "")) > 4096 for e in embeds):
+            return "embeds: invalid"
+        if sum(len(e.get("description", "")) for e in embeds) > 6000:
+            return "embeds: total size exceeds 6000"
+        return ""
+
+    def handle(self, method, path, headers, body):
+        if method != "POST" or "/api/webhooks/" not in path:
+            return 404, {}, b'{"message":"Unknown Webhook","code":10015}'
+        with self.lock:
+            if self.fail_next:
+                self.fail_next -= 1
+                return self.fail_status, {}, b'{"message":"upstream unavailable"}'
+            now = time.monotonic()
+            if now - self._window_start >= self.window:
+                self._window_start, self._used = now, 0
+            reset_after = self.window - (now - self._window_start)
+            if self._used >= self.limit:
+                retry = json.dumps({"message": "You are being rate limited.",
+                                    "retry_after": round(reset_after, 3), "global": False}).encode()
+                return 429, {"Retry-After": str(max(1, round(reset_after))), "Content-Type": "application/json",
+                             "X-RateLimit-Limit": str(self.limit), "X-RateLimit-Remaining": "0",
+                             "X-RateLimit-Reset-After": f"{reset_after:.3f}"}, retry
+            payload = json.loads(body or b"{}")
+            problem = self._invalid(payload)
+            if problem:
+                return 400, {"Content-Type": "application/json"}, json.dumps({"message": problem}).encode()
+            self._used += 1
+            self.messages.append(payload)
+            out = {"Content-Type": "application/json",
+                   "X-RateLimit-Limit": str(self.limit),
+                   "X-RateLimit-Remaining": str(self.limit - self._used),
+                   "X-RateLimit-Reset-After": f"{reset_after:.3f}",
+                   "X-RateLimit-Bucket": "stub"}
+            return 200, out, json.dumps({"id": str(len(self.messages)), **payload}).encode()
@@ -0,0 +1,288 @@
+# .github/scripts/discord_delivery.py
+"""
+Discord webhook delivery for poll_commits.py.
+
+``DiscordDelivery`` replaces the fixed 1900-character slicing:
+
+* text is split at paragraph, line, sentence and word boundaries, never
+  inside an inline code span or a fenced code block (a block longer than
+  one message is closed and reopened across the cut);
+* consecutive digests are packed into the fewest messages, either as plain
+  ``content`` (2000 characters) or as embeds (4096 per description, ten per
+  message, 6000 in total);
+* messages go into a durable outbox in ``DIGEST_STATE_DIR`` before anything
+  is sent, and ``flush`` removes each one only once Discord accepted it.
+  Whatever a failed run could not send goes out on the next run;
+* one pooled ``requests.Session``, paced by a token bucket that follows
+  the webhook's ``X-RateLimit-*`` headers and blocks for ``Retry-After`` on
+  a 429.  5xx responses and connection errors are retried with jittered
+  exponential backoff.  Other 4xx responses will never succeed; those
+  messages move to the outbox's ``dead`` list instead of blocking the queue.
+"""
+import json
+import os
+import random
+import re
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from github_fetch import STATE_DIR
+
+OUTBOX_FILE = "outbox.json"
+CONTENT_LIMIT = 2000
+EMBED_LIMIT = 4096
+EMBEDS_PER_MESSAGE = 10
+EMBED_TOTAL_LIMIT = 6000
+
+_CODE = re.compile(r"```.*?```|`[^`\n]+`", re.S)
+_BOUNDARIES = ("\n\n", "\n", ". ", " ")
+
+
+# ------------------------------------------------------------
+# Splitting and packing
+# ------------------------------------------------------------
+def _cuts(text: str, sep: str, spans: List[Tuple[int, int]]) -> List[int]:
+    """Offsets just after each ``sep`` that is not inside a code span."""
+    out = []
+    i = text.find(sep)
+    while i >= 0:
+        if not any(a < i < b for a, b in spans):
+            out.append(i + len(sep))
+        i = text.find(sep, i + 1)
+    return out
+
+
+def _hard_split(text: str, limit: int) -> List[str]:
+    """Last resort for one unbreakable run: cut at ``limit``, keeping fences balanced."""
+    fenced = text.startswith("```") and text.endswith("```")
+    if not fenced:
+        return [text[i:i + limit] for i in range(0, len(text), limit)]
+    header, _, body = text[3:-3].partition("\n")       # ```lang\n ... ```
+    room = limit - len(header) - 8
+    return [f"```{header}\n{body[i:i + room]}```" for i in range(0, len(body), room)]
+
+
+def split_text(text: str, limit: int = CONTENT_LIMIT) -> List[str]:
+    """Chunks of at most ``limit`` characters, cut at the coarsest boundary that fits."""
+    text = text.strip()
+    if len(text) <= limit:
+        return [text] if text else []
+    spans = [m.span() for m in _CODE.finditer(text)]
+    for sep in _BOUNDARIES:
+        cuts = [c for c in _cuts(text, sep, spans) if c < len(text)]
+        if not cuts:
+            continue
+        pieces = [text[a:b] for a, b in zip([0] + cuts, cuts + [len(text)])]
+        chunks: List[str] = []
+        current = ""
+        for piece in pieces:
+            if len(current) + len(piece.rstrip()) <= limit:
+                current += piece
+                continue
+            if current.strip():
+                chunks.append(current.strip())
+            if len(piece.rstrip()) > limit:
+                # Too long even alone: split it at the next finer boundary.
+                chunks.extend(split_text(piece, limit))
+                current = ""
+            else:
+                current = piece
+        if current.strip():
+            chunks.append(current.strip())
+        return chunks
+    return _hard_split(text, limit)
+
+
+def pack(texts: List[str], embeds: bool = False, payloads: Optional[List[Dict]] = None) -> List[Dict]:
+    """
+    Webhook payloads carrying ``texts`` (separate digests) in as few messages
+    as possible.  New chunks are appended to ``payloads`` if given, filling
+    its last message first.
+    """
+    payloads = [] if payloads is None else payloads
+    for text in texts:
+        for chunk in split_text(text, EMBED_LIMIT if embeds else CONTENT_LIMIT):
+            if not (payloads and merge(payloads[-1], chunk)):
+                payloads.append({"embeds": [{"description": chunk}]} if embeds else {"content": chunk})
+    return payloads
+
+
+def merge(payload: Dict, chunk: str) -> bool:
+    """Append ``chunk`` to ``payload`` in place if it fits; True if it did."""
+    if "content" in payload:
+        if len(payload["content"]) + 2 + len(chunk) > CONTENT_LIMIT:
+            return False
+        payload["content"] += "\n\n" + chunk
+        return True
+    embeds = payload["embeds"]
+    total = sum(len(e["description"]) for e in embeds)
+    if len(embeds[-1]["description"]) + 2 + len(chunk) <= EMBED_LIMIT and total + 2 + len(chunk) <= EMBED_TOTAL_LIMIT:
+        embeds[-1]["description"] += "\n\n" + chunk
+        return True
+    if len(embeds) < EMBEDS_PER_MESSAGE and total + len(chunk) <= EMBED_TOTAL_LIMIT:
+        embeds.append({"description": chunk})
+        return True
+    return False
+
+
+# ------------------------------------------------------------
+# Pacing
+# ------------------------------------------------------------
+class TokenBucket:
+    """
+    Client-side pacing for one webhook.  Starts from Discord's usual webhook
+    allowance and adopts the limits the server reports.
+    """
+
+    def __init__(self, capacity: float = 5, per: float = 2.0,
+                 clock: Callable[[], float] = time.monotonic, sleep: Callable[[float], None] = time.sleep):
+        self.capacity = capacity
+        self.rate = capacity / per          # tokens per second
+        self.tokens = capacity
+        self.clock = clock
+        self.sleep = sleep
+        self.updated = clock()
+        self.blocked_until = 0.0
+
+    def _refill(self):
+        now = self.clock()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def acquire(self):
+        while True:
+            wait = self.blocked_until - self.clock()
+            if wait <= 0:
+                self._refill()
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            self.sleep(wait)
+
+    def block(self, seconds: float):
+        self.blocked_until = max(self.blocked_until, self.clock() + seconds)
+
+    def update(self, headers):
+        """Follow ``X-RateLimit-Limit/Remaining/Reset-After`` from a response."""
+        try:
+            limit = float(headers["X-RateLimit-Limit"])
+            remaining = float(headers["X-RateLimit-Remaining"])
+            reset_after = float(headers["X-RateLimit-Reset-After"])
+        except (KeyError, ValueError):
+            return
+        self._refill()
+        self.capacity = limit
+        self.tokens = min(self.tokens, remaining)
+        if remaining < 1:
+            self.block(reset_after)
+
+
+# ------------------------------------------------------------
+# Outbox and delivery
+# ------------------------------------------------------------
+class Outbox:
+    """Pending webhook payloads, oldest first, persisted as one JSON file."""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        try:
+            data = json.loads(self.path.read_text())
+        except (OSError, ValueError):
+            data = {}
+        self.pending: List[Dict] = data.get("pending", [])
+        self.dead: List[Dict] = data.get("dead", [])
+
+    def save(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".tmp")
+        tmp.write_text(json.dumps({"pending": self.pending, "dead": self.dead[-50:]}, ensure_ascii=False))
+        os.replace(tmp, self.path)
+
+    def __len__(self) -> int:
+        return len(self.pending)
+
+
+class PermanentError(Exception):
+    """The webhook rejected a payload in a way retrying will not fix."""
+
+
+class DiscordDelivery:
+    def __init__(self, webhook_url: str, state_dir: Path = STATE_DIR, embeds: bool = False,
+                 max_attempts: int = 6, backoff: float = 1.0, timeout: float = 30.0,
+                 bucket: Optional[TokenBucket] = None, sleep: Callable[[float], None] = time.sleep):
+        self.webhook_url = webhook_url
+        self.embeds = embeds
+        self.max_attempts = max_attempts
+        self.backoff = backoff              # first retry delay, doubled per attempt
+        self.timeout = timeout
+        self.sleep = sleep
+        self.bucket = bucket or TokenBucket(sleep=sleep)
+        self.outbox = Outbox(Path(state_dir) / OUTBOX_FILE)
+        self.session = requests.Session()
+        self.session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=1))
+        self.sent = 0                       # payloads accepted this run
+        self.rate_limited = 0               # 429 responses seen
+
+    def close(self):
+        self.session.close()
+
+    def enqueue(self, text: str):
+        """Pack ``text`` into the outbox (filling the last pending message first) and persist it."""
+        payloads = [entry["payload"] for entry in self.outbox.pending]
+        queued = len(payloads)
+        pack([text], self.embeds, payloads)
+        self.outbox.pending.extend({"payload": p, "attempts": 0} for p in payloads[queued:])
+        self.outbox.save()
+
+    def _post(self, payload: Dict) -> bool:
+        """Deliver one payload; False if it should be retried on a later run."""
+        for attempt in range(self.max_attempts):
+            self.bucket.acquire()
+            try:
+                r = self.session.post(self.webhook_url, params={"wait": "true"}, json=payload, timeout=self.timeout)
+            except requests.RequestException as e:
+                print(f"Discord: {e}; retrying", file=sys.stderr)
+                self.sleep(self.backoff * 2 ** attempt * random.uniform(0.5, 1.0))
+                continue
+            if r.status_code == 429:
+                self.rate_limited += 1
+                try:
+                    retry_after = float(r.json().get("retry_after"))
+                except (ValueError, TypeError, AttributeError):
+                    retry_after = float(r.headers.get("Retry-After", 1))
+                self.bucket.block(retry_after)
+                continue
+            if r.status_code >= 500:
+                self.sleep(self.backoff * 2 ** attempt * random.uniform(0.5, 1.0))
+                continue
+            if r.status_code >= 400:
+                raise PermanentError(f"{r.status_code}: {r.text[:200]}")
+            self.bucket.update(r.headers)
+            return True
+        return False
+
+    def flush(self) -> int:
+        """Send pending payloads in order; returns how many are still pending."""
+        while self.outbox.pending:
+            entry = self.outbox.pending[0]
+            entry["attempts"] += 1
+            try:
+                delivered = self._post(entry["payload"])
+            except PermanentError as e:
+                print(f"Discord rejected a message, moved to the dead list: {e}", file=sys.stderr)
+                self.outbox.dead.append(self.outbox.pending.pop(0))
+                self.outbox.save()
+                continue
+            if not delivered:
+                break
+            self.outbox.pending.pop(0)
+            self.outbox.save()
+            self.sent += 1
+        self.outbox.save()
+        return len(self.outbox.pending)
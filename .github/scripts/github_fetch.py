@@ -0,0 +1,270 @@
+# .github/scripts/github_fetch.py
+"""
+Commit listing for poll_commits.py: pooled, conditional and incremental.
+
+``CommitFetcher.new_commits`` keeps a cursor per branch: the head SHA last
+processed, the validators of the probe that saw it, and the most recent
+SHAs for de-duplication.  A run
+
+* keeps one ``requests.Session`` (keep-alive, one TLS handshake per run);
+* first sends a one-commit probe of the branch with ``If-None-Match`` /
+  ``If-Modified-Since`` from the cursor.  A 304 means nothing was pushed,
+  and GitHub does not count 304s against the rate limit;
+* otherwise pages back from the head and stops at the cursor, so the
+  requests made follow the number of new commits, not a time window.
+  Late-pushed commits with old dates are still found, and nothing is
+  reported twice.
+
+The caller calls ``advance`` only after the digest went out, so a failed
+post is retried next run.  The cursor's validators are saved with it for the
+same reason: a 304 must never hide commits that were fetched but not posted.
+
+``fetch`` keeps the fixed-window mode (``--window`` in poll_commits.py):
+the same probe, a saved listing reused on 304, and pages after the first
+fetched concurrently once the ``Link`` header gives the last one.
+
+State lives in ``DIGEST_STATE_DIR`` (default ``.digest_state/``), which the
+workflow restores between runs with ``actions/cache``.  The API base honours
+``GITHUB_API_URL``, so the benchmark can point it at a local stub.
+"""
+import json
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional, Set, Tuple
+from urllib.parse import urlencode
+
+import requests
+from requests.adapters import HTTPAdapter
+
+API_URL = os.environ.get("GITHUB_API_URL", "https://api.github.com")
+STATE_DIR = Path(os.environ.get("DIGEST_STATE_DIR", Path(__file__).resolve().parents[2] / ".digest_state"))
+CACHE_FILE = "github_cache.json"
+SEEN_LIMIT = 1000        # SHAs remembered per branch for de-duplication
+_LAST_PAGE = re.compile(r'<[^>]*[?&]page=(\d+)[^>]*>;\s*rel="last"')
+
+
+def committed_at(commit: Dict) -> str:
+    """ISO committer date, the field GitHub's ``since``/``until`` filter on."""
+    c = commit.get("commit", {}) or {}
+    return (c.get("committer") or c.get("author") or {}).get("date", "")
+
+
+def _validators(response: requests.Response) -> Dict[str, str]:
+    return {"etag": response.headers.get("ETag"), "last_modified": response.headers.get("Last-Modified")}
+
+
+def _conditional(validators: Dict[str, str]) -> Dict[str, str]:
+    headers = {}
+    if validators.get("etag"):
+        headers["If-None-Match"] = validators["etag"]
+    if validators.get("last_modified"):
+        headers["If-Modified-Since"] = validators["last_modified"]
+    return headers
+
+
+def _ancestors(sha: str, commits: List[Dict]) -> Set[str]:
+    """``sha`` and every commit in ``commits`` reachable from it through parents."""
+    parents = {c["sha"]: [p["sha"] for p in c.get("parents", [])] for c in commits}
+    found, stack = set(), [sha]
+    while stack:
+        s = stack.pop()
+        if s not in found:
+            found.add(s)
+            stack.extend(parents.get(s, []))
+    return found
+
+
+class NewCommits(NamedTuple):
+    """Result of ``CommitFetcher.new_commits``; pass it to ``advance`` once processed."""
+    key: str
+    items: List[Dict]              # newest first, not yet processed
+    head: Optional[str]            # branch head SHA at fetch time
+    validators: Dict[str, str]     # of the head probe, stored with the cursor
+
+
+class HttpCache:
+    """Validators, saved listings and commit cursors, persisted as one JSON file."""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        try:
+            self.data = json.loads(self.path.read_text())
+        except (OSError, ValueError):
+            self.data = {}
+        self.data.setdefault("validators", {})
+        self.data.setdefault("listings", {})
+        self.data.setdefault("cursors", {})
+        self.dirty = False
+
+    def conditional_headers(self, key: str) -> Dict[str, str]:
+        return _conditional(self.data["validators"].get(key, {}))
+
+    def remember(self, key: str, response: requests.Response):
+        v = _validators(response)
+        if self.data["validators"].get(key) != v:
+            self.data["validators"][key] = v
+            self.dirty = True
+
+    def listing(self, key: str) -> Optional[Dict]:
+        return self.data["listings"].get(key)
+
+    def set_listing(self, key: str, since_iso: str, items: List[Dict]):
+        self.data["listings"][key] = {"since": since_iso, "items": items}
+        self.dirty = True
+
+    def cursor(self, key: str) -> Optional[Dict]:
+        return self.data["cursors"].get(key)
+
+    def set_cursor(self, key: str, cursor: Dict):
+        self.data["cursors"][key] = cursor
+        self.dirty = True
+
+    def save(self):
+        if not self.dirty:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(self.data, separators=(",", ":")))
+        os.replace(tmp, self.path)
+        self.dirty = False
+
+
+class CommitFetcher:
+    def __init__(self, repo: str, token: str, api_url: str = API_URL, state_dir: Path = STATE_DIR,
+                 max_workers: int = 4, timeout: float = 30.0):
+        self.repo = repo
+        self.api_url = api_url.rstrip("/")
+        self.timeout = timeout
+        self.max_workers = max_workers
+        self.cache = HttpCache(Path(state_dir) / CACHE_FILE)
+        self.session = requests.Session()
+        self.session.headers.update({
+            "Accept": "application/vnd.github+json",
+            "Authorization": f"Bearer {token}",
+            "X-GitHub-Api-Version": "2022-11-28",
+            "User-Agent": "commit-digest",
+        })
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_workers)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.requests = 0             # HTTP requests sent, for logs and benchmarks
+        self.not_modified = 0         # of which answered 304
+        self.reseeded: List[str] = []  # branches whose cursor was gone from history
+
+    def close(self):
+        self.cache.save()
+        self.session.close()
+
+    def __enter__(self) -> "CommitFetcher":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _get(self, params: Dict, headers: Optional[Dict] = None) -> requests.Response:
+        self.requests += 1
+        r = self.session.get(f"{self.api_url}/repos/{self.repo}/commits", params=params,
+                             headers=headers, timeout=self.timeout)
+        if r.status_code == 304:
+            self.not_modified += 1
+        else:
+            r.raise_for_status()
+        return r
+
+    def _head_unchanged(self, branch: str) -> bool:
+        """Conditional one-commit probe; True if the branch head has not moved since last run."""
+        params = {"sha": branch, "per_page": 1}
+        key = f"{self.repo}/commits?{urlencode(params)}"
+        r = self._get(params, self.cache.conditional_headers(key))
+        if r.status_code == 304:
+            return True
+        self.cache.remember(key, r)
+        return False
+
+    def _pages(self, branch: str, since_iso: str, per_page: int, max_pages: int) -> List[Dict]:
+        params = {"sha": branch, "since": since_iso, "per_page": per_page}
+        first = self._get({**params, "page": 1})
+        items = first.json()
+        m = _LAST_PAGE.search(first.headers.get("Link", ""))
+        last = min(int(m.group(1)), max_pages) if m else 1
+        if last > 1:
+            with ThreadPoolExecutor(max_workers=min(self.max_workers, last - 1)) as pool:
+                rest = pool.map(lambda page: self._get({**params, "page": page}).json(), range(2, last + 1))
+                for page_items in rest:
+                    items.extend(page_items)
+        return items
+
+    def fetch(self, branch: str, since_iso: str, until_iso: str,
+              per_page: int = 100, max_pages: int = 5) -> Tuple[List[Dict], bool]:
+        """Commits on ``branch`` committed in ``[since, until]``, and whether the cache answered."""
+        key = f"{self.repo}@{branch}"
+        saved = self.cache.listing(key)
+        # Probe first even without a saved listing: the validators must never
+        # be newer than the listing stored alongside them.
+        unchanged = self._head_unchanged(branch)
+        cached = unchanged and saved is not None and saved["since"] <= since_iso
+        if cached:
+            items = saved["items"]
+        else:
+            items = self._pages(branch, since_iso, per_page, max_pages)
+            self.cache.set_listing(key, since_iso, items)
+        return [c for c in items if since_iso <= committed_at(c) <= until_iso], cached
+
+    def new_commits(self, branch: str, since_iso: str, per_page: int = 30, max_pages: int = 10) -> NewCommits:
+        """
+        Commits pushed to ``branch`` since the last ``advance``, newest first.
+
+        With a cursor, the probe alone settles the common cases: 304 (head
+        unchanged) or a single new commit on top of the cursor.  Otherwise
+        pages are walked newest first and the walk stops at the page holding
+        the cursor.  The rest of that page is still checked, since commits
+        merged in with older dates can sort below the cursor; the cursor
+        itself and its ancestors on the listed pages are history, and
+        recently seen SHAs were already reported.  Without a cursor (first
+        run, cache lost), or when the walk never meets it (force-push), the
+        ``since`` window seeds it.
+        """
+        key = f"{self.repo}@{branch}"
+        cursor = self.cache.cursor(key)
+        r = self._get({"sha": branch, "per_page": 1}, _conditional(cursor["validators"]) if cursor else None)
+        if r.status_code == 304:
+            return NewCommits(key, [], cursor["head"], cursor["validators"])
+        top = r.json()
+        if not top:
+            return NewCommits(key, [], None, _validators(r))
+        head = top[0]
+        if cursor is None:
+            items = [c for c in self._pages(branch, since_iso, 100, max_pages) if committed_at(c) >= since_iso]
+            return NewCommits(key, items, head["sha"], _validators(r))
+        if head["sha"] == cursor["head"]:
+            return NewCommits(key, [], head["sha"], _validators(r))
+        seen = set(cursor["seen"])
+        if [p["sha"] for p in head.get("parents", [])] == [cursor["head"]]:
+            return NewCommits(key, [head], head["sha"], _validators(r))
+
+        listed: List[Dict] = []
+        for page in range(1, max_pages + 1):
+            batch = self._get({"sha": branch, "per_page": per_page, "page": page}).json()
+            listed.extend(batch)
+            if len(batch) < per_page or any(c["sha"] == cursor["head"] for c in batch):
+                break
+        if not any(c["sha"] == cursor["head"] for c in listed):
+            # Force-push or rewrite: the cursor is no longer in history.  Reseed
+            # from the ``since`` window rather than report every listed commit.
+            self.reseeded.append(branch)
+            items = [c for c in listed if c["sha"] not in seen and committed_at(c) >= since_iso]
+            return NewCommits(key, items, head["sha"], _validators(r))
+        old = _ancestors(cursor["head"], listed)
+        items = [c for c in listed if c["sha"] not in seen and c["sha"] not in old]
+        return NewCommits(key, items, head["sha"], _validators(r))
+
+    def advance(self, batch: NewCommits):
+        """Mark ``batch`` as processed; the next ``new_commits`` starts after it."""
+        if batch.head is None:
+            return
+        old = self.cache.cursor(batch.key)
+        seen = [c["sha"] for c in batch.items] + (old["seen"] if old else [])
+        self.cache.set_cursor(batch.key, {"head": batch.head, "validators": batch.validators,
+                                          "seen": list(dict.fromkeys(seen))[:SEEN_LIMIT]})
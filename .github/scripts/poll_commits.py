@@ -1,10 +1,16 @@
 # .github/scripts/poll_commits.py
-import os, sys, argparse, datetime as dt, requests
-from typing import List, Dict
+import os, sys, argparse, datetime as dt
+from typing import List, Dict, Optional, Tuple
+
+from github_fetch import STATE_DIR, CommitFetcher, NewCommits
+from summary_cache import CommitSummarizer, SummaryStore
+from discord_delivery import DiscordDelivery
+from sheet_coalesce import EditCoalescer
 
 DISCORD_WEBHOOK = os.environ.get("DISCORD_WEBHOOK_URL")
 GITHUB_TOKEN = os.environ.get("GH_PAT") or os.environ.get("GITHUB_TOKEN")
 OPENAI_API_KEY = os.environ.get("OPENAI_API_KEY")
+OPENAI_MODEL = os.environ.get("OPENAI_MODEL", "gpt-4.1-mini")
 REPO = os.environ.get("GITHUB_REPOSITORY")  # e.g., owner/name
 
 if not DISCORD_WEBHOOK:
@@ -13,8 +19,14 @@ if not GITHUB_TOKEN:
     sys.exit("Missing GITHUB_TOKEN (or GH_PAT).")
 
 parser = argparse.ArgumentParser()
-parser.add_argument("--hours", type=float, default=6.0)
+parser.add_argument("--hours", type=float, default=6.0,
+                    help="look-back window with --window; otherwise only used to seed the cursor")
 parser.add_argument("--branch", type=str, default="main")
+parser.add_argument("--window", action="store_true",
+                    help="report every commit in the last --hours instead of those new since the last run")
+parser.add_argument("--embeds", action="store_true", help="post digests as embeds instead of plain messages")
+parser.add_argument("--quiet", type=float, default=120.0,
+                    help="seconds between edits to one cell that still count as one sheet change")
 args = parser.parse_args()
 
 now = dt.datetime.utcnow()
@@ -22,27 +34,47 @@ since = now - dt.timedelta(hours=args.hours)
 since_iso = since.replace(microsecond=0).isoformat() + "Z"
 until_iso = now.replace(microsecond=0).isoformat() + "Z"
 
-gh_headers = {
-    "Accept": "application/vnd.github+json",
-    "Authorization": f"Bearer {GITHUB_TOKEN}",
-    "X-GitHub-Api-Version": "2022-11-28",
-    "User-Agent": "commit-digest"
-}
-
-def fetch_commits(repo: str, branch: str, since_iso: str, until_iso: str,
-                  per_page: int = 100, max_pages: int = 5) -> List[Dict]:
-    all_items = []
-    for page in range(1, max_pages+1):
-        params = {"sha": branch, "since": since_iso, "until": until_iso,
-                  "per_page": per_page, "page": page}
-        r = requests.get(f"https://api.github.com/repos/{repo}/commits",
-                         headers=gh_headers, params=params, timeout=30)
-        r.raise_for_status()
-        items = r.json()
-        if not items: break
-        all_items.extend(items)
-        if len(items) < per_page: break
-    return all_items
+# Pooled session, conditional head probe, per-branch cursor: see github_fetch.py
+fetcher = CommitFetcher(REPO, GITHUB_TOKEN)
+
+def fetch_commits(branch: str) -> Tuple[List[Dict], Optional[NewCommits]]:
+    """Commits to report, plus the cursor batch to ``advance`` once they are posted."""
+    if args.window:
+        items, cached = fetcher.fetch(branch, since_iso, until_iso)
+        batch = None
+    else:
+        batch = fetcher.new_commits(branch, since_iso)
+        items, cached = batch.items, False
+    if fetcher.reseeded:
+        print(f"GitHub: {branch} was rewritten since the last run; reseeded from the --hours window.")
+    print(f"GitHub: {fetcher.requests} request(s), {fetcher.not_modified} not modified"
+          f"{' (listing from cache)' if cached else ''}; {len(items)} commit(s).")
+    return items, batch
+
+# Sheet edits: one Apps Script commit per keystroke-level edit. The digest
+# reports the coalesced changes from logs/ instead (see sheet_coalesce.py);
+# edits still inside their quiet period are reported by a later run.
+SHEET_COMMIT_PREFIX = "Sheets change:"
+coalescer = EditCoalescer(args.quiet, state_path=None if args.window else STATE_DIR / "coalescer.json")
+
+def is_sheet_commit(commit: Dict) -> bool:
+    return ((commit.get("commit", {}) or {}).get("message") or "").startswith(SHEET_COMMIT_PREFIX)
+
+def sheet_changes() -> List[Dict]:
+    """Coalesced sheet changes to report, as commit-shaped records."""
+    changes = coalescer.poll(since=since.replace(tzinfo=dt.timezone.utc).timestamp())
+    if args.window:
+        changes += coalescer.flush()
+    print(f"Sheets: {coalescer.edits_in} edit(s) -> {len(changes)} change(s), "
+          f"{coalescer.noops} round trip(s) dropped, {len(coalescer.open)} still open.")
+    return [c.as_commit() for c in changes]
+
+def finish(batch: Optional[NewCommits]):
+    """Move the cursor past ``batch`` and persist fetcher and coalescer state."""
+    if batch is not None:
+        fetcher.advance(batch)
+    fetcher.close()
+    coalescer.save()
 
 def is_merge(commit: Dict) -> bool:
     return len(commit.get("parents", [])) > 1
@@ -59,87 +91,95 @@ def bullet_lines(items: List[Dict]) -> List[str]:
         lines.append(f"• `{sha}` {msg} — {author} ({ts})\n{url}")
     return lines
 
-def summarize_with_openai(repo: str, branch: str, hours: float, bullets: List[str]) -> str:
+def openai_complete(prompt: str, max_output_tokens: int) -> str:
+    # OpenAI Responses API (text generation).
+    # Models like gpt-4.1 or gpt-4.1-mini work well here.
+    # See official docs: Text generation & Responses API.
+    # https://platform.openai.com/docs/guides/text ; https://platform.openai.com/docs/guides/migrate-to-responses
+    # OPENAI_BASE_URL points the SDK elsewhere, e.g. at the benchmark's fake endpoint.
+    import openai
+    openai.api_key = OPENAI_API_KEY
+    # Modern SDKs expose `responses.create`; older expose `chat.completions.create`.
+    # Use a generic fallback to support both.
+    try:
+        from openai import OpenAI
+        client = OpenAI(api_key=OPENAI_API_KEY)
+        resp = client.responses.create(
+            model=OPENAI_MODEL,
+            input=prompt,
+            temperature=0.4,
+            max_output_tokens=max_output_tokens
+        )
+        return resp.output_text
+    except Exception:
+        # Fallback to chat.completions if needed
+        resp = openai.ChatCompletion.create(
+            model=OPENAI_MODEL,
+            messages=[{"role": "user", "content": prompt}],
+            temperature=0.4,
+            max_tokens=max_output_tokens,
+        )
+        return resp["choices"][0]["message"]["content"]
+
+def summarize_with_openai(repo: str, branch: str, period: str, commits: List[Dict]) -> str:
     """
-    Ask OpenAI for a 2–5 sentence human-friendly summary.
+    Ask OpenAI for a 2–5 sentence human-friendly summary, reusing cached
+    digests and per-commit lines from earlier runs (see summary_cache.py).
     If OPENAI_API_KEY is missing or call fails, return an empty string.
     """
-    if not OPENAI_API_KEY or not bullets:
+    if not OPENAI_API_KEY or not commits:
         return ""
 
-    max_bullets = 25
-    subset = bullets[:max_bullets]
-    subset_text = "\n".join(subset)  # <-- precompute to avoid backslash in f-string expression
-
-    prompt = (
-        f"You are a release-notes assistant. Summarize recent GitHub commits for {repo} "
-        f"on branch '{branch}' from the last {hours:g} hours. "
-        f"Write 2–5 concise sentences for non-developers. "
-        f"Group by themes (features, fixes, refactors), avoid file paths/SHAs, and keep it neutral.\n\n"
-        f"Also, if spreadsheet edit JSON entries are provided, summarize the change in plain English "
-        f"(who edited, which sheet/cell, and what the new text says). Focus on the description of the change "
-        f"rather than the technical cell coordinates.\n\n"
-        f"Commits:\n{subset_text}"
-    )
-
-    # OpenAI Responses API (text generation).
-    # Models like gpt-4.1 or gpt-4.1-mini work well here.
-    # See official docs: Text generation & Responses API. 
-    # https://platform.openai.com/docs/guides/text ; https://platform.openai.com/docs/guides/migrate-to-responses
+    store = SummaryStore()
+    summarizer = CommitSummarizer(openai_complete, store, OPENAI_MODEL)
     try:
-        import openai
-        openai.api_key = OPENAI_API_KEY
-        # Modern SDKs expose `responses.create`; older expose `chat.completions.create`.
-        # Use a generic fallback to support both.
-        try:
-            from openai import OpenAI
-            client = OpenAI(api_key=OPENAI_API_KEY)
-            resp = client.responses.create(
-                model="gpt-4.1-mini",
-                input=prompt,
-                temperature=0.4,
-                max_output_tokens=250
-            )
-            text = resp.output_text
-        except Exception:
-            # Fallback to chat.completions if needed
-            resp = openai.ChatCompletion.create(
-                model="gpt-4o-mini",
-                messages=[{"role": "user", "content": prompt}],
-                temperature=0.4,
-                max_tokens=250,
-            )
-            text = resp["choices"][0]["message"]["content"]
-        return text.strip()
+        text = summarizer.summarize(repo, branch, period, commits)
+        print(f"AI summary: {'cached' if summarizer.hits else 'generated'}.")
+        return text
     except Exception as e:
         print(f"OpenAI error (non-fatal): {e}", file=sys.stderr)
         return ""
+    finally:
+        store.save()
+
+# Outbox, pacing, retries and boundary-aware splitting: see discord_delivery.py
+delivery = DiscordDelivery(DISCORD_WEBHOOK, embeds=args.embeds)
 
 def post_to_discord(content: str):
-    MAX = 1900
-    chunks = [content[i:i+MAX] for i in range(0, len(content), MAX)] or [content]
-    for i, part in enumerate(chunks, 1):
-        if len(chunks) > 1:
-            part = f"{part}\n\n(part {i}/{len(chunks)})"
-        r = requests.post(DISCORD_WEBHOOK, json={"content": part}, timeout=30)
-        r.raise_for_status()
+    # Queued durably; deliver_pending() sends it now or a later run does.
+    delivery.enqueue(content)
+
+def deliver_pending():
+    """Send everything in the outbox, including leftovers from failed runs."""
+    left = delivery.flush()
+    delivery.close()
+    print(f"Discord: {delivery.sent} message(s) sent, {delivery.rate_limited} rate-limited response(s).")
+    if left:
+        sys.exit(f"Discord: {left} message(s) still queued; retrying next run.")
 
 # 1) Fetch and filter commits
-items = fetch_commits(REPO, args.branch, since_iso, until_iso)
-items = [c for c in items if not is_merge(c)]
+items, batch = fetch_commits(args.branch)
+items = [c for c in items if not is_merge(c) and not is_sheet_commit(c)]
+code_commits = len(items)
+items += sheet_changes()
 items.sort(key=lambda c: (c.get("commit", {}).get("author", {}) or {}).get("date", ""))
 
 # 2) Build bullets (raw list for Discord) and header
 bullets = bullet_lines(items)
-header = f"**{REPO}** — branch **{args.branch}**\nCommits in last {args.hours:g}h: {len(bullets)}"
+period = f"from the last {args.hours:g} hours" if args.window else "since the last digest"
+header = (f"**{REPO}** — branch **{args.branch}**\n"
+          + (f"Commits in last {args.hours:g}h: " if args.window else "New commits: ") + str(code_commits)
+          + (f" · sheet changes: {len(bullets) - code_commits}" if len(bullets) > code_commits else ""))
 
 # 3) Summarize with OpenAI (optional)
-summary = summarize_with_openai(REPO, args.branch, args.hours, bullets)
+summary = summarize_with_openai(REPO, args.branch, period, items)
 
 # 4) Post to Discord: SUMMARY ONLY
 if not bullets:
     # No commits in this window — post nothing (or post a minimal note)
     # post_to_discord(f"{header}\n\n*(no commits in this window)*")
+    finish(batch)
+    deliver_pending()
     sys.exit(0)
 
 if summary:
@@ -151,4 +191,7 @@ else:
     # ...or post a short fallback message:
     post_to_discord(f"{header}\n\n*(AI summary unavailable this run)*")
 
+# The digest is in the outbox now, so the cursor may move past these commits.
+finish(batch)
+deliver_pending()
 print("Posted summary to Discord.")
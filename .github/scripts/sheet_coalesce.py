@@ -0,0 +1,239 @@
+# .github/scripts/sheet_coalesce.py
+"""
+Streaming edit coalescer for the sheet-change logs.
+
+The Apps Script logger writes one record (and one commit) per cell edit,
+so typing into a cell, fixing a typo and tidying up becomes a run of
+records.  ``EditCoalescer`` folds them back into meaningful changes:
+
+* consecutive edits to one cell by one user, each within ``quiet`` seconds
+  of the previous, become a single change from the first ``old`` to the
+  last ``new``.  An edit by someone else, or a pause longer than ``quiet``,
+  ends the run;
+* a run that ends where it started (typed then deleted, changed then
+  restored) is a no-op and is dropped.  ``None`` and ``""`` count as equal.
+
+It is incremental.  With a ``state_path``, ``poll`` reads only the lines
+appended since the last ``save``.  Runs still inside their quiet period stay
+open across calls, so a burst that straddles two cron runs is still
+reported once.  A per-file timestamp high-water mark keeps a rewritten log
+from replaying old edits.  Without a state path, each call coalesces from
+scratch (``--window`` reports, the CLI).
+
+    coalescer = EditCoalescer(quiet=120, state_path=".digest_state/coalescer.json")
+    for change in coalescer.poll(since=bootstrap_epoch):
+        print(change.describe())
+    coalescer.save()                    # once the changes are safely reported
+
+    python .github/scripts/sheet_coalesce.py --quiet 120
+"""
+import argparse
+import base64
+import hashlib
+import json
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from sheet_segments import WorkbookLog, log_size, open_log
+from sheetlog import LOG_DIR, SUFFIX, TAIL_CHECK, cell_of, read_edits, to_epoch, workbook_name
+
+CellKey = Tuple[str, str, int, int]      # (workbook, sheet, row, col)
+
+
+class Change(NamedTuple):
+    workbook: str
+    sheet: str
+    a1: str
+    user: Optional[str]
+    old: Optional[str]
+    new: Optional[str]
+    first_ts: str
+    last_ts: str
+    edits: int              # raw edits folded into this change
+
+    @property
+    def id(self) -> str:
+        """Stable id, used in place of a commit SHA by the digest."""
+        raw = json.dumps([self.workbook, self.sheet, self.a1, self.user, self.first_ts, self.last_ts])
+        return hashlib.sha1(raw.encode()).hexdigest()
+
+    def describe(self) -> str:
+        def show(v):
+            return "(empty)" if v in (None, "") else repr(v[:120])
+        burst = f" ({self.edits} edits)" if self.edits > 1 else ""
+        return f"{self.workbook} › {self.sheet}!{self.a1}: {show(self.old)} → {show(self.new)}{burst}"
+
+    def as_commit(self) -> Dict:
+        """Commit-shaped record, so the digest and summary treat it like any other entry."""
+        author = {"name": self.user or "unknown", "date": self.last_ts}
+        return {"sha": self.id, "html_url": "", "parents": [],
+                "commit": {"message": f"Sheet edit: {self.describe()}", "author": author, "committer": author}}
+
+
+def _same(a: Optional[str], b: Optional[str]) -> bool:
+    return (a or "") == (b or "")
+
+
+class _Run:
+    """Open run of edits to one cell by one user."""
+
+    __slots__ = ("a1", "user", "old", "new", "first_ts", "last_ts", "last", "edits")
+
+    def __init__(self, edit: dict, t: float):
+        self.a1 = edit.get("a1") or ""
+        self.user = edit.get("user")
+        self.old = edit.get("old")
+        self.new = edit.get("new")
+        self.first_ts = self.last_ts = edit["ts"]
+        self.last = t
+        self.edits = 1
+
+    def extend(self, edit: dict, t: float):
+        self.new = edit.get("new")
+        self.last_ts = edit["ts"]
+        self.last = t
+        self.edits += 1
+
+    def close(self, key: CellKey) -> Optional[Change]:
+        if _same(self.old, self.new):
+            return None
+        return Change(key[0], key[1], self.a1, self.user, self.old, self.new, self.first_ts, self.last_ts, self.edits)
+
+    def to_json(self, key: CellKey) -> list:
+        return [*key, self.a1, self.user, self.old, self.new, self.first_ts, self.last_ts, self.last, self.edits]
+
+    @classmethod
+    def from_json(cls, row: list) -> Tuple[CellKey, "_Run"]:
+        wb, sheet, r, c, a1, user, old, new, first_ts, last_ts, last, edits = row
+        run = cls({"a1": a1, "user": user, "old": old, "new": new, "ts": first_ts}, last)
+        run.last_ts, run.edits = last_ts, edits
+        return (wb, sheet, r, c), run
+
+
+class EditCoalescer:
+    def __init__(self, quiet: float = 120.0, logs: Path = LOG_DIR, state_path: Optional[Path] = None):
+        self.quiet = quiet                  # seconds of inactivity that end a run
+        self.logs = Path(logs)
+        self.state_path = Path(state_path) if state_path else None
+        self.open: Dict[CellKey, _Run] = {}
+        self.files: Dict[str, Dict] = {}    # log name -> {"offset", "tail", "hwm"}
+        self.edits_in = 0                   # raw edits consumed
+        self.noops = 0                      # runs dropped as round trips
+        if self.state_path and self.state_path.exists():
+            try:
+                data = json.loads(self.state_path.read_text())
+                self.files = data["files"]
+                self.open = dict(_Run.from_json(row) for row in data["open"])
+            except (OSError, ValueError, KeyError):
+                self.open, self.files = {}, {}
+
+    # --------------------------------------------------------
+    # Streaming core
+    # --------------------------------------------------------
+    def feed(self, workbook: str, edit: dict) -> List[Change]:
+        """Add one edit; returns the change it closed, if any (at most one)."""
+        t = to_epoch(edit["ts"])
+        row, col = cell_of(edit)
+        key = (workbook, edit["sheet"], row, col)
+        self.edits_in += 1
+        run = self.open.get(key)
+        if run is not None and run.user == edit.get("user") and t - run.last <= self.quiet:
+            run.extend(edit, t)
+            return []
+        self.open[key] = _Run(edit, t)
+        return self._closed(key, run)
+
+    def _closed(self, key: CellKey, run: Optional[_Run]) -> List[Change]:
+        if run is None:
+            return []
+        change = run.close(key)
+        if change is None:
+            self.noops += 1
+            return []
+        return [change]
+
+    def expire(self, now: float) -> List[Change]:
+        """Close every run that has been quiet for ``quiet`` seconds as of ``now``."""
+        out: List[Change] = []
+        for key in [k for k, run in self.open.items() if now - run.last > self.quiet]:
+            out += self._closed(key, self.open.pop(key))
+        return out
+
+    def flush(self) -> List[Change]:
+        """Close every open run, quiet or not."""
+        return self.expire(float("inf"))
+
+    # --------------------------------------------------------
+    # Log files
+    # --------------------------------------------------------
+    def _tail(self, path: Path, offset: int) -> bytes:
+        with open_log(path) as f:
+            f.seek(max(0, offset - TAIL_CHECK))
+            return f.read(min(offset, TAIL_CHECK))
+
+    def poll(self, since: Optional[float] = None, now: Optional[float] = None) -> List[Change]:
+        """
+        Read what was appended to every log, then close runs quiet as of
+        ``now`` (default: wall clock).  Logs seen for the first time start
+        at ``since`` (epoch seconds; default: their beginning).
+        """
+        out: List[Change] = []
+        for path in sorted(self.logs.glob("*" + SUFFIX)):
+            st = self.files.get(path.name)
+            if st is None:
+                # Rolled logs' time index skips the segments that end before ``since``.
+                offset = 0 if since is None else WorkbookLog(path).offset_for(int(since * 1000))
+                keep = (lambda t: since is None or t >= since)
+                hwm = 0.0
+            elif log_size(path) >= st["offset"] and \
+                    self._tail(path, st["offset"]) == base64.b64decode(st["tail"]):
+                offset, keep = st["offset"], (lambda t: True)
+                hwm = st["hwm"]
+            else:
+                print(f"{path.name} was rewritten; re-reading edits after its last one", file=sys.stderr)
+                hwm = st["hwm"]
+                offset, keep = 0, (lambda t, floor=hwm: t > floor)
+            chunk = read_edits(path, offset)
+            workbook = workbook_name(path)
+            for edit, _, _ in chunk.edits:
+                t = to_epoch(edit["ts"])
+                if keep(t):
+                    out += self.feed(workbook, edit)
+                    hwm = max(hwm, t)
+            self.files[path.name] = {"offset": chunk.end, "hwm": hwm,
+                                     "tail": base64.b64encode(self._tail(path, chunk.end)).decode()}
+        out += self.expire(time.time() if now is None else now)
+        return sorted(out, key=lambda c: c.first_ts)
+
+    def save(self):
+        if self.state_path is None:
+            return
+        self.state_path.parent.mkdir(parents=True, exist_ok=True)
+        data = {"quiet": self.quiet, "files": self.files,
+                "open": [run.to_json(key) for key, run in self.open.items()]}
+        tmp = self.state_path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(data, ensure_ascii=False))
+        os.replace(tmp, self.state_path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Coalesce the sheet-change logs into meaningful changes.")
+    parser.add_argument("--logs", type=Path, default=LOG_DIR)
+    parser.add_argument("--quiet", type=float, default=120.0, help="seconds between edits that still merge")
+    parser.add_argument("--since", help="ISO date/time (UTC) of the first edit to include")
+    parser.add_argument("--json", action="store_true", help="one JSON object per change")
+    args = parser.parse_args()
+
+    coalescer = EditCoalescer(args.quiet, args.logs)
+    changes = coalescer.poll(since=to_epoch(args.since)) + coalescer.flush()
+    for c in sorted(changes, key=lambda c: c.first_ts):
+        print(json.dumps(c._asdict(), ensure_ascii=False) if args.json else f"{c.last_ts[:16]}  {c.describe()}")
+    print(f"{coalescer.edits_in} edits -> {len(changes)} changes "
+          f"({coalescer.noops} round trips dropped, quiet {args.quiet:g} s)", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,556 @@
+# .github/scripts/sheet_search.py
+"""
+Full-text search over the ``old``/``new`` values of the sheet-change logs.
+
+Answers "when did the RF127R77 gearbox first show up in Part Specs?" without
+grepping every NDJSON file.  ``SheetSearch`` keeps an inverted index from
+terms to record ids in ``logs/.search/`` (or ``SHEET_SEARCH_DIR``).
+``refresh`` indexes only the lines appended since the last run.  As in
+``SheetLog``, a log that shrank or whose indexed bytes changed triggers a
+rebuild.
+
+Tokens are runs of letters and digits, which may be joined by ``-``,
+``.``, ``/`` or ``_`` so part numbers stay whole.  Matching ignores case.
+Each token is also indexed by its parts, and a token mixing letters and
+digits is also indexed with its separators removed.  Model codes are also
+indexed by their leading units, each unit being letters then digits, so the
+gear unit of a gearmotor code finds the whole code.  A query word looks up
+the first form listed:
+
+    "RF127R77DRN100LMA" -> rf127r77drn100lma, rf127, rf127r77, rf127r77drn100
+    "6204-2RS"          -> 62042rs, 6204-2rs, 6204, 2rs
+    "M8x1.25"           -> m8x125, m8x1.25, m8x1, 25, m8
+
+Queries AND their words together.  ``"quoted words"`` must appear
+consecutively in one value, and ``word*`` matches by prefix.  Results can be
+filtered by workbook, sheet, user, time window and field (``old``/``new``).
+They are change records, newest first, or oldest first with
+``oldest=True`` to find a first appearance.
+
+The index is a sorted term list over one concatenated postings array,
+plus a per-term delta for records added since.  ``save`` writes the base
+file (``base.pkl``) only after a rebuild or once the delta outgrows a
+quarter of it and gets folded in.  Otherwise it rewrites only
+``delta.pkl``, so a cron-sized refresh costs little more than the lines
+it reads.  Record ids follow ingest order.  Running max/min timestamps over the ids let time filters and
+ranking jump straight to the right ids, so a query reads from the logs only
+the records it returns, plus any phrase candidates it has to check.
+
+    index = SheetSearch()
+    index.refresh()
+    for edit in index.search("RF127R77", sheet="Cost Breakdown II", limit=5):
+        print(edit.ts, edit.a1, edit.new)
+    index.save()
+
+    python .github/scripts/sheet_search.py RF127R77 --oldest --limit 1
+"""
+import argparse
+import heapq
+import json
+import os
+import pickle
+import re
+import sys
+import time
+from array import array
+from bisect import bisect_left, bisect_right
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence, Set, Tuple
+
+from sheet_segments import log_size, open_log
+from sheetlog import LOG_DIR, SUFFIX, TAIL_CHECK, Edit, TimeLike, cell_of, read_edits, to_epoch, workbook_name
+
+SEARCH_DIR = Path(os.environ.get("SHEET_SEARCH_DIR", LOG_DIR / ".search"))
+BASE_FILE = "base.pkl"
+DELTA_FILE = "delta.pkl"
+FORMAT_VERSION = 2
+COMPACT_MIN = 100_000       # delta postings tolerated before save() compacts regardless of base size
+MAX_EXPANSIONS = 64         # prefix terms probed one by one before a non-driving clause becomes a set
+
+_WORD = re.compile(r"[^\W_]+(?:[-./_][^\W_]+)*")
+_SEP = re.compile(r"[-./_]")
+_QUOTED = re.compile(r'"([^"]*)"?|(\S+)')
+
+QueryWord = Tuple[str, bool]            # (term, is prefix)
+
+# Persisted attributes of SheetSearch.  The base file holds everything as of
+# the last compaction; the delta file holds _META, the records added since
+# (_RECORDS, plus the changed end of _lwm) and _delta.
+_META = ("_sources", "_names", "skipped")
+_RECORDS = ("_ts", "_hwm", "_src", "_start", "_len", "_wb", "_sheet", "_user")
+_POSTINGS = ("_terms", "_starts", "_rids")
+
+
+# ------------------------------------------------------------
+# Tokenizing
+# ------------------------------------------------------------
+def words(text: str) -> List[str]:
+    return _WORD.findall(text.casefold())
+
+
+def _leading_units(part: str) -> List[str]:
+    """Prefixes of a model code that end on a digit before a letter: rf127, rf127r77, ..."""
+    return [part[:i] for i in range(1, len(part))
+            if part[i - 1].isdigit() and part[i].isalpha() and not part[:i].isdigit()]
+
+
+def variants(word: str) -> List[str]:
+    """Index terms for one casefolded word; the first is the one a query looks up."""
+    parts = _SEP.split(word)
+    units = [u for p in parts for u in _leading_units(p)]
+    if len(parts) == 1:
+        return [word, *units]
+    joined = "".join(parts)
+    if not joined.isdigit() and any(ch.isdigit() for ch in joined):
+        return [joined, word, *parts, *units]
+    return [word, *parts, *units]
+
+
+def terms(text: str) -> Set[str]:
+    out: Set[str] = set()
+    for w in words(text):
+        out.update(variants(w))
+    return out
+
+
+def parse_query(query: str) -> List[List[QueryWord]]:
+    """Phrases of query words; an unquoted word is a phrase of one."""
+    phrases = []
+    for quoted, bare in _QUOTED.findall(query):
+        pieces = quoted.split() if quoted else [bare]
+        phrase: List[QueryWord] = []
+        for piece in pieces:
+            ws = words(piece)
+            phrase.extend((variants(w)[0], False) for w in ws)
+            if ws and piece.endswith("*"):
+                phrase[-1] = (phrase[-1][0], True)
+        if quoted:
+            phrases.append(phrase)
+        else:
+            phrases.extend([w] for w in phrase)
+    return [p for p in phrases if p]
+
+
+def _has(position: Set[str], term: str, prefix: bool) -> bool:
+    return term in position or (prefix and any(t.startswith(term) for t in position))
+
+
+def _contains(positions: List[Set[str]], phrase: List[QueryWord]) -> bool:
+    n = len(phrase)
+    return any(all(_has(positions[i + j], *phrase[j]) for j in range(n)) for i in range(len(positions) - n + 1))
+
+
+# ------------------------------------------------------------
+# Index
+# ------------------------------------------------------------
+class _Clause:
+    """Ids matching one query word: the union of one or more sorted posting lists."""
+
+    __slots__ = ("seqs", "size", "_set")
+
+    def __init__(self, seqs: List[Sequence[int]]):
+        self.seqs = seqs
+        self.size = sum(map(len, seqs))
+        self._set: Optional[Set[int]] = None
+
+    def __contains__(self, rid: int) -> bool:
+        if len(self.seqs) > MAX_EXPANSIONS:
+            if self._set is None:
+                self._set = set().union(*self.seqs)
+            return rid in self._set
+        for s in self.seqs:
+            i = bisect_left(s, rid)
+            if i < len(s) and s[i] == rid:
+                return True
+        return False
+
+    def ids(self, lo: int, hi: int, descending: bool) -> Iterator[int]:
+        """Ids in ``[lo, hi)``, each once, in the requested order."""
+        parts = []
+        for s in self.seqs:
+            part = s[bisect_left(s, lo):bisect_left(s, hi)]
+            parts.append(reversed(part) if descending else part)
+        if len(parts) == 1:
+            yield from parts[0]
+            return
+        last = None
+        for rid in heapq.merge(*parts, reverse=descending):
+            if rid != last:
+                yield rid
+                last = rid
+
+
+class SheetSearch:
+    def __init__(self, root: Path = LOG_DIR, index_dir: Path = SEARCH_DIR):
+        self.root = Path(root)
+        self.dir = Path(index_dir)
+        self._handles: Dict[int, object] = {}
+        self._reset()
+        self._load()
+
+    def _reset(self):
+        self.close()
+        self._sources: List[Dict] = []          # {"name", "workbook", "offset", "tail"} per log file
+        self._names: List[str] = []             # interned workbook / sheet / user names
+        self._name_id: Dict[str, int] = {}
+        # one entry per record, in ingest order
+        self._ts = array("d")
+        self._hwm = array("d")                  # max ts over ids <= i
+        self._lwm = array("d")                  # min ts over ids >= i
+        self._src = array("l")
+        self._start = array("q")                # byte span of the line in its file
+        self._len = array("l")
+        self._wb = array("l")
+        self._sheet = array("l")
+        self._user = array("l")
+        # postings of _terms[i] are _rids[_starts[i]:_starts[i + 1]]; newer ids are in _delta
+        self._terms: List[str] = []
+        self._starts = array("q", [0])
+        self._rids = array("l")
+        self._delta: Dict[str, array] = {}
+        self._delta_size = 0
+        self._delta_sorted: Optional[List[str]] = None
+        self._generation: Optional[str] = None  # of the base file these ids extend
+        self._base_n = 0                        # records covered by the base file
+        self._patched_from = 0                  # first id whose _lwm differs from the base file
+        self.skipped = 0                        # test / malformed lines
+        self.dirty = True
+
+    def _load(self):
+        try:
+            base = _read(self.dir / BASE_FILE)
+            if base.get("format") != FORMAT_VERSION:
+                return
+            for name in _META + _RECORDS + _POSTINGS + ("_lwm",):
+                setattr(self, name, base[name])
+            self._generation = base["generation"]
+        except (OSError, ValueError, KeyError, EOFError, pickle.UnpicklingError):
+            self._reset()
+            return
+        self._base_n = self._patched_from = len(self._ts)
+        try:
+            delta = _read(self.dir / DELTA_FILE)
+            current = delta.get("generation") == self._generation
+            meta, records, lwm_from, lwm = [delta[n] for n in _META], delta["records"], delta["lwm_from"], delta["lwm"]
+        except (OSError, ValueError, KeyError, EOFError, pickle.UnpicklingError):
+            current = False     # the base alone is a consistent, older state; refresh catches up
+        if current:
+            for name, value in zip(_META, meta):
+                setattr(self, name, value)
+            for name in _RECORDS:
+                getattr(self, name).extend(records[name])
+            del self._lwm[lwm_from:]
+            self._lwm.extend(lwm)
+            self._delta = delta["delta"]
+            self._patched_from = lwm_from
+        self._name_id = {n: i for i, n in enumerate(self._names)}
+        self._delta_size = sum(map(len, self._delta.values()))
+        self.dirty = False
+
+    def save(self):
+        """
+        Persist the index.  Usually only the delta file is written; the base
+        is rewritten after a rebuild or once the delta outgrows a quarter of it.
+        """
+        if self._generation is None or self._delta_size > max(COMPACT_MIN, len(self._rids) // 4):
+            self.compact()
+        if not self.dirty:
+            return
+        self.dir.mkdir(parents=True, exist_ok=True)
+        meta = {n: getattr(self, n) for n in _META}
+        if self._generation is None:
+            self._generation = os.urandom(8).hex()
+            _write(self.dir / BASE_FILE, {"format": FORMAT_VERSION, "generation": self._generation, **meta,
+                                          **{n: getattr(self, n) for n in _RECORDS + _POSTINGS + ("_lwm",)}})
+            self._base_n = self._patched_from = len(self._ts)
+        _write(self.dir / DELTA_FILE, {
+            "format": FORMAT_VERSION, "generation": self._generation, **meta,
+            "records": {n: getattr(self, n)[self._base_n:] for n in _RECORDS},
+            "lwm_from": self._patched_from, "lwm": self._lwm[self._patched_from:],
+            "delta": self._delta,
+        })
+        self.dirty = False
+
+    def close(self):
+        for f in self._handles.values():
+            f.close()
+        self._handles = {}
+
+    # --------------------------------------------------------
+    # Ingestion
+    # --------------------------------------------------------
+    def _intern(self, name: Optional[str]) -> int:
+        key = "" if name is None else name
+        i = self._name_id.get(key)
+        if i is None:
+            i = self._name_id[key] = len(self._names)
+            self._names.append(key)
+        return i
+
+    def _changed_under_us(self, src: Dict) -> bool:
+        path = self.root / src["name"]
+        try:
+            if log_size(path) < src["offset"]:
+                return True
+        except OSError:
+            return True
+        if src["tail"]:
+            with open_log(path) as f:
+                f.seek(src["offset"] - len(src["tail"]))
+                return f.read(len(src["tail"])) != src["tail"]
+        return False
+
+    def refresh(self) -> int:
+        """Index lines appended since the last call; returns how many edits were added."""
+        self.close()        # files may have been replaced (git checkout, contents API)
+        paths = sorted(self.root.glob("*" + SUFFIX))
+        present = {p.name for p in paths}
+        if any(s["name"] not in present or self._changed_under_us(s) for s in self._sources):
+            self._reset()
+        known = {s["name"] for s in self._sources}
+        for path in paths:
+            if path.name not in known:
+                self._sources.append({"name": path.name, "workbook": workbook_name(path), "offset": 0, "tail": b""})
+
+        batch = []
+        for si, src in enumerate(self._sources):
+            chunk = read_edits(self.root / src["name"], src["offset"])
+            self.skipped += chunk.skipped
+            src["tail"] = (src["tail"] + chunk.consumed)[-TAIL_CHECK:]
+            src["offset"] = chunk.end
+            batch.extend((to_epoch(d["ts"]), si, start, length, d) for d, start, length in chunk.edits)
+        batch.sort(key=lambda r: r[0])
+        for rec in batch:
+            self._add(*rec)
+        if batch:
+            self.dirty = True
+        return len(batch)
+
+    def _add(self, ts: float, si: int, start: int, length: int, d: dict):
+        rid = len(self._ts)
+        self._ts.append(ts)
+        self._hwm.append(max(ts, self._hwm[-1]) if rid else ts)
+        self._lwm.append(ts)
+        i = rid - 1
+        while i >= 0 and self._lwm[i] > ts:     # a late arrival lowers the minimum of every id before it
+            self._lwm[i] = ts
+            i -= 1
+        self._patched_from = min(self._patched_from, i + 1)
+        self._src.append(si)
+        self._start.append(start)
+        self._len.append(length)
+        self._wb.append(self._intern(self._sources[si]["workbook"]))
+        self._sheet.append(self._intern(d["sheet"]))
+        self._user.append(self._intern(d.get("user")))
+        found: Set[str] = set()
+        for field in ("old", "new"):
+            if d.get(field) is not None:
+                found |= terms(str(d[field]))
+        for term in found:
+            p = self._delta.get(term)
+            if p is None:
+                p = self._delta[term] = array("l")
+                self._delta_sorted = None
+            p.append(rid)
+        self._delta_size += len(found)
+
+    def compact(self):
+        """Fold the delta into the base postings."""
+        if not self._delta:
+            return
+        old, old_starts, old_rids = self._terms, self._starts, self._rids
+        new_terms = sorted(self._delta)
+        terms_out: List[str] = []
+        starts, rids = array("q", [0]), array("l")
+        i = 0
+        for term in new_terms:
+            # Copy the run of base terms before this one in one go.
+            k = bisect_left(old, term, i)
+            if k > i:
+                shift = len(rids) - old_starts[i]
+                rids.extend(old_rids[old_starts[i]:old_starts[k]])
+                starts.extend(s + shift for s in old_starts[i + 1:k + 1])
+                terms_out.extend(old[i:k])
+                i = k
+            if i < len(old) and old[i] == term:
+                rids.extend(old_rids[old_starts[i]:old_starts[i + 1]])
+                i += 1
+            rids.extend(self._delta[term])
+            terms_out.append(term)
+            starts.append(len(rids))
+        if i < len(old):
+            shift = len(rids) - old_starts[i]
+            rids.extend(old_rids[old_starts[i]:])
+            starts.extend(s + shift for s in old_starts[i + 1:])
+            terms_out.extend(old[i:])
+        self._terms, self._starts, self._rids = terms_out, starts, rids
+        self._delta, self._delta_size, self._delta_sorted = {}, 0, None
+        self._generation = None         # the base file no longer matches
+        self.dirty = True
+
+    # --------------------------------------------------------
+    # Record access
+    # --------------------------------------------------------
+    def __len__(self) -> int:
+        return len(self._ts)
+
+    def record(self, rid: int) -> Edit:
+        si = self._src[rid]
+        src = self._sources[si]
+        f = self._handles.get(si)
+        if f is None:
+            f = self._handles[si] = open_log(self.root / src["name"])
+        f.seek(self._start[rid])
+        d = json.loads(f.read(self._len[rid]))
+        row, col = cell_of(d)
+        return Edit(d["ts"], src["workbook"], d["sheet"], d.get("a1") or "", row, col,
+                    d.get("old"), d.get("new"), d.get("user"))
+
+    # --------------------------------------------------------
+    # Queries
+    # --------------------------------------------------------
+    def _postings(self, term: str) -> List[Sequence[int]]:
+        out: List[Sequence[int]] = []
+        i = bisect_left(self._terms, term)
+        if i < len(self._terms) and self._terms[i] == term:
+            out.append(memoryview(self._rids)[self._starts[i]:self._starts[i + 1]])
+        if term in self._delta:
+            out.append(self._delta[term])
+        return out
+
+    def _expand(self, prefix: str) -> List[Sequence[int]]:
+        end = prefix + "\U0010ffff"
+        view = memoryview(self._rids)
+        out: List[Sequence[int]] = [view[self._starts[i]:self._starts[i + 1]]
+                                    for i in range(bisect_left(self._terms, prefix), bisect_left(self._terms, end))]
+        if self._delta_sorted is None:
+            self._delta_sorted = sorted(self._delta)
+        keys = self._delta_sorted
+        out += [self._delta[keys[i]] for i in range(bisect_left(keys, prefix), bisect_left(keys, end))]
+        return out
+
+    def _id_range(self, t0: Optional[float], t1: Optional[float]) -> Tuple[int, int]:
+        """Ids outside the range cannot have a timestamp in ``[t0, t1]``."""
+        lo = 0 if t0 is None else bisect_left(self._hwm, t0)
+        hi = len(self._ts) if t1 is None else bisect_right(self._lwm, t1)
+        return lo, hi
+
+    def search(self, query: str, workbook: Optional[str] = None, sheet: Optional[str] = None,
+               user: Optional[str] = None, since: TimeLike = None, until: TimeLike = None,
+               field: Optional[str] = None, limit: int = 20, oldest: bool = False) -> List[Edit]:
+        """
+        Change records matching ``query``, newest first (oldest first with
+        ``oldest``).  ``field`` ("old" or "new") restricts matching to that
+        value; by default a word may be in either.
+        """
+        if field not in (None, "old", "new"):
+            raise ValueError(f"field must be 'old' or 'new', not {field!r}")
+        phrases = parse_query(query)
+        ids = {}
+        for kind, name in (("wb", workbook), ("sheet", sheet), ("user", user)):
+            if name is not None:
+                ids[kind] = self._name_id.get(name)
+                if ids[kind] is None:
+                    return []
+        if limit <= 0:
+            return []
+
+        clauses = []
+        for term, prefix in dict.fromkeys(w for p in phrases for w in p):
+            clause = _Clause(self._expand(term) if prefix else self._postings(term))
+            if clause.size == 0:
+                return []
+            clauses.append(clause)
+        clauses.sort(key=lambda c: c.size)
+
+        t0, t1 = to_epoch(since), to_epoch(until)
+        lo, hi = self._id_range(t0, t1)
+        if clauses:
+            driver, rest = clauses[0].ids(lo, hi, not oldest), clauses[1:]
+        else:
+            driver, rest = (range(lo, hi) if oldest else range(hi - 1, lo - 1, -1)), []
+        verify = field is not None or any(len(p) > 1 for p in phrases)
+        wb, sid, uid = ids.get("wb"), ids.get("sheet"), ids.get("user")
+
+        heap: List[tuple] = []          # (rank key, tiebreak, edit); smallest is the worst kept
+        for rid in driver:
+            if len(heap) >= limit:
+                # Nothing further along can outrank the worst result kept.
+                bound = -self._lwm[rid] if oldest else self._hwm[rid]
+                if bound < heap[0][0]:
+                    break
+            ts = self._ts[rid]
+            if (t0 is not None and ts < t0) or (t1 is not None and ts > t1):
+                continue
+            if (wb is not None and self._wb[rid] != wb) or (sid is not None and self._sheet[rid] != sid) \
+                    or (uid is not None and self._user[rid] != uid):
+                continue
+            if any(rid not in c for c in rest):
+                continue
+            edit = self.record(rid)
+            if verify and not _verify(edit, phrases, field):
+                continue
+            item = (-ts, -rid, edit) if oldest else (ts, rid, edit)
+            if len(heap) < limit:
+                heapq.heappush(heap, item)
+            elif item[:2] > heap[0][:2]:
+                heapq.heapreplace(heap, item)
+        return [edit for *_, edit in sorted(heap, key=lambda h: h[:2], reverse=True)]
+
+    def first(self, query: str, **filters) -> Optional[Edit]:
+        """Oldest record matching ``query``, e.g. when a part number first appeared."""
+        hits = self.search(query, limit=1, oldest=True, **filters)
+        return hits[0] if hits else None
+
+
+def _read(path: Path) -> dict:
+    with open(path, "rb") as f:
+        return pickle.load(f)
+
+
+def _write(path: Path, data: dict):
+    tmp = path.with_suffix(".tmp")
+    with open(tmp, "wb") as f:
+        pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp, path)
+
+
+def _verify(edit: Edit, phrases: List[List[QueryWord]], field: Optional[str]) -> bool:
+    values = [edit.new, edit.old] if field is None else [getattr(edit, field)]
+    positions = [[set(variants(w)) for w in words(str(v))] for v in values if v is not None]
+    return all(any(_contains(pos, phrase) for pos in positions) for phrase in phrases)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Full-text search over the sheet-change logs.")
+    parser.add_argument("query", help='words, "a phrase", prefix*; empty string lists recent edits')
+    parser.add_argument("--logs", type=Path, default=LOG_DIR)
+    parser.add_argument("--index-dir", type=Path, default=SEARCH_DIR)
+    parser.add_argument("--workbook")
+    parser.add_argument("--sheet")
+    parser.add_argument("--user")
+    parser.add_argument("--since", help="ISO date/time (UTC)")
+    parser.add_argument("--until", help="ISO date/time (UTC)")
+    parser.add_argument("--field", choices=("old", "new"))
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--oldest", action="store_true", help="oldest matches first (first appearance)")
+    parser.add_argument("--json", action="store_true", help="one JSON object per match")
+    args = parser.parse_args()
+
+    index = SheetSearch(args.logs, args.index_dir)
+    added = index.refresh()
+    index.save()
+    t0 = time.perf_counter()
+    hits = index.search(args.query, args.workbook, args.sheet, args.user, args.since, args.until,
+                        args.field, args.limit, args.oldest)
+    elapsed = (time.perf_counter() - t0) * 1e3
+    for e in hits:
+        if args.json:
+            print(json.dumps(e._asdict(), ensure_ascii=False))
+        else:
+            print(f"{e.ts[:19]}  {e.workbook} › {e.sheet}!{e.a1}  {e.old!r} → {e.new!r}  ({e.user or 'unknown'})")
+    print(f"{len(hits)} match(es) in {elapsed:.1f} ms; {len(index)} edits indexed ({added} new)", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
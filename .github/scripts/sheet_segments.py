@@ -0,0 +1,540 @@
+# .github/scripts/sheet_segments.py
+"""
+Segmented, compressed storage for the sheet-change logs.
+
+The Apps Script logger rewrites ``logs/<workbook>_changes.ndjson`` through
+GitHub's contents API on every edit.  Left alone, the file grows without
+bound, every range read scans it from the start, and repeated field names
+and emails make up most of its bytes.  ``roll`` seals the file's lines into
+compressed segments and leaves it as a short plain-NDJSON head, which the
+Apps Script keeps appending to unchanged:
+
+    logs/UATXcavators_Part_Specs_changes.ndjson           head, plain NDJSON
+    logs/segments/UATXcavators_Part_Specs_changes/
+        manifest.json                                     segments in order, current dictionary
+        dict-<id>.bin                                     shared compression dictionary
+        000001.seg, 000002.seg, ...
+
+A segment is a run of independently compressed blocks of whole lines,
+each about ``BLOCK_SIZE`` bytes.  All of a workbook's segments share one
+preset dictionary, taken from recent lines, so even small blocks compress
+their repeated keys, sheet names and emails.  The codec is zlib (stdlib,
+readable anywhere the scripts run) or zstd when ``zstandard`` is
+installed.  The segment footer lists every block's offsets and min/max
+timestamp: a sparse time index, so ``offset_for`` and ``read_range`` skip
+straight to the first block that can hold a given time.
+
+Readers see one logical byte stream per workbook: the segments' lines, then
+the head's, joined by newlines.  Rolling moves bytes from the head into a
+segment without changing that stream, so byte offsets and tail checks kept
+by ``SheetLog``, the snapshots, the coalescer and the search index stay
+valid across a roll, and migrating an existing file is just its first roll.
+``open_log`` and ``log_size`` give that stream, or the plain file for a
+workbook that was never rolled.
+
+A roll writes the segments and the manifest before it shortens the head.
+The manifest records the length and hash of the sealed bytes, so a head
+that still starts with them is read from after that point.  That happens after an
+interrupted roll, or after a merge that kept the remote head because the
+Apps Script committed meanwhile.
+
+    python .github/scripts/sheet_segments.py roll                  # seal heads past size / age
+    python .github/scripts/sheet_segments.py export "UATXcavators Part Specs" > part_specs.ndjson
+    python .github/scripts/sheet_segments.py export "Test BOMs" --since 2025-11-01 --until 2025-11-02
+"""
+import argparse
+import datetime as dt
+import hashlib
+import io
+import json
+import os
+import struct
+import sys
+import time
+import zlib
+from bisect import bisect_right
+from pathlib import Path
+from typing import BinaryIO, Dict, Iterator, List, Optional, Tuple
+
+try:
+    import zstandard
+except ImportError:         # zlib segments only
+    zstandard = None
+
+LOG_DIR = Path(os.environ.get("SHEET_LOG_DIR", Path(__file__).resolve().parents[2] / "logs"))
+SUFFIX = "_changes.ndjson"
+TAIL_CHECK = 64            # bytes before a read offset compared to detect rewritten logs
+
+SEGMENT_DIR = "segments"
+MANIFEST = "manifest.json"
+FORMAT_VERSION = 1
+BLOCK_SIZE = 16 * 1024              # uncompressed bytes per block: the time index's granularity
+SEGMENT_SIZE = 512 * 1024           # uncompressed bytes per segment, and the head size that triggers a roll
+MAX_AGE = 30 * 86400                # seconds: a head whose first edit is older than this is rolled too
+DICT_SIZE = 16 * 1024
+_MAGIC = b"SHEETSEG"
+_TRAILER = struct.Struct("<I8s")    # footer length, magic
+
+
+def workbook_name(path: Path) -> str:
+    name = path.name
+    stem = name[:-len(SUFFIX)] if name.endswith(SUFFIX) else path.stem
+    return stem.replace("_", " ")
+
+
+def _ts_ms(line: bytes) -> Optional[int]:
+    try:
+        ts = json.loads(line)["ts"]
+        return int(dt.datetime.fromisoformat(ts.replace("Z", "+00:00")).timestamp() * 1000)
+    except (ValueError, KeyError, TypeError):
+        return None
+
+
+def _iso_ms(t: Optional[str]) -> Optional[int]:
+    """CLI ``--since/--until`` (UTC if naive) -> epoch ms."""
+    if t is None:
+        return None
+    d = dt.datetime.fromisoformat(t.replace("Z", "+00:00"))
+    return int((d if d.tzinfo else d.replace(tzinfo=dt.timezone.utc)).timestamp() * 1000)
+
+
+# ------------------------------------------------------------
+# Codecs
+# ------------------------------------------------------------
+class Codec:
+    """Block compressor bound to one preset dictionary."""
+
+    def __init__(self, name: str, dictionary: bytes = b""):
+        if name == "zstd" and zstandard is None:
+            raise RuntimeError("zstd segments need the zstandard package (pip install zstandard)")
+        if name not in ("zlib", "zstd"):
+            raise ValueError(f"unknown codec {name!r}")
+        self.name = name
+        self.dictionary = dictionary
+        if name == "zstd":
+            zdict = zstandard.ZstdCompressionDict(dictionary, dict_type=zstandard.DICT_TYPE_RAWCONTENT) \
+                if dictionary else None
+            self._zc = zstandard.ZstdCompressor(level=19, dict_data=zdict)
+            self._zd = zstandard.ZstdDecompressor(dict_data=zdict)
+
+    def compress(self, data: bytes) -> bytes:
+        if self.name == "zstd":
+            return self._zc.compress(data)
+        c = zlib.compressobj(9, zdict=self.dictionary) if self.dictionary else zlib.compressobj(9)
+        return c.compress(data) + c.flush()
+
+    def decompress(self, data: bytes) -> bytes:
+        if self.name == "zstd":
+            return self._zd.decompress(data)
+        d = zlib.decompressobj(zdict=self.dictionary) if self.dictionary else zlib.decompressobj()
+        return d.decompress(data) + d.flush()
+
+
+def build_dictionary(lines: List[bytes], size: int = DICT_SIZE) -> bytes:
+    """Raw-content dictionary: the most recent lines, newest last (closest, so cheapest to reference)."""
+    out: List[bytes] = []
+    total = 0
+    for line in reversed(lines):
+        if total + len(line) + 1 > size:
+            break
+        out.append(line)
+        total += len(line) + 1
+    return b"\n".join(reversed(out))
+
+
+# ------------------------------------------------------------
+# Segment files
+# ------------------------------------------------------------
+def write_segment(path: Path, lines: List[bytes], codec: Codec, dict_id: Optional[str],
+                  block_size: int = BLOCK_SIZE) -> Dict:
+    """
+    Write ``lines`` (no newlines) as one segment; returns its manifest entry.
+    The segment's content is the lines joined by newlines; blocks split it at
+    line ends.
+    """
+    blocks, body = [], []
+    coff = uoff = 0
+    i = 0
+    while i < len(lines):
+        j, size = i, 0
+        while j < len(lines) and (j == i or size + len(lines[j]) + 1 <= block_size):
+            size += len(lines[j]) + 1
+            j += 1
+        raw = b"\n".join(lines[i:j]) + (b"\n" if j < len(lines) else b"")
+        stamps = [t for t in map(_ts_ms, lines[i:j]) if t is not None]
+        packed = codec.compress(raw)
+        blocks.append([coff, len(packed), uoff, len(raw), min(stamps, default=None), max(stamps, default=None)])
+        body.append(packed)
+        coff += len(packed)
+        uoff += len(raw)
+        i = j
+    stamps = [b[4] for b in blocks if b[4] is not None] + [b[5] for b in blocks if b[5] is not None]
+    footer = {"format": FORMAT_VERSION, "codec": codec.name, "dict": dict_id, "length": uoff,
+              "lines": len(lines), "min_ts": min(stamps, default=None), "max_ts": max(stamps, default=None),
+              "blocks": blocks}
+    meta = json.dumps(footer, separators=(",", ":")).encode()
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "wb") as f:
+        f.writelines(body)
+        f.write(meta)
+        f.write(_TRAILER.pack(len(meta), _MAGIC))
+    os.replace(tmp, path)
+    return {"name": path.name, "length": uoff, "lines": len(lines), "bytes": coff + len(meta) + _TRAILER.size,
+            "min_ts": footer["min_ts"], "max_ts": footer["max_ts"]}
+
+
+def read_footer(path: Path) -> Dict:
+    with open(path, "rb") as f:
+        f.seek(-_TRAILER.size, os.SEEK_END)
+        length, magic = _TRAILER.unpack(f.read(_TRAILER.size))
+        if magic != _MAGIC:
+            raise ValueError(f"{path} is not a log segment")
+        f.seek(-_TRAILER.size - length, os.SEEK_END)
+        footer = json.loads(f.read(length))
+    if footer.get("format") != FORMAT_VERSION:
+        raise ValueError(f"{path}: unsupported segment format {footer.get('format')!r}")
+    return footer
+
+
+# ------------------------------------------------------------
+# One workbook's log
+# ------------------------------------------------------------
+class WorkbookLog:
+    """A workbook's change log: sealed segments, then the plain NDJSON head."""
+
+    def __init__(self, head: Path):
+        self.head = Path(head)
+        self.dir = self.head.parent / SEGMENT_DIR / self.head.name[:-len(".ndjson")]
+        try:
+            self.manifest = json.loads((self.dir / MANIFEST).read_text())
+        except (OSError, ValueError):
+            self.manifest = {"format": FORMAT_VERSION, "segments": [], "dict": None, "sealed": None}
+        self._codecs: Dict[Tuple[str, Optional[str]], Codec] = {}
+
+    @property
+    def segments(self) -> List[Dict]:
+        return self.manifest["segments"]
+
+    def segments_length(self) -> int:
+        """Logical bytes before the head: each segment's content plus its newline."""
+        return sum(s["length"] + 1 for s in self.segments)
+
+    def head_start(self, raw: Optional[bytes] = None) -> int:
+        """Offset of the unsealed part of the head file (non-zero only while it still holds sealed bytes)."""
+        sealed = self.manifest.get("sealed")
+        if not sealed:
+            return 0
+        end = sealed["end"]
+        if raw is None:
+            try:
+                if self.head.stat().st_size < end:
+                    return 0            # trimmed, the usual case: no read needed
+                with open(self.head, "rb") as f:
+                    raw = f.read(end)
+            except OSError:
+                return 0
+        prefix = raw[:end]
+        return end + 1 if len(prefix) == end and hashlib.sha1(prefix).hexdigest() == sealed["sha1"] else 0
+
+    def size(self) -> int:
+        try:
+            head = self.head.stat().st_size
+        except OSError:
+            head = 0
+        start = self.head_start()
+        return self.segments_length() + max(0, head - start)
+
+    def codec(self, name: str, dict_id: Optional[str]) -> Codec:
+        key = (name, dict_id)
+        if key not in self._codecs:
+            dictionary = (self.dir / f"dict-{dict_id}.bin").read_bytes() if dict_id else b""
+            self._codecs[key] = Codec(name, dictionary)
+        return self._codecs[key]
+
+    def open(self) -> BinaryIO:
+        """The logical stream, positioned at 0."""
+        if not self.segments:
+            return open(self.head, "rb")
+        return io.BufferedReader(_LogicalStream(self), buffer_size=BLOCK_SIZE)
+
+    # --------------------------------------------------------
+    # Time index
+    # --------------------------------------------------------
+    def offset_for(self, since_ms: int) -> int:
+        """
+        Logical offset of the first block that may hold an edit at or after
+        ``since_ms``; everything before it is older.
+        """
+        base = 0
+        for seg in self.segments:
+            if seg["max_ts"] is not None and seg["max_ts"] >= since_ms:
+                for coff, clen, uoff, ulen, lo, hi in read_footer(self.dir / seg["name"])["blocks"]:
+                    if hi is not None and hi >= since_ms:
+                        return base + uoff
+            base += seg["length"] + 1
+        return base
+
+    def read_range(self, since_ms: Optional[int] = None, until_ms: Optional[int] = None) -> Iterator[bytes]:
+        """Lines with ``since <= ts <= until``, decompressing only blocks whose time span overlaps."""
+        def wanted(line: bytes) -> bool:
+            t = _ts_ms(line)
+            return t is not None and (since_ms is None or t >= since_ms) and (until_ms is None or t <= until_ms)
+
+        for seg in self.segments:
+            if (since_ms is not None and (seg["max_ts"] or 0) < since_ms) or \
+                    (until_ms is not None and seg["min_ts"] is not None and seg["min_ts"] > until_ms):
+                continue
+            path = self.dir / seg["name"]
+            footer = read_footer(path)
+            codec = self.codec(footer["codec"], footer["dict"])
+            with open(path, "rb") as f:
+                for coff, clen, uoff, ulen, lo, hi in footer["blocks"]:
+                    if (since_ms is not None and (hi or 0) < since_ms) or \
+                            (until_ms is not None and lo is not None and lo > until_ms):
+                        continue
+                    f.seek(coff)
+                    for line in codec.decompress(f.read(clen)).split(b"\n"):
+                        if line.strip() and wanted(line):
+                            yield line
+        with open(self.head, "rb") as f:
+            f.seek(self.head_start())
+            for line in f.read().split(b"\n"):
+                if line.strip() and wanted(line):
+                    yield line
+
+    # --------------------------------------------------------
+    # Rolling
+    # --------------------------------------------------------
+    def due(self, content: bytes, max_bytes: int, max_age: float, now: float) -> bool:
+        if len(content) >= max_bytes:
+            return True
+        first = next((t for t in map(_ts_ms, content.split(b"\n", 16)[:16]) if t is not None), None)
+        return first is not None and first / 1000.0 < now - max_age
+
+    def roll(self, max_bytes: int = SEGMENT_SIZE, max_age: float = MAX_AGE, codec: str = "zlib",
+             block_size: int = BLOCK_SIZE, force: bool = False, new_dict: bool = False,
+             now: Optional[float] = None) -> List[Dict]:
+        """
+        Seal the head's complete lines into segments of at most ``max_bytes``
+        if it is that large, its first edit is older than ``max_age`` seconds,
+        or ``force``.  Returns the new segments' manifest entries.
+        """
+        raw = self.head.read_bytes()
+        start = self.head_start(raw)
+        content = raw[start:]
+        lines = content.split(b"\n")
+        if lines and _ts_ms(lines[-1]) is None and lines[-1].strip():
+            lines.pop()         # half-written or malformed last line stays in the head
+        while lines and not lines[-1].strip():
+            lines.pop()
+        if not lines or not (force or self.due(content, max_bytes, max_age, time.time() if now is None else now)):
+            return []
+        sealed_len = len(b"\n".join(lines))
+
+        self.dir.mkdir(parents=True, exist_ok=True)
+        dict_id = self.manifest.get("dict")
+        if dict_id is None or new_dict:
+            # Sized to the content: a dictionary bigger than what it compresses is a loss.
+            dictionary = build_dictionary(lines, min(DICT_SIZE, sealed_len // 8))
+            dict_id = hashlib.sha1(dictionary).hexdigest()[:12] if dictionary else None
+            if dict_id:
+                (self.dir / f"dict-{dict_id}.bin").write_bytes(dictionary)
+            self.manifest["dict"] = dict_id
+        comp = self.codec(codec, dict_id)
+
+        new: List[Dict] = []
+        seq = len(self.segments)
+        i = 0
+        while i < len(lines):
+            j, size = i, 0
+            while j < len(lines) and (j == i or size + len(lines[j]) + 1 <= max_bytes):
+                size += len(lines[j]) + 1
+                j += 1
+            seq += 1
+            new.append(write_segment(self.dir / f"{seq:06d}.seg", lines[i:j], comp, dict_id, block_size))
+            i = j
+
+        end = start + sealed_len
+        self.manifest["segments"] = self.segments + new
+        self.manifest["sealed"] = {"end": end, "sha1": hashlib.sha1(raw[:end]).hexdigest()}
+        _replace(self.dir / MANIFEST, json.dumps(self.manifest, indent=1).encode())
+        _replace(self.head, raw[end + 1:])
+        return new
+
+    def export(self, out: BinaryIO):
+        """Write the whole log as plain NDJSON (what the single file would hold, had it never been rolled)."""
+        with self.open() as f:
+            pending = b""
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                out.write(pending + chunk[:-1])
+                pending = chunk[-1:]
+            if pending != b"\n":
+                out.write(pending)
+
+
+def _replace(path: Path, data: bytes):
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_bytes(data)
+    os.replace(tmp, path)
+
+
+class _LogicalStream(io.RawIOBase):
+    """Read-only view of segments + head as one byte stream."""
+
+    def __init__(self, log: WorkbookLog):
+        self.log = log
+        self.starts: List[int] = []
+        pos = 0
+        for seg in log.segments:
+            self.starts.append(pos)
+            pos += seg["length"] + 1
+        self.head_base = pos
+        self.head_start = log.head_start()
+        self._fh = open(log.head, "rb")
+        self._footers: Dict[int, Dict] = {}
+        self._uoffs: Dict[int, List[int]] = {}     # block start offsets per segment
+        self._seg_fh: Dict[int, BinaryIO] = {}
+        self._block: Tuple[int, int, bytes] = (-1, -1, b"")
+        self.pos = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def fileno(self) -> int:
+        return self._fh.fileno()        # the head's, so fstat() sees a replaced file
+
+    def tell(self) -> int:
+        return self.pos
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_CUR:
+            offset += self.pos
+        elif whence == io.SEEK_END:
+            offset += self.head_base + max(0, os.fstat(self._fh.fileno()).st_size - self.head_start)
+        self.pos = max(0, offset)
+        return self.pos
+
+    def _footer(self, i: int) -> Dict:
+        if i not in self._footers:
+            self._footers[i] = read_footer(self.log.dir / self.log.segments[i]["name"])
+            self._uoffs[i] = [blk[2] for blk in self._footers[i]["blocks"]]
+            self._seg_fh[i] = open(self.log.dir / self.log.segments[i]["name"], "rb")
+        return self._footers[i]
+
+    def _decoded(self, i: int, j: int) -> bytes:
+        if self._block[:2] != (i, j):
+            footer = self._footer(i)
+            coff, clen = footer["blocks"][j][:2]
+            f = self._seg_fh[i]
+            f.seek(coff)
+            data = self.log.codec(footer["codec"], footer["dict"]).decompress(f.read(clen))
+            self._block = (i, j, data)
+        return self._block[2]
+
+    def readinto(self, b) -> int:
+        if not len(b):
+            return 0
+        if self.pos >= self.head_base:
+            self._fh.seek(self.head_start + self.pos - self.head_base)
+            n = self._fh.readinto(b)
+            self.pos += n
+            return n
+        i = bisect_right(self.starts, self.pos) - 1
+        rel = self.pos - self.starts[i]
+        if rel == self.log.segments[i]["length"]:
+            b[0] = 0x0A                 # the newline joining this segment to the next part
+            self.pos += 1
+            return 1
+        self._footer(i)
+        j = bisect_right(self._uoffs[i], rel) - 1
+        uoff = self._uoffs[i][j]
+        data = self._decoded(i, j)
+        n = min(len(b), len(data) - (rel - uoff))
+        b[:n] = data[rel - uoff:rel - uoff + n]
+        self.pos += n
+        return n
+
+    def close(self):
+        if not self.closed:
+            self._fh.close()
+            for f in self._seg_fh.values():
+                f.close()
+        super().close()
+
+
+# ------------------------------------------------------------
+# Readers' entry points
+# ------------------------------------------------------------
+def _segmented(path: Path) -> bool:
+    return (Path(path).parent / SEGMENT_DIR / Path(path).name[:-len(".ndjson")] / MANIFEST).exists()
+
+
+def open_log(path: Path) -> BinaryIO:
+    """Binary reader over a change log's logical stream (the plain file if it was never rolled)."""
+    return WorkbookLog(path).open() if _segmented(path) else open(path, "rb")
+
+
+def log_size(path: Path) -> int:
+    """Logical size of a change log; raises OSError if its head is gone."""
+    path = Path(path)
+    if not _segmented(path):
+        return path.stat().st_size
+    path.stat()
+    return WorkbookLog(path).size()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Roll the sheet-change logs into compressed segments, or export them.")
+    parser.add_argument("--logs", type=Path, default=LOG_DIR)
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    p = sub.add_parser("roll", help="seal heads that are over the size or age limit")
+    p.add_argument("--max-bytes", type=int, default=SEGMENT_SIZE)
+    p.add_argument("--max-age-days", type=float, default=MAX_AGE / 86400)
+    p.add_argument("--block-size", type=int, default=BLOCK_SIZE)
+    p.add_argument("--codec", choices=("zlib", "zstd"), default="zlib")
+    p.add_argument("--force", action="store_true", help="seal every head regardless of size and age")
+    p.add_argument("--new-dict", action="store_true", help="rebuild the shared dictionary from the sealed lines")
+    p = sub.add_parser("export", help="plain NDJSON to stdout")
+    p.add_argument("workbook", help='e.g. "UATXcavators Part Specs"')
+    p.add_argument("--since", help="ISO date/time (UTC)")
+    p.add_argument("--until", help="ISO date/time (UTC)")
+    sub.add_parser("stats")
+    args = parser.parse_args()
+
+    heads = sorted(args.logs.glob("*" + SUFFIX))
+    if args.cmd == "export":
+        head = next((h for h in heads if workbook_name(h) == args.workbook), None)
+        if head is None:
+            sys.exit(f"no change log for workbook {args.workbook!r} in {args.logs}")
+        log = WorkbookLog(head)
+        out = sys.stdout.buffer
+        if args.since or args.until:
+            for line in log.read_range(_iso_ms(args.since), _iso_ms(args.until)):
+                out.write(line + b"\n")
+        else:
+            log.export(out)
+        return
+    for head in heads:
+        log = WorkbookLog(head)
+        if args.cmd == "roll":
+            new = log.roll(args.max_bytes, args.max_age_days * 86400, args.codec, args.block_size,
+                           args.force, args.new_dict)
+            if new:
+                raw, packed = sum(s["length"] for s in new), sum(s["bytes"] for s in new)
+                print(f"{workbook_name(head)}: sealed {sum(s['lines'] for s in new)} lines into {len(new)} "
+                      f"segment(s), {raw:,} -> {packed:,} bytes ({packed / raw:.0%})")
+        else:
+            segs = log.segments
+            print(json.dumps({"workbook": workbook_name(head), "segments": len(segs),
+                              "sealed_bytes": sum(s["length"] for s in segs),
+                              "stored_bytes": sum(s["bytes"] for s in segs),
+                              "dict_bytes": sum(p.stat().st_size for p in log.dir.glob("dict-*.bin")),
+                              "head_bytes": log.size() - log.segments_length(),
+                              "dict": log.manifest.get("dict")}))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,261 @@
+# .github/scripts/sheet_snapshots.py
+"""
+Materialized sheet contents from the change logs, with checkpoints.
+
+Replaying a workbook's whole ``logs/<workbook>_changes.ndjson`` to learn
+what a cell holds gets slower with every edit.  ``WorkbookSnapshots``
+periodically writes a checkpoint: the latest value of every non-empty
+(sheet, row, col) plus the byte offset of the log it covers.  A rebuild
+loads the newest checkpoint and applies only the lines after its offset,
+so its cost follows the number of cells and recent edits, not log length.
+
+Point-in-time reads ("sheet as of 2025-11-02") start from the newest
+checkpoint taken before that time and replay forward until the first edit
+after it.  Logs are appended in edit order, so that is where the scan
+stops.
+
+Checkpoints live in ``logs/.checkpoints/<workbook>/`` (or
+``SHEET_CHECKPOINT_DIR``) as ``<offset>-<last ts ms>.json.gz``.  Each one
+stores the last bytes before its offset.  If the log was rewritten and
+those bytes no longer match, the workbook's checkpoints are dropped and
+rebuilt.
+
+    snaps = WorkbookSnapshots.for_workbook("UATXcavators Part Specs")
+    state = snaps.current()             # writes a checkpoint every `every` edits
+    state.sheet("Cost Breakdown II")    # {"A1": "termi", ...}
+    snaps.as_of("2025-11-02").value("Cost Breakdown II", "J10")
+
+    python .github/scripts/sheet_snapshots.py "UATXcavators Part Specs" --as-of 2025-11-02
+"""
+import argparse
+import base64
+import gzip
+import json
+import os
+import re
+from pathlib import Path
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from sheet_segments import open_log
+from sheetlog import LOG_DIR, SUFFIX, TAIL_CHECK, TimeLike, cell_of, iter_edits, parse_a1, read_edits, to_epoch, workbook_name
+
+CHECKPOINT_DIR = Path(os.environ.get("SHEET_CHECKPOINT_DIR", LOG_DIR / ".checkpoints"))
+FORMAT_VERSION = 1
+_NAME = re.compile(r"^(\d+)-(\d+)\.json\.gz$")
+
+Cell = Tuple[str, int, int]             # (sheet, row, col)
+
+
+class Checkpoint(NamedTuple):
+    path: Path
+    offset: int                         # log bytes covered
+    ts: float                           # last edit applied, epoch seconds
+
+
+class SheetState:
+    """Latest value per cell; cleared cells are dropped."""
+
+    __slots__ = ("cells", "offset", "ts", "edits")
+
+    def __init__(self, cells: Optional[Dict[Cell, tuple]] = None, offset: int = 0,
+                 ts: float = 0.0, edits: int = 0):
+        self.cells: Dict[Cell, tuple] = {} if cells is None else cells   # -> (a1, value, ts, user)
+        self.offset = offset
+        self.ts = ts
+        self.edits = edits              # edits applied since the start of the log
+
+    def apply(self, edit: dict, ts: float):
+        sheet = edit["sheet"]
+        row, col = cell_of(edit)
+        value = edit.get("new")
+        if value is None or value == "":
+            self.cells.pop((sheet, row, col), None)
+        else:
+            self.cells[(sheet, row, col)] = (edit.get("a1") or "", value, edit["ts"], edit.get("user"))
+        self.ts = ts
+        self.edits += 1
+
+    def copy(self) -> "SheetState":
+        return SheetState(dict(self.cells), self.offset, self.ts, self.edits)
+
+    def value(self, sheet: str, cell) -> Optional[str]:
+        row, col = parse_a1(cell) if isinstance(cell, str) else cell
+        hit = self.cells.get((sheet, row, col))
+        return None if hit is None else hit[1]
+
+    def sheets(self) -> List[str]:
+        return sorted({s for s, _, _ in self.cells})
+
+    def sheet(self, name: str) -> Dict[str, str]:
+        """A1 -> value for one sheet, in row-major order."""
+        return {v[0]: v[1] for (s, _, _), v in sorted(self.cells.items()) if s == name}
+
+    def grid(self, name: str) -> List[List[Optional[str]]]:
+        keys = [(r, c) for (s, r, c) in self.cells if s == name]
+        if not keys:
+            return []
+        rows, cols = max(r for r, _ in keys), max(c for _, c in keys)
+        out = [[None] * cols for _ in range(rows)]
+        for r, c in keys:
+            out[r - 1][c - 1] = self.cells[(name, r, c)][1]
+        return out
+
+    def __len__(self) -> int:
+        return len(self.cells)
+
+
+class WorkbookSnapshots:
+    def __init__(self, log_path: Path, root: Path = CHECKPOINT_DIR, every: int = 5000, keep: int = 20):
+        self.log_path = Path(log_path)
+        self.workbook = workbook_name(self.log_path)
+        self.dir = Path(root) / self.workbook.replace(" ", "_")
+        self.every = every                 # new checkpoint after this many edits
+        self.keep = keep                   # checkpoints retained per workbook
+        self._state: Optional[SheetState] = None   # kept for incremental current()
+        self._tail = b""                           # log bytes just before _state.offset
+        self._checkpointed = 0                     # edits covered by the newest checkpoint
+
+    @classmethod
+    def for_workbook(cls, name: str, logs: Path = LOG_DIR, **kwargs) -> "WorkbookSnapshots":
+        for path in sorted(Path(logs).glob("*" + SUFFIX)):
+            if workbook_name(path) == name:
+                return cls(path, **kwargs)
+        raise KeyError(f"no change log for workbook {name!r} in {logs}")
+
+    # --------------------------------------------------------
+    # Checkpoint files
+    # --------------------------------------------------------
+    def checkpoints(self) -> List[Checkpoint]:
+        """Checkpoints on disk, oldest first (parsed from file names only)."""
+        out = []
+        if self.dir.is_dir():
+            for p in self.dir.iterdir():
+                m = _NAME.match(p.name)
+                if m:
+                    out.append(Checkpoint(p, int(m.group(1)), int(m.group(2)) / 1000.0))
+        return sorted(out, key=lambda c: c.offset)
+
+    def _log_tail(self, offset: int) -> bytes:
+        with open_log(self.log_path) as f:
+            f.seek(max(0, offset - TAIL_CHECK))
+            return f.read(min(offset, TAIL_CHECK))
+
+    def _load(self, cp: Checkpoint) -> Optional[SheetState]:
+        """The checkpoint's state, or None if it no longer matches the log."""
+        try:
+            with gzip.open(cp.path, "rt", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if data.get("format") != FORMAT_VERSION:
+            return None
+        if base64.b64decode(data["tail"]) != self._log_tail(data["offset"]):
+            return None
+        cells = {(s, r, c): (a1, v, ts, user) for s, r, c, a1, v, ts, user in data["cells"]}
+        return SheetState(cells, data["offset"], data["ts"], data["edits"])
+
+    def write_checkpoint(self, state: SheetState) -> Checkpoint:
+        self.dir.mkdir(parents=True, exist_ok=True)
+        cp = Checkpoint(self.dir / f"{state.offset:012d}-{int(state.ts * 1000)}.json.gz", state.offset, state.ts)
+        payload = {
+            "format": FORMAT_VERSION,
+            "workbook": self.workbook,
+            "log": self.log_path.name,
+            "offset": state.offset,
+            "tail": base64.b64encode(self._log_tail(state.offset)).decode("ascii"),
+            "ts": state.ts,
+            "edits": state.edits,
+            "cells": [[s, r, c, *v] for (s, r, c), v in sorted(state.cells.items())],
+        }
+        tmp = cp.path.with_name(cp.path.name + ".tmp")
+        with gzip.open(tmp, "wt", encoding="utf-8", compresslevel=6) as f:
+            json.dump(payload, f, ensure_ascii=False, separators=(",", ":"))
+        os.replace(tmp, cp.path)
+        self.prune()
+        return cp
+
+    def prune(self):
+        """Keep the newest ``keep`` checkpoints."""
+        for cp in self.checkpoints()[:-self.keep or None]:
+            cp.path.unlink(missing_ok=True)
+
+    def _drop_all(self):
+        for cp in self.checkpoints():
+            cp.path.unlink(missing_ok=True)
+
+    def _base(self, candidates: Iterable[Checkpoint]) -> SheetState:
+        """Newest loadable checkpoint among ``candidates`` (newest first), else empty."""
+        for cp in candidates:
+            state = self._load(cp)
+            if state is not None:
+                return state
+            # Log rewritten under us: every checkpoint is suspect.
+            self._drop_all()
+            break
+        return SheetState()
+
+    # --------------------------------------------------------
+    # Reads
+    # --------------------------------------------------------
+    def _replay(self, state: SheetState) -> SheetState:
+        chunk = read_edits(self.log_path, state.offset)
+        for edit, _, _ in chunk.edits:
+            state.apply(edit, to_epoch(edit["ts"]))
+        state.offset = chunk.end
+        return state
+
+    def _replay_until(self, state: SheetState, until: float) -> SheetState:
+        for edit, start, end in iter_edits(self.log_path, state.offset):
+            ts = to_epoch(edit["ts"])
+            if ts > until:
+                state.offset = start
+                break
+            state.apply(edit, ts)
+            state.offset = end
+        return state
+
+    def current(self, checkpoint: bool = True) -> SheetState:
+        """
+        Contents as of the end of the log.  Later calls in the same process
+        apply only newly appended lines.  Returns a private copy.
+        """
+        state = self._state
+        if state is None or self._log_tail(state.offset) != self._tail:
+            state = self._base(reversed(self.checkpoints()))
+            self._checkpointed = state.edits
+        state = self._replay(state)
+        if checkpoint and state.edits - self._checkpointed >= self.every:
+            self.write_checkpoint(state)
+            self._checkpointed = state.edits
+        self._state = state
+        self._tail = self._log_tail(state.offset)
+        return state.copy()
+
+    def as_of(self, t: TimeLike) -> SheetState:
+        """Contents including every edit at or before ``t``."""
+        until = to_epoch(t)
+        earlier = [c for c in self.checkpoints() if c.ts <= until]
+        return self._replay_until(self._base(reversed(earlier)), until)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Current or historical sheet contents from the change logs.")
+    parser.add_argument("workbook", help='e.g. "UATXcavators Part Specs"')
+    parser.add_argument("--logs", type=Path, default=LOG_DIR)
+    parser.add_argument("--checkpoints", type=Path, default=CHECKPOINT_DIR)
+    parser.add_argument("--sheet", help="only this sheet")
+    parser.add_argument("--as-of", help="ISO date/time (UTC); default: now")
+    parser.add_argument("--every", type=int, default=5000, help="edits between checkpoints")
+    parser.add_argument("--checkpoint", action="store_true", help="write a checkpoint now")
+    args = parser.parse_args()
+
+    snaps = WorkbookSnapshots.for_workbook(args.workbook, args.logs, root=args.checkpoints, every=args.every)
+    state = snaps.as_of(args.as_of) if args.as_of else snaps.current()
+    if args.checkpoint and not args.as_of:
+        print(f"wrote {snaps.write_checkpoint(state).path}")
+    for sheet in [args.sheet] if args.sheet else state.sheets():
+        print(json.dumps({"sheet": sheet, "cells": state.sheet(sheet)}, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
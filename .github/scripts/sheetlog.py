@@ -0,0 +1,447 @@
+# .github/scripts/sheetlog.py
+"""
+Incremental reader and query index for the sheet-change logs in logs/.
+
+Each ``logs/<workbook>_changes.ndjson`` holds one JSON object per edit:
+``{"ts", "sheet", "a1", "row", "col", "old", "new", "user"}`` (plus the
+odd ``{"ts", "test": true}`` line from the Apps Script self-test, which is
+skipped).  The workbook name comes from the file name, underscores as
+spaces, so "UATXcavators_Part_Specs_changes.ndjson" is workbook
+"UATXcavators Part Specs".
+
+``SheetLog.refresh()`` remembers how many bytes of every file it has
+consumed and parses only what was appended since.  If a file shrinks or
+its already-read bytes change, the index is rebuilt from scratch.  The
+Apps Script writer omits the final newline, so an unterminated last line
+counts as complete once it parses as JSON.  Logs rolled into compressed
+segments (sheet_segments.py) are read through ``open_log`` as one logical
+stream, whose offsets do not change when a roll happens.
+
+Per record the index keeps timestamps, interned ids and the byte span of
+the line in compact arrays.  Time-sorted posting lists exist per cell,
+sheet, user and overall.  ``old``/``new`` are read back from the file
+only for the records a query returns.
+
+    log = SheetLog()                    # logs/ next to the repo root
+    log.refresh()
+    log.current("Cost Breakdown II", "J10")
+    log.history("Cost Breakdown II", "J10", workbook="UATXcavators Part Specs")
+    log.edits_by("someone@example.com", since="2025-11-01", until="2025-11-02")
+
+    python .github/scripts/sheetlog.py current "Cost Breakdown II" J10
+"""
+import argparse
+import datetime as dt
+import json
+import os
+import re
+from array import array
+from bisect import bisect_left, bisect_right
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple, Union
+
+from sheet_segments import LOG_DIR, SUFFIX, TAIL_CHECK, log_size, open_log, workbook_name
+
+TimeLike = Union[None, float, str, dt.datetime, dt.date]
+_A1 = re.compile(r"^\$?([A-Za-z]+)\$?(\d+)$")
+
+
+class Edit(NamedTuple):
+    ts: str                 # ISO timestamp as logged
+    workbook: str
+    sheet: str
+    a1: str
+    row: int
+    col: int
+    old: Optional[str]
+    new: Optional[str]
+    user: Optional[str]
+
+
+def parse_a1(a1: str) -> Tuple[int, int]:
+    """("J10") -> (row 10, col 10)."""
+    m = _A1.match(a1.strip())
+    if not m:
+        raise ValueError(f"not an A1 cell reference: {a1!r}")
+    col = 0
+    for ch in m.group(1).upper():
+        col = col * 26 + ord(ch) - 64
+    return int(m.group(2)), col
+
+
+def to_epoch(t: TimeLike) -> Optional[float]:
+    """Seconds since the epoch; naive datetimes and dates are taken as UTC."""
+    if t is None or isinstance(t, (int, float)):
+        return t
+    if isinstance(t, str):
+        t = dt.datetime.fromisoformat(t.replace("Z", "+00:00"))
+    elif not isinstance(t, dt.datetime):
+        t = dt.datetime(t.year, t.month, t.day)
+    if t.tzinfo is None:
+        t = t.replace(tzinfo=dt.timezone.utc)
+    return t.timestamp()
+
+
+def cell_of(edit: dict) -> Tuple[int, int]:
+    row, col = edit.get("row"), edit.get("col")
+    if row is None or col is None:
+        return parse_a1(edit["a1"])
+    return int(row), int(col)
+
+
+class Chunk(NamedTuple):
+    edits: List[Tuple[dict, int, int]]      # (record, byte offset, line length)
+    end: int                                # offset just past the last complete line
+    consumed: bytes                         # the bytes between the start offset and ``end``
+    skipped: int                            # test / malformed lines
+
+
+def read_edits(path: Path, offset: int = 0) -> Chunk:
+    """Parse every complete edit line of ``path`` from byte ``offset`` on."""
+    with open_log(path) as f:
+        f.seek(offset)
+        data = f.read()
+    edits = []
+    skipped = 0
+    pos = 0
+    end = len(data)
+    while pos < end:
+        nl = data.find(b"\n", pos)
+        line_end = end if nl < 0 else nl
+        line = data[pos:line_end]
+        if line.strip():
+            try:
+                d = json.loads(line)
+            except ValueError:
+                if nl < 0:
+                    break       # writer is mid-line; pick it up next time
+                d = None
+            if d is None or d.get("test") or "sheet" not in d:
+                skipped += 1
+            else:
+                edits.append((d, offset + pos, len(line)))
+        pos = end if nl < 0 else nl + 1
+    return Chunk(edits, offset + pos, data[:pos], skipped)
+
+
+def iter_edits(path: Path, offset: int = 0) -> Iterator[Tuple[dict, int, int]]:
+    """
+    Lazy ``read_edits`` for scans that stop early: yields
+    ``(edit, start, end)`` byte ranges, stopping at a half-written last line.
+    """
+    with open_log(path) as f:
+        f.seek(offset)
+        pos = offset
+        for line in f:
+            start, pos = pos, pos + len(line)
+            if not line.strip():
+                continue
+            try:
+                d = json.loads(line)
+            except ValueError:
+                if not line.endswith(b"\n"):
+                    return
+                continue
+            if not d.get("test") and "sheet" in d:
+                yield d, start, pos
+
+
+class _Postings:
+    """Record ids kept in (ts, id) order, with a parallel ts array for bisection."""
+
+    __slots__ = ("ts", "ids")
+
+    def __init__(self):
+        self.ts = array("d")
+        self.ids = array("l")
+
+    def add(self, ts: float, rid: int):
+        if not self.ts or ts >= self.ts[-1]:
+            self.ts.append(ts)
+            self.ids.append(rid)
+        else:
+            # Late arrival (another file's older edits): keep the order.
+            i = bisect_right(self.ts, ts)
+            self.ts.insert(i, ts)
+            self.ids.insert(i, rid)
+
+    def window(self, t0: Optional[float], t1: Optional[float]) -> array:
+        lo = 0 if t0 is None else bisect_left(self.ts, t0)
+        hi = len(self.ts) if t1 is None else bisect_right(self.ts, t1)
+        return self.ids[lo:hi]
+
+    def last_at_or_before(self, t: Optional[float]) -> Optional[int]:
+        hi = len(self.ts) if t is None else bisect_right(self.ts, t)
+        return self.ids[hi - 1] if hi else None
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+
+class _Source:
+    __slots__ = ("path", "workbook", "wb_id", "offset", "tail", "_fh", "_ino")
+
+    def __init__(self, path: Path, workbook: str, wb_id: int):
+        self.path = path
+        self.workbook = workbook
+        self.wb_id = wb_id
+        self.offset = 0
+        self.tail = b""
+        self._fh = None
+        self._ino = None
+
+    def read(self, start: int, length: int) -> bytes:
+        """Bytes of an already-indexed line, through a handle kept open between queries."""
+        if self._fh is None:
+            self._fh = open_log(self.path)
+            self._ino = os.fstat(self._fh.fileno()).st_ino
+        self._fh.seek(start)
+        return self._fh.read(length)
+
+    def reopen_if_replaced(self, ino: int):
+        # git checkouts and the GitHub contents API replace the file; the old
+        # handle would keep showing the old inode.
+        if self._fh is not None and ino != self._ino:
+            self.close()
+
+    def close(self):
+        if self._fh is not None:
+            self._fh.close()
+            self._fh = None
+
+
+class SheetLog:
+    def __init__(self, root: Path = LOG_DIR, pattern: str = "*" + SUFFIX):
+        self.root = Path(root)
+        self.pattern = pattern
+        self._reset()
+
+    def _reset(self):
+        for src in getattr(self, "_source_list", ()):
+            src.close()
+        self._sources: Dict[Path, _Source] = {}
+        self._source_list: List[_Source] = []
+        self._names: List[str] = []             # interned workbook / sheet / user names
+        self._name_id: Dict[str, int] = {}
+        # one entry per record
+        self._ts = array("d")
+        self._src = array("l")
+        self._start = array("q")                # byte span of the line in its file
+        self._len = array("l")
+        self._wb = array("l")
+        self._sheet = array("l")
+        self._user = array("l")
+        self._row = array("l")
+        self._col = array("l")
+        # postings
+        self._by_cell: Dict[Tuple[int, int, int, int], _Postings] = {}
+        self._by_sheet: Dict[Tuple[int, int], _Postings] = {}
+        self._by_user: Dict[int, _Postings] = {}
+        self._all = _Postings()
+        self._sheet_wbs: Dict[int, set] = {}    # sheet id -> workbook ids
+        self.skipped = 0                        # test / malformed lines
+
+    # --------------------------------------------------------
+    # Ingestion
+    # --------------------------------------------------------
+    def _intern(self, name: Optional[str]) -> int:
+        key = "" if name is None else name
+        i = self._name_id.get(key)
+        if i is None:
+            i = self._name_id[key] = len(self._names)
+            self._names.append(key)
+        return i
+
+    def _changed_under_us(self, src: _Source) -> bool:
+        try:
+            st = src.path.stat()
+            size = log_size(src.path)
+        except OSError:
+            return True
+        src.reopen_if_replaced(st.st_ino)
+        if size < src.offset:
+            return True
+        if src.tail:
+            with open_log(src.path) as f:
+                f.seek(src.offset - len(src.tail))
+                return f.read(len(src.tail)) != src.tail
+        return False
+
+    def refresh(self) -> int:
+        """Parse lines appended since the last call; returns how many edits were added."""
+        paths = sorted(self.root.glob(self.pattern))
+        present = set(paths)
+        if any(p not in present or self._changed_under_us(s) for p, s in self._sources.items()):
+            self._reset()
+        for path in paths:
+            if path not in self._sources:
+                src = _Source(path, workbook_name(path), self._intern(workbook_name(path)))
+                self._sources[path] = src
+                self._source_list.append(src)
+
+        batch = []
+        for si, src in enumerate(self._source_list):
+            batch.extend(self._read_new(si, src))
+        batch.sort(key=lambda r: r[0])
+        for rec in batch:
+            self._add(*rec)
+        return len(batch)
+
+    def _read_new(self, si: int, src: _Source) -> List[tuple]:
+        chunk = read_edits(src.path, src.offset)
+        self.skipped += chunk.skipped
+        src.tail = (src.tail + chunk.consumed)[-TAIL_CHECK:]
+        src.offset = chunk.end
+        out = []
+        for d, start, length in chunk.edits:
+            row, col = cell_of(d)
+            out.append((to_epoch(d["ts"]), si, start, length, src.wb_id,
+                        self._intern(d["sheet"]), self._intern(d.get("user")), row, col))
+        return out
+
+    def _add(self, ts, si, start, length, wb, sheet, user, row, col):
+        rid = len(self._ts)
+        self._ts.append(ts)
+        self._src.append(si)
+        self._start.append(start)
+        self._len.append(length)
+        self._wb.append(wb)
+        self._sheet.append(sheet)
+        self._user.append(user)
+        self._row.append(row)
+        self._col.append(col)
+        for index, key in ((self._by_cell, (wb, sheet, row, col)), (self._by_sheet, (wb, sheet)),
+                           (self._by_user, user)):
+            p = index.get(key)
+            if p is None:
+                p = index[key] = _Postings()
+            p.add(ts, rid)
+        self._all.add(ts, rid)
+        self._sheet_wbs.setdefault(sheet, set()).add(wb)
+
+    # --------------------------------------------------------
+    # Record access
+    # --------------------------------------------------------
+    def __len__(self) -> int:
+        return len(self._ts)
+
+    def record(self, rid: int) -> Edit:
+        src = self._source_list[self._src[rid]]
+        d = json.loads(src.read(self._start[rid], self._len[rid]))
+        return Edit(d["ts"], src.workbook, d["sheet"], d.get("a1") or "", self._row[rid], self._col[rid],
+                    d.get("old"), d.get("new"), d.get("user"))
+
+    def records(self, rids: Iterable[int]) -> List[Edit]:
+        return [self.record(r) for r in rids]
+
+    def timestamp(self, rid: int) -> float:
+        return self._ts[rid]
+
+    # --------------------------------------------------------
+    # Queries
+    # --------------------------------------------------------
+    def _name(self, name: Optional[str]) -> Optional[int]:
+        return self._name_id.get("" if name is None else name)
+
+    def _cell_postings(self, sheet: str, cell: Union[str, Tuple[int, int]],
+                       workbook: Optional[str]) -> List[_Postings]:
+        sid = self._name(sheet)
+        if sid is None:
+            return []
+        row, col = parse_a1(cell) if isinstance(cell, str) else cell
+        wbs = self._sheet_wbs.get(sid, ()) if workbook is None else [self._name(workbook)]
+        return [p for wb in wbs if (p := self._by_cell.get((wb, sid, row, col))) is not None]
+
+    def current(self, sheet: str, cell: Union[str, Tuple[int, int]], workbook: Optional[str] = None,
+                at: TimeLike = None) -> Optional[Edit]:
+        """Latest edit of the cell (at or before ``at``); ``.new`` is its value."""
+        t = to_epoch(at)
+        best = None
+        for p in self._cell_postings(sheet, cell, workbook):
+            rid = p.last_at_or_before(t)
+            if rid is not None and (best is None or self._ts[rid] >= self._ts[best]):
+                best = rid
+        return None if best is None else self.record(best)
+
+    def history(self, sheet: str, cell: Union[str, Tuple[int, int]], workbook: Optional[str] = None,
+                since: TimeLike = None, until: TimeLike = None) -> List[Edit]:
+        t0, t1 = to_epoch(since), to_epoch(until)
+        rids = [r for p in self._cell_postings(sheet, cell, workbook) for r in p.window(t0, t1)]
+        return self.records(sorted(rids, key=self._ts.__getitem__))
+
+    def edits_by(self, user: Optional[str], since: TimeLike = None, until: TimeLike = None) -> List[Edit]:
+        uid = self._name(user)
+        p = self._by_user.get(uid) if uid is not None else None
+        return [] if p is None else self.records(p.window(to_epoch(since), to_epoch(until)))
+
+    def edits(self, sheet: Optional[str] = None, workbook: Optional[str] = None,
+              since: TimeLike = None, until: TimeLike = None) -> List[Edit]:
+        """Edits in a time window, optionally for one sheet and/or workbook."""
+        t0, t1 = to_epoch(since), to_epoch(until)
+        if sheet is None:
+            rids = self._all.window(t0, t1)
+            if workbook is not None:
+                wb = self._name(workbook)
+                rids = [r for r in rids if self._wb[r] == wb]
+            return self.records(rids)
+        sid = self._name(sheet)
+        wbs = self._sheet_wbs.get(sid, ()) if workbook is None else [self._name(workbook)]
+        rids = [r for wb in wbs if (p := self._by_sheet.get((wb, sid))) for r in p.window(t0, t1)]
+        return self.records(sorted(rids, key=self._ts.__getitem__))
+
+    def workbooks(self) -> List[str]:
+        return [s.workbook for s in self._source_list]
+
+    def sheets(self, workbook: Optional[str] = None) -> List[str]:
+        wb = None if workbook is None else self._name(workbook)
+        return sorted({self._names[s] for (w, s) in self._by_sheet if wb is None or w == wb})
+
+    def users(self) -> List[Optional[str]]:
+        return sorted((self._names[u] or None for u in self._by_user), key=lambda u: u or "")
+
+
+# ------------------------------------------------------------
+# CLI
+# ------------------------------------------------------------
+def main():
+    parser = argparse.ArgumentParser(description="Query the sheet-change logs.")
+    parser.add_argument("--logs", type=Path, default=LOG_DIR)
+    parser.add_argument("--workbook")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    for name in ("current", "history"):
+        p = sub.add_parser(name)
+        p.add_argument("sheet")
+        p.add_argument("cell", help="A1 reference, e.g. J10")
+    p = sub.add_parser("by-user")
+    p.add_argument("user")
+    for p in (sub.choices["current"], sub.choices["history"], p, sub.add_parser("edits")):
+        p.add_argument("--since")
+        p.add_argument("--until")
+    sub.choices["edits"].add_argument("--sheet")
+    sub.add_parser("stats")
+    args = parser.parse_args()
+
+    log = SheetLog(args.logs)
+    log.refresh()
+    if args.cmd == "current":
+        rows = [log.current(args.sheet, args.cell, args.workbook, at=args.until)]
+    elif args.cmd == "history":
+        rows = log.history(args.sheet, args.cell, args.workbook, args.since, args.until)
+    elif args.cmd == "by-user":
+        rows = log.edits_by(args.user or None, args.since, args.until)
+    elif args.cmd == "edits":
+        rows = log.edits(args.sheet, args.workbook, args.since, args.until)
+    else:
+        print(json.dumps({
+            "edits": len(log),
+            "skipped": log.skipped,
+            "workbooks": {w: log.sheets(w) for w in log.workbooks()},
+            "users": log.users(),
+        }, indent=2))
+        return
+    for r in rows:
+        print(json.dumps(None if r is None else r._asdict(), ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,171 @@
+# .github/scripts/summary_cache.py
+"""
+Cached AI summaries for poll_commits.py.
+
+A digest is keyed by a hash of (sorted commit SHAs, prompt template
+version, model): a rerun over the same commits, or an overlapping window
+that selects the same set, reuses the stored text and makes no call.
+
+One completion returns the digest and a one-line description of each new
+commit, as JSON.  The one-liners are cached per (SHA, version, model), so a
+later digest over a larger or shifted set describes the commits it already
+knows with those short lines instead of raw commit text.  That keeps
+prompts short, and a miss is still exactly one call.
+
+Entries live in one JSON file in ``DIGEST_STATE_DIR`` and are evicted least
+recently used first once the store exceeds ``max_entries`` or
+``max_bytes`` of text.
+
+    summarizer = CommitSummarizer(complete, SummaryStore(), model="gpt-4.1-mini")
+    text = summarizer.summarize(repo, branch, "since the last digest", commits)
+"""
+import hashlib
+import json
+import os
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+from github_fetch import STATE_DIR
+
+PROMPT_VERSION = 2
+SUMMARY_FILE = "summaries.json"
+MAX_COMMITS = 25          # commits described in one prompt, as before
+
+TEMPLATE = (
+    "You are a release-notes assistant. Summarize recent GitHub commits for {repo} "
+    "on branch '{branch}' {period}. "
+    "Write 2–5 concise sentences for non-developers. "
+    "Group by themes (features, fixes, refactors), avoid file paths/SHAs, and keep it neutral.\n\n"
+    "Also, if spreadsheet edit JSON entries are provided, summarize the change in plain English "
+    "(who edited, which sheet/cell, and what the new text says). Focus on the description of the change "
+    "rather than the technical cell coordinates.\n\n"
+    "Reply with JSON only, in the form "
+    '{{"summary": "<the 2–5 sentences>", "commits": {{"<id>": "<one plain-English line>"}}}}, '
+    "with a \"commits\" entry for every commit marked NEW.\n\n"
+    "Commits:\n{lines}"
+)
+
+
+def _key(*parts) -> str:
+    return hashlib.sha256(json.dumps(parts, separators=(",", ":")).encode()).hexdigest()
+
+
+def digest_key(shas: List[str], model: str, version: int = PROMPT_VERSION) -> str:
+    return _key("digest", sorted(shas), version, model)
+
+
+def commit_key(sha: str, model: str, version: int = PROMPT_VERSION) -> str:
+    return _key("commit", sha, version, model)
+
+
+class SummaryStore:
+    """Persistent, size-bounded LRU of key -> text."""
+
+    def __init__(self, path: Path = STATE_DIR / SUMMARY_FILE, max_entries: int = 5000,
+                 max_bytes: int = 2_000_000):
+        self.path = Path(path)
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.entries: "OrderedDict[str, str]" = OrderedDict()   # oldest first
+        try:
+            for key, text in json.loads(self.path.read_text()):
+                self.entries[key] = text
+        except (OSError, ValueError):
+            pass
+        self.size = sum(len(t.encode()) for t in self.entries.values())
+        self.dirty = False
+
+    def get(self, key: str) -> Optional[str]:
+        text = self.entries.get(key)
+        if text is not None:
+            self.entries.move_to_end(key)
+            self.dirty = True        # recency changed
+        return text
+
+    def put(self, key: str, text: str):
+        old = self.entries.pop(key, None)
+        if old is not None:
+            self.size -= len(old.encode())
+        self.entries[key] = text
+        self.size += len(text.encode())
+        while self.entries and (len(self.entries) > self.max_entries or self.size > self.max_bytes):
+            _, evicted = self.entries.popitem(last=False)
+            self.size -= len(evicted.encode())
+        self.dirty = True
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def save(self):
+        if not self.dirty:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(list(self.entries.items()), ensure_ascii=False, separators=(",", ":")))
+        os.replace(tmp, self.path)
+        self.dirty = False
+
+
+def commit_line(commit: Dict) -> str:
+    c = commit.get("commit", {}) or {}
+    msg = ((c.get("message") or "").splitlines() or [""])[0][:200]
+    author = (c.get("author", {}) or {}).get("name", "unknown")
+    return f"{msg} — {author}"
+
+
+class CommitSummarizer:
+    def __init__(self, complete: Callable[[str, int], str], store: SummaryStore, model: str):
+        self.complete = complete      # complete(prompt, max_output_tokens) -> text
+        self.store = store
+        self.model = model
+        self.calls = 0                # completions requested
+        self.hits = 0                 # digests served from the store
+
+    def prompt(self, repo: str, branch: str, period: str, commits: List[Dict]) -> Tuple[str, int]:
+        """The prompt, and how many commits it marks NEW (no cached line yet)."""
+        lines = []
+        new = 0
+        for c in commits:
+            sha = c.get("sha", "")
+            known = self.store.get(commit_key(sha, self.model))
+            if known is None:
+                new += 1
+                known = "NEW " + commit_line(c)
+            lines.append(f"[{sha[:7]}] {known}")
+        return TEMPLATE.format(repo=repo, branch=branch, period=period, lines="\n".join(lines)), new
+
+    def summarize(self, repo: str, branch: str, period: str, commits: List[Dict]) -> str:
+        """Digest text for ``commits`` (oldest first); raises whatever ``complete`` raises."""
+        commits = commits[:MAX_COMMITS]
+        if not commits:
+            return ""
+        key = digest_key([c.get("sha", "") for c in commits], self.model)
+        cached = self.store.get(key)
+        if cached is not None:
+            self.hits += 1
+            return cached
+
+        prompt, new = self.prompt(repo, branch, period, commits)
+        self.calls += 1
+        reply = self.complete(prompt, 250 + 40 * new)
+        summary = self._absorb(reply, commits)
+        self.store.put(key, summary)
+        return summary
+
+    def _absorb(self, reply: str, commits: List[Dict]) -> str:
+        """Store the reply's per-commit lines and return its summary."""
+        text = reply.strip()
+        if text.startswith("```"):
+            text = text.strip("`").removeprefix("json").strip()
+        try:
+            data = json.loads(text)
+            summary = str(data["summary"]).strip()
+        except (ValueError, KeyError, TypeError):
+            return reply.strip()       # plain prose: still a usable digest
+        by_prefix = {c.get("sha", "")[:7]: c.get("sha", "") for c in commits}
+        for short, line in (data.get("commits") or {}).items():
+            sha = by_prefix.get(str(short).strip("[]")[:7])
+            if sha and isinstance(line, str) and line.strip():
+                self.store.put(commit_key(sha, self.model), line.strip())
+        return summary
@@ -0,0 +1,214 @@
+"""
+Process-wide acquisition engine.
+
+One background thread polls pluggable signal sources at a fixed rate and
+hands every sample to the registered sinks (telemetry stores, histories).
+Streamlit reruns never sample; they only read snapshots, so the sampling
+rate is independent of page load and of how many browser tabs are open.
+
+Start it once per server process from a ``st.cache_resource`` function.
+"""
+import random
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional
+
+import perf
+from catalog import DATA_PATH, get_catalog
+from device_state import FIELDS, DeviceTable
+
+# Sink signature: sink(t_epoch_seconds, values)
+Sink = Callable[[float, Dict[str, float]], None]
+
+
+def load_devices(path: Path = DATA_PATH) -> DeviceTable:
+    """Runtime device table keyed by label, in catalog order."""
+    return DeviceTable.from_catalog(get_catalog(path))
+
+
+# ------------------------------------------------------------
+# Sources
+# ------------------------------------------------------------
+class SignalSource:
+    """
+    A source reads one sample per engine cycle. It may update the runtime
+    fields of ``devices`` in place and returns any channel values to log.
+    Called from the engine thread without the engine lock, on a private
+    copy of the device table; the fields it changed are written back under
+    the lock once every source has been polled.
+    """
+
+    name = "source"
+
+    def poll(self, devices: DeviceTable, now: float) -> Dict[str, float]:
+        raise NotImplementedError
+
+
+class SimulatedSource(SignalSource):
+    """
+    Simple simulation: if a device is ON, give it a random-ish current.
+    Also simulate one process pressure and enclosure temp.
+    """
+
+    name = "simulated"
+
+    # label -> (current A, speed RPM, torque Nm) ranges while ON
+    PROFILES = {
+        "Cutter Head Motor": ((8.0, 15.0), (300.0, 600.0), (150.0, 400.0)),
+        "Screw Jack": ((3.0, 6.0), (5.0, 15.0), (50.0, 200.0)),
+    }
+
+    def poll(self, devices: DeviceTable, now: float) -> Dict[str, float]:
+        for label, (cur, spd, trq) in self.PROFILES.items():
+            state = devices[label]
+            if state["on"]:
+                state["current"] = round(random.uniform(*cur), 2)
+                state["speed"] = round(random.uniform(*spd), 1)
+                state["torque"] = round(random.uniform(*trq), 1)
+            else:
+                state["current"] = 0.0
+                state["speed"] = 0.0
+                state["torque"] = 0.0
+
+        return {
+            "cutterhead_current": devices["Cutter Head Motor"]["current"],
+            "jack_current": devices["Screw Jack"]["current"],
+            "pressure": round(random.uniform(1.0, 5.0), 2),        # bar
+            "enclosure_temp": round(random.uniform(25.0, 45.0), 1),  # °C
+        }
+
+
+class SetpointSource(SignalSource):
+    """Reports operator setpoints: each device's current (0 when OFF) plus the total."""
+
+    name = "setpoints"
+
+    def poll(self, devices: DeviceTable, now: float) -> Dict[str, float]:
+        currents = devices.effective_current()
+        values = dict(zip(devices.labels, currents.tolist()))
+        values["total_current"] = float(currents.sum())
+        return values
+
+
+# ------------------------------------------------------------
+# Engine
+# ------------------------------------------------------------
+def _write_back(target: DeviceTable, before: DeviceTable, after: DeviceTable):
+    """
+    Copy into ``target`` the entries a poll changed from ``before`` to
+    ``after``.  Operator commands that landed on ``target`` during the poll
+    are kept unless a source wrote the same entry.
+    """
+    for field in FIELDS:
+        new = getattr(after, field)
+        changed = getattr(before, field) != new
+        if changed.any():
+            getattr(target, field)[changed] = new[changed]
+
+
+class AcquisitionEngine:
+    def __init__(self, sources: Iterable[SignalSource], rate_hz: float = 1.0,
+                 devices: Optional[DeviceTable] = None, sinks: Iterable[Sink] = ()):
+        self.devices = load_devices() if devices is None else devices
+        self.sources: List[SignalSource] = list(sources)
+        self.sinks: List[Sink] = list(sinks)
+        self.lock = threading.Lock()
+        self.seq = 0               # samples taken
+        self.last_values: Dict[str, float] = {}
+        self.last_sample_at: Optional[float] = None
+        self.overruns = 0          # cycles that took longer than the period
+        self.max_lateness = 0.0    # worst wake-up delay vs schedule, seconds
+        self._period = 1.0 / rate_hz
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    # --------------------------------------------------------
+    # Lifecycle
+    # --------------------------------------------------------
+    @property
+    def rate_hz(self) -> float:
+        return 1.0 / self._period
+
+    def set_rate(self, rate_hz: float):
+        self._period = 1.0 / rate_hz
+
+    def add_sink(self, sink: Sink):
+        with self.lock:
+            self.sinks.append(sink)
+
+    def start(self) -> "AcquisitionEngine":
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="tbm-acquisition", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self, timeout: float = 2.0):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def _run(self):
+        deadline = time.monotonic()
+        last_tick = None
+        while not self._stop.is_set():
+            tick = time.monotonic()
+            lateness = tick - deadline
+            self.max_lateness = max(self.max_lateness, lateness)
+            if last_tick is not None and perf.enabled():
+                # Tick-to-tick jitter: how far the interval strays from the period.
+                perf.record("acquisition.tick_jitter", abs(tick - last_tick - self._period))
+            last_tick = tick
+            self.sample()
+            deadline += self._period
+            remaining = deadline - time.monotonic()
+            if remaining < 0:
+                # Fell behind: skip missed slots instead of bursting to catch up.
+                self.overruns += 1
+                deadline = time.monotonic()
+                remaining = 0
+            self._stop.wait(remaining)
+
+    def sample(self):
+        """Take one sample from every source and push it to the sinks."""
+        now = time.time()
+        # Poll outside the lock so UI reads and commands never wait on a
+        # source (field-bus I/O can take up to its timeout).
+        with self.lock:
+            before = self.devices.copy()
+        devices = before.copy()
+        values: Dict[str, float] = {}
+        with perf.section("acquisition.poll"):
+            for source in self.sources:
+                values.update(source.poll(devices, now))
+        with self.lock:
+            _write_back(self.devices, before, devices)
+            with perf.section("acquisition.sinks"):
+                for sink in self.sinks:
+                    sink(now, values)
+            self.last_values = values
+            self.last_sample_at = now
+            self.seq += 1
+
+    # --------------------------------------------------------
+    # UI side
+    # --------------------------------------------------------
+    def command(self, label: str, **fields):
+        """Apply operator commands (``on``, ``current``, ...) to a device."""
+        with self.lock:
+            self.devices[label].update(fields)
+
+    def snapshot(self) -> DeviceTable:
+        """Private copy of the device table, safe to read during a rerun."""
+        with self.lock:
+            return self.devices.copy()
+
+    def read(self, fn: Callable[[], object]):
+        """Run ``fn`` under the engine lock, e.g. to copy a chart frame out of a sink."""
+        with self.lock:
+            return fn()
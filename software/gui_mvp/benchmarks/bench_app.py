@@ -0,0 +1,259 @@
+"""
+Headless load test of the dashboard scripts.
+
+Every scenario runs in a fresh subprocess, which drives tbm_gui_advanced.py
+or tbm_gui.py through Streamlit's AppTest with ``TBM_PERF=1``.  It reports
+the wall time of each rerun plus the per-phase timings from ``perf``:
+
+  catalog, engine/hub snapshot, acquisition.poll / .sinks,
+  hub.update_state, and each tab and live fragment render.
+
+Scenarios vary one factor at a time around the stock setup: history length
+(pre-filled from the batch simulator), number of interlocks (synthetic
+rows added to the registry), number of devices (a scaled copy of
+tbm_systems_power.json via TBM_DATA_PATH), and concurrent sessions.
+
+  python benchmarks/bench_app.py --json --out results.json
+  python benchmarks/bench_app.py --save-baseline benchmarks/baseline_app.json
+  python benchmarks/bench_app.py --baseline benchmarks/baseline_app.json   # exit 1 on regression
+
+A phase regresses when its mean is more than --tolerance above the
+baseline and at least --min-ms slower.  Any scenario whose p95 rerun time
+reaches the 1 s acquisition tick is flagged as well.
+
+Run from software/gui_mvp:  python benchmarks/bench_app.py
+"""
+import argparse
+import gc
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+APP_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(APP_DIR))
+
+APPS = {"advanced": "tbm_gui_advanced.py", "basic": "tbm_gui.py"}
+TICK_MS = 1000.0
+BASE = {"history_s": 0, "interlocks": 0, "devices": 0, "sessions": 1}
+SWEEPS = {
+    "history_s": [3600, 4 * 3600],
+    "interlocks": [100, 500],
+    "devices": [60, 240],
+    "sessions": [5, 20],
+}
+
+
+def scenario_name(s: dict) -> str:
+    return f"{s['app']}/history={s['history_s']}/interlocks={s['interlocks']}/devices={s['devices']}/sessions={s['sessions']}"
+
+
+def build_scenarios(apps, quick: bool) -> list:
+    scenarios = []
+    for app in apps:
+        scenarios.append({"app": app, **BASE})
+        for key, values in SWEEPS.items():
+            if key == "interlocks" and app != "advanced":
+                continue   # the basic GUI's rule table is fixed
+            for v in values[:1] if quick else values:
+                scenarios.append({"app": app, **BASE, key: v})
+    return scenarios
+
+
+def _stats(ms: list) -> dict:
+    import numpy as np
+    a = np.array(ms)
+    return {"mean_ms": float(a.mean()), "p50_ms": float(np.percentile(a, 50)),
+            "p95_ms": float(np.percentile(a, 95)), "max_ms": float(a.max())}
+
+
+# ------------------------------------------------------------
+# Worker (one scenario, fresh process)
+# ------------------------------------------------------------
+def scaled_catalog(n_devices: int, path: Path):
+    """Copy of tbm_systems_power.json with devices cloned up to ``n_devices``."""
+    data = json.loads((APP_DIR / "tbm_systems_power.json").read_text())
+    items = [(cat, item) for cat, rows in data.items() for item in rows]
+    k = 2
+    while sum(len(rows) for rows in data.values()) < n_devices:
+        for cat, item in items:
+            if sum(len(rows) for rows in data.values()) >= n_devices:
+                break
+            data[cat].append({**item, "Label": f"{item['Label']} {k}"})
+        k += 1
+    path.write_text(json.dumps(data))
+
+
+def _objects(cls):
+    return [o for o in gc.get_objects() if isinstance(o, cls)]
+
+
+def prefill(app: str, seconds: int):
+    """Replace the live history with ``seconds`` of simulated 1 Hz samples ending now."""
+    from acquisition import AcquisitionEngine
+    from simulator import BatchSimulator
+
+    engine = _objects(AcquisitionEngine)[0]
+    engine.stop()
+    sim = BatchSimulator(devices=engine.devices, default_rate=1.0, seed=0,
+                         start_time=time.time() - seconds)
+    t, values = sim.frame(seconds)
+    cols = dict(zip(sim.channels, values.T))
+    with engine.lock:
+        if app == "advanced":
+            from telemetry import TelemetryStore
+            store = _objects(TelemetryStore)[0]
+            store.clear()
+            local = (t + time.localtime().tm_gmtoff) * 1e9
+            store.extend(local.astype("datetime64[ns]"), {c: cols[c] for c in store.channels})
+        else:
+            from history import MultiResolutionHistory
+            log = [o for o in _objects(MultiResolutionHistory) if "total_current" in o.channels][0]
+            log.__init__(log.channels)
+            labels = [c for c in log.channels if c in cols]
+            total = sum(cols[c] for c in labels)
+            for i in range(len(t)):
+                row = {c: float(cols[c][i]) for c in labels}
+                row["total_current"] = float(total[i])
+                log.append(row, t=float(t[i]))
+    engine.start()
+
+
+def add_interlocks(n: int):
+    from interlocks import InterlockRegistry
+    from state_hub import MachineHub
+
+    hub = _objects(MachineHub)[0]
+    defs = list(hub.registry.defs.values())
+    for i in range(len(defs), n):
+        defs.append({
+            "id": f"S{i}", "category": "Synthetic", "name": f"Synthetic interlock {i}",
+            "source": "bench_app", "condition": "never", "effect": "none", "severity": "Low",
+        })
+    with hub.lock:
+        hub.registry = InterlockRegistry(defs, hub.registry.critical)
+        hub._changed(config=True)
+
+
+def run_worker(s: dict, reruns: int) -> dict:
+    from streamlit.testing.v1 import AppTest
+
+    import perf
+
+    script = str(APP_DIR / APPS[s["app"]])
+    os.chdir(APP_DIR)
+    sessions = [AppTest.from_file(script, default_timeout=60) for _ in range(s["sessions"])]
+    for at in sessions:
+        at.run()
+    if s["history_s"]:
+        prefill(s["app"], s["history_s"])
+    if s["interlocks"]:
+        add_interlocks(s["interlocks"])
+    for at in sessions:   # settle after scaling
+        at.run()
+
+    perf.reset()
+    rerun_ms, errors = [], 0
+    for i in range(reruns * s["sessions"]):
+        at = sessions[i % len(sessions)]
+        t0 = time.perf_counter()
+        at.run()
+        rerun_ms.append(1000 * (time.perf_counter() - t0))
+        errors += len(at.exception)
+    return {
+        "scenario": scenario_name(s),
+        **s,
+        "reruns": len(rerun_ms),
+        "exceptions": errors,
+        "rerun": _stats(rerun_ms),
+        "phases": perf.stats(),
+    }
+
+
+def spawn(s: dict, reruns: int) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        env = {**os.environ, "TBM_PERF": "1", "TBM_JOURNAL_DIR": str(Path(tmp) / "runs")}
+        if s["devices"]:
+            scaled_catalog(s["devices"], Path(tmp) / "devices.json")
+            env["TBM_DATA_PATH"] = str(Path(tmp) / "devices.json")
+        proc = subprocess.run(
+            [sys.executable, __file__, "--worker", json.dumps(s), "--reruns", str(reruns)],
+            env=env, capture_output=True, text=True, timeout=1800,
+        )
+    if proc.returncode != 0:
+        return {"scenario": scenario_name(s), **s, "error": proc.stderr.strip().splitlines()[-1:]}
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+# ------------------------------------------------------------
+# Baseline comparison
+# ------------------------------------------------------------
+def compare(results: list, baseline: list, tolerance: float, min_ms: float) -> list:
+    base = {r["scenario"]: r for r in baseline}
+    flags = []
+    for r in results:
+        if "error" in r:
+            flags.append(f"{r['scenario']}: failed ({r['error']})")
+            continue
+        if r["exceptions"]:
+            flags.append(f"{r['scenario']}: {r['exceptions']} script exceptions")
+        if r["rerun"]["p95_ms"] >= TICK_MS:
+            flags.append(f"{r['scenario']}: p95 rerun {r['rerun']['p95_ms']:.0f} ms misses the 1 s tick")
+        old = base.get(r["scenario"])
+        if old is None or "error" in old:
+            continue
+        pairs = [("rerun", r["rerun"]["mean_ms"], old["rerun"]["mean_ms"])]
+        pairs += [(k, v["mean_ms"], old["phases"][k]["mean_ms"])
+                  for k, v in r["phases"].items() if k in old["phases"]]
+        for name, new, was in pairs:
+            if new > was * (1 + tolerance) and new - was >= min_ms:
+                flags.append(f"{r['scenario']}: {name} {was:.2f} -> {new:.2f} ms (+{100 * (new / was - 1):.0f}%)")
+    return flags
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--apps", nargs="+", choices=list(APPS), default=list(APPS))
+    parser.add_argument("--reruns", type=int, default=10, help="timed reruns per session")
+    parser.add_argument("--quick", action="store_true", help="only the first value of each sweep")
+    parser.add_argument("--json", action="store_true")
+    parser.add_argument("--out", type=Path, help="write results JSON here")
+    parser.add_argument("--baseline", type=Path, help="compare against this results file")
+    parser.add_argument("--save-baseline", type=Path, help="write results as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed slowdown (0.25 = 25%%)")
+    parser.add_argument("--min-ms", type=float, default=1.0, help="ignore slowdowns smaller than this")
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(run_worker(json.loads(args.worker), args.reruns)))
+        return
+
+    results = [spawn(s, args.reruns) for s in build_scenarios(args.apps, args.quick)]
+    for path in (args.out, args.save_baseline):
+        if path:
+            path.write_text(json.dumps(results, indent=2))
+    baseline = json.loads(args.baseline.read_text()) if args.baseline else []
+    flags = compare(results, baseline, args.tolerance, args.min_ms)
+
+    if args.json:
+        print(json.dumps({"results": results, "regressions": flags}, indent=2))
+    else:
+        print(f"{'scenario':<62} {'p50 ms':>8} {'p95 ms':>8}  slowest phase")
+        for r in results:
+            if "error" in r:
+                print(f"{r['scenario']:<62} ERROR {r['error']}")
+                continue
+            slow = max(r["phases"].items(), key=lambda kv: kv[1]["mean_ms"], default=("-", {"mean_ms": 0}))
+            print(f"{r['scenario']:<62} {r['rerun']['p50_ms']:>8.1f} {r['rerun']['p95_ms']:>8.1f}  "
+                  f"{slow[0]} ({slow[1]['mean_ms']:.1f} ms)")
+        for f in flags:
+            print("REGRESSION", f)
+    sys.exit(1 if flags else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Chart payload per tick vs. history length.
+
+For a 4-channel trend chart with ``n`` points of history, measures what one
+rerun serializes for ``st.line_chart``.  The frame is melted to long form
+and converted to Arrow with Streamlit's serializer:
+
+  raw     every point, as the GUIs did before decimation
+  minmax  decimate_frame(..., method="minmax") to --target points
+  lttb    decimate_frame(..., method="lttb") to --target points
+  delta   only the rows appended since the previous tick (what an
+          append-only update such as add_rows would send)
+
+Run from software/gui_mvp:  python benchmarks/bench_charts.py
+"""
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import numpy as np  # noqa: E402
+import pandas as pd  # noqa: E402
+from streamlit.dataframe_util import convert_pandas_df_to_arrow_bytes  # noqa: E402
+
+from decimate import decimate_frame  # noqa: E402
+
+CHANNELS = ["Cutterhead Current (A)", "Jack Current (A)", "Pressure (bar)", "Enclosure Temp (°C)"]
+
+
+def make_frame(n: int) -> pd.DataFrame:
+    rng = np.random.default_rng(0)
+    t = pd.date_range("2025-11-02 09:00", periods=n, freq="s", name="Time")
+    return pd.DataFrame(rng.uniform(0, 50, size=(n, len(CHANNELS))), index=t, columns=CHANNELS)
+
+
+def payload(df: pd.DataFrame) -> bytes:
+    # st.line_chart sends long-form (index, series, value) rows
+    long = df.reset_index().melt(id_vars="Time", var_name="series", value_name="value")
+    return convert_pandas_df_to_arrow_bytes(long)
+
+
+def bench(n: int, target: int, ticks: int) -> list:
+    full = make_frame(n + ticks)
+    results = []
+    for mode in ("raw", "minmax", "lttb", "delta"):
+        sizes, elapsed = [], 0.0
+        for i in range(ticks):
+            window = full.iloc[i:i + n]
+            t0 = time.perf_counter()
+            if mode == "raw":
+                data = payload(window)
+            elif mode == "delta":
+                data = payload(window.iloc[-1:])
+            else:
+                data = payload(decimate_frame(window, target, mode))
+            elapsed += time.perf_counter() - t0
+            sizes.append(len(data))
+        results.append({
+            "history": n,
+            "mode": mode,
+            "bytes_per_tick": int(np.mean(sizes)),
+            "serialize_ms": 1000 * elapsed / ticks,
+        })
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--history", type=int, nargs="+", default=[300, 3_600, 36_000, 360_000])
+    parser.add_argument("--target", type=int, default=600, help="decimation point budget")
+    parser.add_argument("--ticks", type=int, default=10)
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args()
+
+    results = [r for n in args.history for r in bench(n, args.target, args.ticks)]
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f"{'history':>8} {'mode':<7} {'bytes/tick':>12} {'ms/tick':>9}")
+    for r in results:
+        print(f"{r['history']:>8} {r['mode']:<7} {r['bytes_per_tick']:>12} {r['serialize_ms']:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
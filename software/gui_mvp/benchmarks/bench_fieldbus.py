@@ -0,0 +1,166 @@
+"""
+Field-bus read throughput and tag-change latency against the local stand-in PLC.
+
+throughput: full tag-set reads per second (and tags/s) vs. connection pool
+size, using the batched reader.  "unbatched" reads one register per request
+for comparison.
+
+latency: time from a register change on the PLC to the new value reaching
+the hub snapshot the dashboard renders from, with the engine polling at
+``--rate`` Hz (expected ~half a poll period plus one read cycle).
+
+stalled: a PLC that accepts connections but never answers.  Each poll
+waits out the read timeout; operator commands and hub snapshots taken
+meanwhile should still return in well under a millisecond, since the
+engine lock is not held across field-bus I/O.
+
+Run from software/gui_mvp:  python benchmarks/bench_fieldbus.py
+"""
+import argparse
+import asyncio
+import json
+import random
+import socket
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from acquisition import AcquisitionEngine, load_devices  # noqa: E402
+from fieldbus import ModbusClient, ModbusSource, plan_reads, tag_map  # noqa: E402
+from interlocks import InterlockRegistry  # noqa: E402
+from sim_plc import start_in_thread  # noqa: E402
+from state_hub import MachineHub  # noqa: E402
+
+
+async def _throughput(port: int, tags, pool_size: int, cycles: int, batched: bool) -> dict:
+    client = ModbusClient(port=port, pool_size=pool_size)
+    if batched:
+        async def cycle():
+            await client.read_tags(tags)
+    else:
+        async def cycle():
+            await asyncio.gather(*(client.read_registers(t.unit, t.address, 1) for t in tags))
+    await cycle()  # open the pool
+    client.requests = 0
+    t0 = time.perf_counter()
+    for _ in range(cycles):
+        await cycle()
+    elapsed = time.perf_counter() - t0
+    await client.close()
+    return {
+        "mode": "batched" if batched else "unbatched",
+        "pool": pool_size,
+        "cycle_ms": 1000 * elapsed / cycles,
+        "tags_per_s": len(tags) * cycles / elapsed,
+        "requests_per_cycle": client.requests / cycles,
+    }
+
+
+def bench_throughput(port: int, labels, pools, cycles: int) -> list:
+    tags = tag_map(labels)
+    results = []
+    for batched in (True, False):
+        for pool in pools:
+            results.append(asyncio.run(_throughput(port, tags, pool, cycles, batched)))
+    return results
+
+
+def bench_latency(plc, labels, rate_hz: float, changes: int) -> dict:
+    devices = load_devices().select(labels)
+    engine = AcquisitionEngine([ModbusSource(labels, port=plc.port)], rate_hz=rate_hz, devices=devices)
+    hub = MachineHub(engine, InterlockRegistry([], ()))
+    engine.start()
+
+    tag = "Conveyor Motor.current"
+    samples = []
+    for i in range(changes):
+        value = 1.0 + (i % 50) / 10
+        time.sleep(random.uniform(0, 1.0 / rate_hz))   # don't stay in phase with the poll
+        plc.set(tag, value)
+        t0 = plc.changed_at[tag]
+        deadline = t0 + 5.0 / rate_hz
+        while time.perf_counter() < deadline:
+            if hub.snapshot().devices["Conveyor Motor"]["current"] == value:
+                samples.append(time.perf_counter() - t0)
+                break
+            time.sleep(0.0005)
+    engine.stop()
+    ms = sorted(1000 * s for s in samples)
+    return {
+        "rate_hz": rate_hz,
+        "changes": changes,
+        "observed": len(ms),
+        "p50_ms": statistics.median(ms) if ms else None,
+        "p95_ms": ms[int(0.95 * (len(ms) - 1))] if ms else None,
+        "max_ms": ms[-1] if ms else None,
+    }
+
+
+def bench_stalled(labels, seconds: float, timeout: float) -> dict:
+    silent = socket.socket()
+    silent.bind(("127.0.0.1", 0))
+    silent.listen()
+    source = ModbusSource(labels, port=silent.getsockname()[1], timeout=timeout)
+    engine = AcquisitionEngine([source], rate_hz=10.0, devices=load_devices().select(labels))
+    hub = MachineHub(engine, InterlockRegistry([], ()))
+    engine.start()
+
+    samples = []
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        t0 = time.perf_counter()
+        engine.command(labels[0], on=len(samples) % 2 == 0)
+        hub.snapshot()
+        samples.append(time.perf_counter() - t0)
+        time.sleep(0.005)
+    engine.stop(timeout + 1.0)
+    silent.close()
+    ms = sorted(1000 * s for s in samples)
+    return {
+        "timeout_s": timeout,
+        "poll_errors": source.errors,
+        "calls": len(ms),
+        "p50_ms": statistics.median(ms),
+        "max_ms": ms[-1],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pools", type=int, nargs="+", default=[1, 4])
+    parser.add_argument("--cycles", type=int, default=200)
+    parser.add_argument("--rate", type=float, default=20.0, help="engine poll rate for the latency run")
+    parser.add_argument("--changes", type=int, default=50)
+    parser.add_argument("--stall", type=float, default=3.0, help="seconds of the stalled-PLC run")
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args()
+
+    labels = list(load_devices())
+    # rate_hz=0: no background scan, so the latency run only sees our writes
+    plc = start_in_thread(labels, rate_hz=0)
+    throughput = bench_throughput(plc.port, labels, args.pools, args.cycles)
+    latency = bench_latency(plc, labels, args.rate, args.changes)
+    stalled = bench_stalled(labels, args.stall, timeout=1.0)
+
+    if args.json:
+        print(json.dumps({"throughput": throughput, "latency": latency, "stalled": stalled}, indent=2))
+        return
+    tags = tag_map(labels)
+    print(f"{len(tags)} tags in {len(plan_reads(tags))} batched requests")
+    print(f"{'mode':<10} {'pool':>5} {'ms/cycle':>10} {'tags/s':>10} {'req/cycle':>10}")
+    for r in throughput:
+        print(f"{r['mode']:<10} {r['pool']:>5} {r['cycle_ms']:>10.3f} {r['tags_per_s']:>10.0f} "
+              f"{r['requests_per_cycle']:>10.1f}")
+    print(f"\ntag change -> hub snapshot @ {latency['rate_hz']:g} Hz: "
+          f"p50 {latency['p50_ms']:.1f} ms, p95 {latency['p95_ms']:.1f} ms, "
+          f"max {latency['max_ms']:.1f} ms ({latency['observed']}/{latency['changes']} observed)")
+    print(f"command + snapshot while the PLC stalls ({stalled['timeout_s']:g} s timeout, "
+          f"{stalled['poll_errors']} failed polls): "
+          f"p50 {stalled['p50_ms']:.3f} ms, max {stalled['max_ms']:.3f} ms over {stalled['calls']} calls")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+Interlock rule evaluation throughput: batch latency vs. rule count.
+
+Run from software/gui_mvp:  python benchmarks/bench_interlocks.py
+"""
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import numpy as np  # noqa: E402
+
+from interlock_rules import RuleEvaluator, make_rule  # noqa: E402
+
+CONDITIONS = ["≥155 °F", ">60 psi", "≥7.5 A", "≤5 l/min", "≥220 bar", "<2 bar"]
+RESETS = ["L", "MR", "L+MR"]
+
+
+def build(n_rules: int, n_channels: int) -> RuleEvaluator:
+    rules = [
+        make_rule(f"R{i}", f"ch{i % n_channels}", CONDITIONS[i % len(CONDITIONS)], RESETS[i % len(RESETS)])
+        for i in range(n_rules)
+    ]
+    return RuleEvaluator(rules)
+
+
+def bench(n_rules: int, batch: int, repeats: int, n_channels: int = 64) -> dict:
+    ev = build(n_rules, min(n_channels, n_rules))
+    rng = np.random.default_rng(0)
+    values = rng.uniform(0, 250, size=(batch, len(ev.channels)))
+    times = np.arange(batch, dtype=np.float64)
+    ev.evaluate(values, times)  # warm-up
+    t0 = time.perf_counter()
+    for _ in range(repeats):
+        ev.evaluate(values, times)
+    per_batch = (time.perf_counter() - t0) / repeats
+    return {
+        "rules": n_rules,
+        "batch": batch,
+        "batch_ms": 1000 * per_batch,
+        "samples_per_s": batch / per_batch,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rules", type=int, nargs="+", default=[10, 100, 500])
+    parser.add_argument("--batch", type=int, default=1000, help="samples per batch (1000 = 1 s at 1 kHz)")
+    parser.add_argument("--repeats", type=int, default=20)
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args()
+
+    results = [bench(n, args.batch, args.repeats) for n in args.rules]
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f"{'rules':>6} {'batch':>6} {'ms/batch':>10} {'samples/s':>12}")
+    for r in results:
+        print(f"{r['rules']:>6} {r['batch']:>6} {r['batch_ms']:>10.3f} {r['samples_per_s']:>12.0f}")
+
+
+if __name__ == "__main__":
+    main()
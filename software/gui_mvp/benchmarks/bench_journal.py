@@ -0,0 +1,111 @@
+"""
+Telemetry journal: write throughput and replay open/read cost.
+
+append: one dict row per call, as the acquisition sinks do.
+extend: pre-built NumPy batches, as a bulk importer or simulator would.
+Throughput is reported in samples/s (rows x channels).
+
+replay: time to open a run of ``--hours`` at ``--rate`` Hz and to slice a
+10-minute window out of the middle of it.
+
+Run from software/gui_mvp:  python benchmarks/bench_journal.py
+"""
+import argparse
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import numpy as np  # noqa: E402
+
+from journal import JournalWriter, open_run  # noqa: E402
+
+
+def bench_append(root: Path, channels: list, rows: int) -> dict:
+    writer = JournalWriter(channels, root=root, name="append")
+    rng = np.random.default_rng(0)
+    data = rng.uniform(0, 100, size=(1000, len(channels)))
+    dicts = [dict(zip(channels, row)) for row in data]
+    t0 = time.perf_counter()
+    for i in range(rows):
+        writer.append(float(i), dicts[i % len(dicts)])
+    writer.close()
+    elapsed = time.perf_counter() - t0
+    return {"mode": "append", "rows": rows, "samples_per_s": rows * len(channels) / elapsed}
+
+
+def bench_extend(root: Path, channels: list, rows: int, batch: int = 10_000) -> dict:
+    writer = JournalWriter(channels, root=root, name="extend")
+    rng = np.random.default_rng(0)
+    data = rng.uniform(0, 100, size=(batch, len(channels)))
+    t0 = time.perf_counter()
+    for start in range(0, rows, batch):
+        writer.extend(np.arange(start, start + batch, dtype=np.float64), data)
+    writer.close()
+    elapsed = time.perf_counter() - t0
+    return {"mode": "extend", "rows": rows, "samples_per_s": rows * len(channels) / elapsed,
+            "run_id": writer.run_id}
+
+
+def bench_replay(root: Path, channels: list, hours: float, rate_hz: float) -> dict:
+    rows = int(hours * 3600 * rate_hz)
+    writer = JournalWriter(channels, root=root, name="replay")
+    data = np.random.default_rng(0).uniform(0, 100, size=(10_000, len(channels)))
+    for start in range(0, rows, len(data)):
+        n = min(len(data), rows - start)
+        writer.extend(np.arange(start, start + n) / rate_hz, data[:n])
+    writer.close()
+
+    t0 = time.perf_counter()
+    run = open_run(writer.run_id, root=root)
+    open_ms = 1000 * (time.perf_counter() - t0)
+
+    mid = run.start + (run.end - run.start) / 2
+    t0 = time.perf_counter()
+    times, cols = run.window(mid, mid + 600)
+    window_ms = 1000 * (time.perf_counter() - t0)
+    t0 = time.perf_counter()
+    total = sum(float(np.nanmax(v)) for v in cols.values())  # touch the pages
+    read_ms = 1000 * (time.perf_counter() - t0)
+    assert total > 0
+    return {
+        "hours": hours,
+        "rows": len(run),
+        "open_ms": open_ms,
+        "window_rows": len(times),
+        "window_ms": window_ms,
+        "window_read_ms": read_ms,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--channels", type=int, default=64)
+    parser.add_argument("--rows", type=int, default=50_000)
+    parser.add_argument("--hours", type=float, default=10.0)
+    parser.add_argument("--rate", type=float, default=10.0, help="sample rate of the replay run (Hz)")
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args()
+
+    channels = [f"ch{i}" for i in range(args.channels)]
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        writes = [bench_append(root, channels, args.rows), bench_extend(root, channels, args.rows * 10)]
+        replay = bench_replay(root, channels, args.hours, args.rate)
+
+    if args.json:
+        print(json.dumps({"write": writes, "replay": replay}, indent=2))
+        return
+    print(f"{'mode':<8} {'rows':>10} {'samples/s':>14}")
+    for r in writes:
+        print(f"{r['mode']:<8} {r['rows']:>10} {r['samples_per_s']:>14.0f}")
+    print(f"\nreplay {replay['hours']:g} h ({replay['rows']} rows x {args.channels} ch): "
+          f"open {replay['open_ms']:.2f} ms, 10-min window ({replay['window_rows']} rows) "
+          f"slice {replay['window_ms']:.2f} ms, read {replay['window_read_ms']:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+Per-tick cost of the advanced dashboard with 1, 10 and 50 viewers.
+
+"per-session" reproduces the old model: every session runs its own
+simulation, keeps its own history and builds its own chart frames.
+"shared hub" is the current model: one engine sample per tick, and each
+session only takes the hub snapshot and the memoised chart frames.
+
+Run from software/gui_mvp:  python benchmarks/bench_sessions.py
+"""
+import argparse
+import json
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import numpy as np  # noqa: E402
+
+from acquisition import AcquisitionEngine, SimulatedSource  # noqa: E402
+from interlocks import InterlockRegistry  # noqa: E402
+from state_hub import MachineHub  # noqa: E402
+from telemetry import TelemetryStore  # noqa: E402
+
+CHANNELS = ["cutterhead_current", "jack_current", "pressure", "enclosure_temp"]
+CAPACITY = 4 * 3600
+TREND_POINTS = 300
+INTERLOCK_IDS = ["A1", "A2", "A3", "A4", "B1", "B2", "B3", "B4", "B5", "B6", "B7", "B8", "B9", "B10"]
+CRITICAL_IDS = {"A1", "A2", "A3", "A4"}
+
+
+def _render(snapshot_devices, frames):
+    # Stand-in for the work a rerun does with the data it was handed.
+    return snapshot_devices.total_current() + sum(len(f) for f in frames)
+
+
+def _new_engine(store: TelemetryStore) -> AcquisitionEngine:
+    def sink(t, values):
+        store.append(np.datetime64(int(t * 1e9), "ns"), values)
+
+    engine = AcquisitionEngine([SimulatedSource()], sinks=[sink])
+    engine.devices["Cutter Head Motor"]["on"] = True
+    return engine
+
+
+def bench_per_session(sessions: int, ticks: int) -> dict:
+    tracemalloc.start()
+    engines = []
+    for _ in range(sessions):
+        store = TelemetryStore(CHANNELS, capacity=CAPACITY)
+        engines.append((_new_engine(store), store))
+    mem = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    t0 = time.perf_counter()
+    for _ in range(ticks):
+        for engine, store in engines:
+            engine.sample()
+            devices = engine.snapshot()
+            frames = [
+                store.to_frame(60, columns={c: c for c in CHANNELS[2:]}, copy=True),
+                store.to_frame(TREND_POINTS, columns={c: c for c in CHANNELS}, copy=True),
+            ]
+            _render(devices, frames)
+    elapsed = time.perf_counter() - t0
+    return {"tick_ms": 1000 * elapsed / ticks, "memory_bytes": mem}
+
+
+def bench_shared_hub(sessions: int, ticks: int) -> dict:
+    tracemalloc.start()
+    store = TelemetryStore(CHANNELS, capacity=CAPACITY)
+    engine = _new_engine(store)
+    defs = [{"id": iid, "category": iid[0], "severity": "High"} for iid in INTERLOCK_IDS]
+    hub = MachineHub(engine, InterlockRegistry(defs, CRITICAL_IDS))
+    mem = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    def frame(n, cols):
+        return hub.memo(f"trend:{n}", lambda: store.to_frame(n, columns={c: c for c in cols}, copy=True))
+
+    t0 = time.perf_counter()
+    for _ in range(ticks):
+        engine.sample()
+        for _ in range(sessions):
+            snap = hub.snapshot()
+            frames = [frame(60, CHANNELS[2:]), frame(TREND_POINTS, CHANNELS)]
+            _render(snap.devices, frames)
+    elapsed = time.perf_counter() - t0
+    return {"tick_ms": 1000 * elapsed / ticks, "memory_bytes": mem}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sessions", type=int, nargs="+", default=[1, 10, 50])
+    parser.add_argument("--ticks", type=int, default=200)
+    parser.add_argument("--json", action="store_true", help="print machine-readable results")
+    args = parser.parse_args()
+
+    results = []
+    for n in args.sessions:
+        for mode, fn in (("per-session", bench_per_session), ("shared hub", bench_shared_hub)):
+            r = fn(n, args.ticks)
+            results.append({"mode": mode, "sessions": n, **r})
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f"{'mode':<12} {'sessions':>8} {'ms/tick':>10} {'memory':>12}")
+    for r in results:
+        print(f"{r['mode']:<12} {r['sessions']:>8} {r['tick_ms']:>10.3f} {r['memory_bytes'] / 1e6:>10.2f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""
+Batch simulator throughput, a load test through rules + journal, and a check
+that every fault scenario trips the interlocks it is meant to.
+
+generate  BatchSimulator.frame() at 10 / 100 / 1000 Hz, all channels
+multirate BatchSimulator.block() with currents at 1 kHz, process values
+          at 10 Hz and temperatures at 1 Hz
+pipeline  frame -> RuleEvaluator.evaluate -> JournalWriter.extend
+faults    10 min at 10 Hz per scenario; the fault starts at 60 s for 5 min
+
+Run from software/gui_mvp:  python benchmarks/bench_simulator.py
+"""
+import argparse
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from interlock_rules import RuleEvaluator, make_rule  # noqa: E402
+from journal import JournalWriter  # noqa: E402
+from simulator import FAULTS, BatchSimulator, Fault  # noqa: E402
+
+# Trip conditions of demo_interlocks (tbm_gui.py) and the advanced GUI rules,
+# bound to simulator channels: (id, channel, condition, reset)
+RULES = [
+    ("G1", "cutter_motor_temp_f", "≥155 °F", "L+MR"),
+    ("T2", "panel_temp_f", "≥122 °F", "L"),
+    ("P1", "nozzle_pressure_psi", ">60 psi", "L+MR"),
+    ("P2", "pump_pressure_psi", ">60 psi", "L+MR"),
+    ("B1", "muck_level", "≥5 level", "L+MR"),
+    ("M1", "Cutter Head Motor", "≥7.5 A", "L+MR"),
+    ("M2", "Conveyor Motor", "≥6.0 A", "L+MR"),
+    ("C1", "coolant_flow_lpm", "≤5 l/min", "MR"),
+    ("H1", "hydraulic_pressure_bar", "≥220 bar", "L+MR"),
+    ("F1", "Primary Intake Fan", "≥9.5 A", "L"),
+    ("B3", "cutterhead_current", ">14.8 A", "L+MR"),
+    ("B4.1", "pressure", "<1.1 bar", "MR"),
+    ("B4.2", "pressure", ">4.9 bar", "MR"),
+    ("B5", "enclosure_temp", ">44.5 °C", "MR"),
+]
+MULTIRATE = {"Cutter Head Motor": 1000.0, "Screw Jack": 1000.0, "Conveyor Motor": 1000.0,
+             "cutter_motor_temp_f": 1.0, "panel_temp_f": 1.0, "enclosure_temp": 1.0}
+
+
+def evaluator() -> RuleEvaluator:
+    return RuleEvaluator([make_rule(*r, interlock=r[0].split(".")[0]) for r in RULES])
+
+
+def bench_generate(rate: float, seconds: float) -> dict:
+    sim = BatchSimulator(default_rate=rate, seed=0)
+    t0 = time.perf_counter()
+    t, values = sim.frame(seconds)
+    elapsed = time.perf_counter() - t0
+    return {"case": f"generate {rate:g} Hz", "samples": values.size, "samples_per_s": values.size / elapsed}
+
+
+def bench_multirate(seconds: float) -> dict:
+    sim = BatchSimulator(rates=MULTIRATE, default_rate=10.0, seed=0)
+    t0 = time.perf_counter()
+    block = sim.block(seconds)
+    elapsed = time.perf_counter() - t0
+    samples = sum(len(v) for _, v in block.values())
+    return {"case": "multirate block", "samples": samples, "samples_per_s": samples / elapsed}
+
+
+def bench_pipeline(rate: float, seconds: float, batch_s: float = 10.0) -> dict:
+    sim = BatchSimulator(default_rate=rate, seed=0)
+    ev = evaluator()
+    cols = [sim.channels.index(c) for c in ev.channels]
+    samples = 0
+    with tempfile.TemporaryDirectory() as tmp:
+        journal = JournalWriter(sim.channels, root=Path(tmp), name="load")
+        t0 = time.perf_counter()
+        for _ in range(int(seconds / batch_s)):
+            t, values = sim.frame(batch_s)
+            ev.evaluate(values[:, cols], t)
+            journal.extend(t, values)
+            samples += values.size
+        journal.close()
+        elapsed = time.perf_counter() - t0
+    return {"case": f"pipeline {rate:g} Hz", "samples": samples, "samples_per_s": samples / elapsed}
+
+
+def check_faults() -> list:
+    results = []
+    for kind, (_, demo_ids, advanced_ids) in FAULTS.items():
+        sim = BatchSimulator(default_rate=10.0, seed=1, faults=[Fault(kind, 60.0, 300.0)])
+        ev = evaluator()
+        cols = [sim.channels.index(c) for c in ev.channels]
+        t, values = sim.frame(600.0)
+        tripped = {ev.rules[ev.index[rid]].interlock for rid in ev.evaluate(values[:, cols], t).tripped}
+        expected = set(demo_ids) | set(advanced_ids)
+        results.append({
+            "fault": kind,
+            "expected": sorted(expected),
+            "tripped": sorted(tripped),
+            "ok": tripped == expected,
+        })
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--seconds", type=float, default=600.0, help="simulated seconds per case")
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args()
+
+    throughput = [bench_generate(r, args.seconds) for r in (10.0, 100.0, 1000.0)]
+    throughput.append(bench_multirate(args.seconds))
+    throughput.append(bench_pipeline(100.0, args.seconds))
+    faults = check_faults()
+
+    if args.json:
+        print(json.dumps({"throughput": throughput, "faults": faults}, indent=2))
+        return
+    print(f"{'case':<18} {'samples':>12} {'samples/s':>14}")
+    for r in throughput:
+        print(f"{r['case']:<18} {r['samples']:>12} {r['samples_per_s']:>14.0f}")
+    print(f"\n{'fault':<24} {'ok':<4} tripped (expected)")
+    for r in faults:
+        print(f"{r['fault']:<24} {'yes' if r['ok'] else 'NO':<4} "
+              f"{', '.join(r['tripped']) or '-'} ({', '.join(r['expected'])})")
+
+
+if __name__ == "__main__":
+    main()
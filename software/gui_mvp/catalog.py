@@ -0,0 +1,197 @@
+"""
+Device catalog: tbm_systems_power.json, validated once and shared.
+
+``get_catalog()`` returns the same immutable ``Catalog`` until the file's
+mtime (or size) changes, so a rerun pays for one ``os.stat`` instead of a
+JSON parse and a rebuild of every label map.  An edit that fails validation
+is logged and the last good catalog stays in service.
+
+    catalog = get_catalog()
+    catalog.categories                  # ("Cutter Head & Drive", ...)
+    catalog.by_category["Cooling"]      # (Device, Device)
+    catalog["Screw Jack Motor"]         # aliases resolve to the file's label
+    "Screw Jack" in catalog.has_speed_torque
+
+Runtime state (on/current/...) is not part of the catalog; see
+``acquisition.load_devices()``.
+"""
+import json
+import logging
+import os
+import threading
+from pathlib import Path
+from types import MappingProxyType
+from typing import Dict, Mapping, NamedTuple, Optional, Tuple
+
+import jsonschema
+
+DATA_PATH = Path(os.environ.get("TBM_DATA_PATH", Path(__file__).parent / "tbm_systems_power.json"))
+
+SCHEMA = {
+    "type": "object",
+    "minProperties": 1,
+    "additionalProperties": {
+        "type": "array",
+        "items": {
+            "type": "object",
+            "required": ["Label", "Explanation", "Model", "Quantity"],
+            "properties": {
+                "Label": {"type": "string", "minLength": 1},
+                "Explanation": {"type": "string"},
+                "Model": {"type": "string"},
+                "Quantity": {"type": "integer", "minimum": 0},
+                "State": {"enum": ["ON", "OFF"]},
+            },
+        },
+    },
+}
+
+# Operator-facing names for catalog labels; either form resolves.
+ALIASES = {"Screw Jack": "Screw Jack Motor"}
+
+# Devices that report speed (RPM) and torque (Nm), by catalog label
+SPEED_TORQUE = frozenset({
+    "Cutter Head Motor",
+    "Screw Jack",
+    "Primary Intake Fan",
+    "Secondary Intake Fan",
+    "Conveyor Motor",
+    "Conditioner Pump",
+})
+
+log = logging.getLogger("tbm.catalog")
+
+
+class CatalogError(ValueError):
+    pass
+
+
+class Device(NamedTuple):
+    index: int              # position in catalog order
+    label: str              # as in the file; the key everywhere else
+    name: str               # display name (alias applied)
+    category: str
+    explanation: str
+    model: str
+    quantity: int
+    initially_on: bool
+    has_speed_torque: bool
+
+
+class Catalog:
+    """Immutable lookups over one version of the catalog file."""
+
+    __slots__ = ("path", "stamp", "devices", "labels", "categories", "by_label", "by_category",
+                 "has_speed_torque", "_resolve")
+
+    def __init__(self, data: Mapping, path: Optional[Path] = None, stamp: Tuple[int, int] = (0, 0)):
+        try:
+            jsonschema.validate(data, SCHEMA)
+        except jsonschema.ValidationError as e:
+            where = "/".join(str(p) for p in e.absolute_path) or "<root>"
+            raise CatalogError(f"{path or 'catalog'}: {where}: {e.message}") from None
+
+        devices = []
+        for category, items in data.items():
+            for item in items:
+                label = item["Label"]
+                devices.append(Device(
+                    index=len(devices),
+                    label=label,
+                    name=ALIASES.get(label, label),
+                    category=category,
+                    explanation=item["Explanation"],
+                    model=item["Model"],
+                    quantity=item["Quantity"],
+                    initially_on=item.get("State", "OFF") == "ON",
+                    has_speed_torque=label in SPEED_TORQUE,
+                ))
+        by_label: Dict[str, Device] = {}
+        for dev in devices:
+            if dev.label in by_label:
+                raise CatalogError(f"{path or 'catalog'}: duplicate label {dev.label!r}")
+            by_label[dev.label] = dev
+
+        self.path = path
+        self.stamp = stamp
+        self.devices: Tuple[Device, ...] = tuple(devices)
+        self.labels: Tuple[str, ...] = tuple(d.label for d in devices)
+        self.categories: Tuple[str, ...] = tuple(data)
+        self.by_label = MappingProxyType(by_label)
+        self.by_category = MappingProxyType({
+            c: tuple(d for d in devices if d.category == c) for c in self.categories
+        })
+        self.has_speed_torque = frozenset(d.label for d in devices if d.has_speed_torque)
+        self._resolve = MappingProxyType({
+            **{d.name: d.label for d in devices}, **{d.label: d.label for d in devices}
+        })
+
+    def resolve(self, name: str) -> str:
+        """Catalog label for a label or alias; KeyError if unknown."""
+        return self._resolve[name]
+
+    def __getitem__(self, name: str) -> Device:
+        return self.by_label[self._resolve[name]]
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._resolve
+
+    def __iter__(self):
+        return iter(self.devices)
+
+    def __len__(self) -> int:
+        return len(self.devices)
+
+
+def _stamp(path: Path) -> Tuple[int, int]:
+    st = os.stat(path)
+    return st.st_mtime_ns, st.st_size
+
+
+def load_catalog(path: Path = DATA_PATH) -> Catalog:
+    """Parse and validate ``path`` (no caching)."""
+    path = Path(path)
+    stamp = _stamp(path)
+    with open(path, "r") as f:
+        try:
+            data = json.load(f)
+        except json.JSONDecodeError as e:
+            raise CatalogError(f"{path}: {e}") from None
+    return Catalog(data, path, stamp)
+
+
+_cache: Dict[Path, Catalog] = {}
+_rejected: Dict[Path, Tuple[int, int]] = {}   # stamp of the last edit that failed
+_lock = threading.Lock()
+
+
+def get_catalog(path: Path = DATA_PATH) -> Catalog:
+    """
+    Shared catalog for ``path``, reloaded only when the file changes.  The
+    first load raises ``CatalogError``; later bad edits keep the old one.
+    """
+    path = Path(path)
+    current = _cache.get(path)
+    try:
+        stamp = _stamp(path)
+    except OSError:
+        if current is None:
+            raise
+        return current
+    if current is not None and stamp in (current.stamp, _rejected.get(path)):
+        return current
+    with _lock:
+        current = _cache.get(path)
+        if current is not None and stamp in (current.stamp, _rejected.get(path)):
+            return current
+        try:
+            fresh = load_catalog(path)
+        except CatalogError as e:
+            if current is None:
+                raise
+            _rejected[path] = stamp
+            log.warning("keeping previous catalog: %s", e)
+            return current
+        _cache[path] = fresh
+        log.info("loaded %d devices from %s", len(fresh), path)
+        return fresh
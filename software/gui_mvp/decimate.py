@@ -0,0 +1,143 @@
+"""
+Chart decimation: reduce a window of samples to about the chart's pixel width
+before it is serialized to the browser.
+
+``minmax``  Min/max bucketing keeps every spike visible: each bucket
+            contributes its minimum and maximum, in the order they occurred.
+            Buckets are anchored to absolute time with a "nice" width, so
+            closed buckets come out identical from one rerun to the next.
+            The newest points change only the last bucket. Charts whose
+            data has not changed produce byte-identical elements, which
+            Streamlit's client message cache replaces with a hash reference.
+``lttb``    Largest-Triangle-Three-Buckets: picks the visually most
+            significant point per bucket; smoother, but shifts as data slides.
+
+The point budget comes from ``TBM_CHART_POINTS`` (default 600) and the
+method from ``TBM_CHART_METHOD`` (default ``minmax``).
+"""
+import math
+import os
+from typing import Dict, Mapping, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+CHART_POINTS = int(os.environ.get("TBM_CHART_POINTS", "600"))
+CHART_METHOD = os.environ.get("TBM_CHART_METHOD", "minmax")
+
+
+def nice_step(span: float, buckets: int) -> float:
+    """Smallest 1/1.5/2/3/5/7.5 x 10^k step that splits ``span`` into at most ``buckets``."""
+    raw = span / max(buckets, 1)
+    if raw <= 0:
+        return 1.0
+    exp = 10.0 ** math.floor(math.log10(raw))
+    for m in (1.0, 1.5, 2.0, 3.0, 5.0, 7.5, 10.0):
+        if m * exp >= raw:
+            return m * exp
+    return 10.0 * exp
+
+
+# ------------------------------------------------------------
+# Min/max bucketing
+# ------------------------------------------------------------
+def minmax_positions(t: np.ndarray, columns: Mapping[str, np.ndarray], buckets: int
+                     ) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+    """
+    Row positions (two per bucket: first and last row) and the matching
+    decimated values per column (bucket min and max, in time order).
+    ``t`` is float seconds, ascending.
+    """
+    n = len(t)
+    step = nice_step(float(t[-1] - t[0]), buckets)
+    ids = np.floor(t / step).astype(np.int64)
+    starts = np.flatnonzero(np.r_[True, ids[1:] != ids[:-1]])
+    ends = np.r_[starts[1:], n] - 1
+    sizes = ends - starts + 1
+    pos = np.empty(2 * len(starts), dtype=np.int64)
+    pos[0::2] = starts
+    pos[1::2] = ends
+
+    idx = np.arange(n)
+    out = {}
+    for name, v in columns.items():
+        v = np.asarray(v, dtype=np.float64)
+        lo = np.fmin.reduceat(v, starts)
+        hi = np.fmax.reduceat(v, starts)
+        lo_at = np.minimum.reduceat(np.where(v == np.repeat(lo, sizes), idx, n), starts)
+        hi_at = np.minimum.reduceat(np.where(v == np.repeat(hi, sizes), idx, n), starts)
+        min_first = lo_at <= hi_at
+        col = np.empty(2 * len(starts), dtype=np.float64)
+        col[0::2] = np.where(min_first, lo, hi)
+        col[1::2] = np.where(min_first, hi, lo)
+        out[name] = col
+    return pos, out
+
+
+def minmax_decimate(times: np.ndarray, columns: Mapping[str, np.ndarray],
+                    buckets: int) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+    """
+    Reduce ``times`` (float seconds) and each column to about ``2 * buckets``
+    points.  Inputs at or under the budget are returned as they are.
+    """
+    if len(times) <= 2 * buckets:
+        return times, dict(columns)
+    pos, out = minmax_positions(np.asarray(times, dtype=np.float64), columns, buckets)
+    if len(pos) >= len(times):
+        return times, dict(columns)
+    return times[pos], out
+
+
+# ------------------------------------------------------------
+# LTTB
+# ------------------------------------------------------------
+def lttb_indices(t: np.ndarray, v: np.ndarray, target: int) -> np.ndarray:
+    """Indices of the ``target`` points LTTB keeps (first and last always kept)."""
+    n = len(t)
+    if target >= n or target < 3:
+        return np.arange(n)
+    v = np.where(np.isnan(v), 0.0, v)
+    edges = np.linspace(1, n - 1, target - 1).astype(np.int64)
+    keep = np.empty(target, dtype=np.int64)
+    keep[0], keep[-1] = 0, n - 1
+    a = 0
+    for i in range(target - 2):
+        lo, hi = edges[i], edges[i + 1]
+        nlo, nhi = hi, edges[i + 2] if i + 2 < len(edges) else n
+        avg_t = t[nlo:nhi].mean() if nhi > nlo else t[-1]
+        avg_v = v[nlo:nhi].mean() if nhi > nlo else v[-1]
+        bt, bv = t[lo:hi], v[lo:hi]
+        area = np.abs((t[a] - avg_t) * (bv - v[a]) - (t[a] - bt) * (avg_v - v[a]))
+        a = lo + int(area.argmax())
+        keep[i + 1] = a
+    return keep
+
+
+# ------------------------------------------------------------
+# DataFrames (what the GUIs hand to st.line_chart)
+# ------------------------------------------------------------
+def _seconds(index: pd.Index) -> np.ndarray:
+    if isinstance(index, pd.DatetimeIndex):
+        return index.asi8 / 1e9
+    return np.asarray(index, dtype=np.float64)
+
+
+def decimate_frame(df: pd.DataFrame, target: Optional[int] = None,
+                   method: Optional[str] = None) -> pd.DataFrame:
+    """Chart frame reduced to about ``target`` rows; small frames pass through."""
+    target = CHART_POINTS if target is None else target
+    method = CHART_METHOD if method is None else method
+    if len(df) <= target:
+        return df
+    t = _seconds(df.index)
+    if method == "lttb":
+        # One LTTB pass per column; the union keeps every column's picks.
+        per_col = max(3, target // max(len(df.columns), 1))
+        keep = np.unique(np.concatenate([
+            lttb_indices(t, df[c].to_numpy(dtype=np.float64), per_col) for c in df.columns
+        ]))
+        return df.iloc[keep]
+    pos, cols = minmax_positions(t, {c: df[c].to_numpy() for c in df.columns}, target // 2)
+    if len(pos) >= len(df):
+        return df
+    return pd.DataFrame(cols, index=df.index[pos], columns=df.columns)
@@ -0,0 +1,207 @@
+"""
+Runtime device state as a struct of arrays.
+
+``DeviceTable`` keeps ``on``, ``current``, ``speed`` and ``torque`` as
+parallel NumPy arrays indexed in catalog order, so totals are one vector op
+and a snapshot is four small array copies instead of a deep dict copy.
+
+It still reads like the old ``label -> dict`` table: ``table[label]``
+returns a ``DeviceView`` (one ``__slots__`` object per device, built on
+first access) that supports ``view["current"]``, ``view.current``, ``.get()``
+and ``.update()``, writing straight through to the arrays.
+
+Snapshots are read-only: writing to a view of one raises ``ValueError``.
+"""
+from typing import Dict, Iterable, Iterator, Optional, Sequence, Tuple
+
+import numpy as np
+
+FIELDS = ("on", "current", "speed", "torque")
+
+
+class DeviceView:
+    """One device of a ``DeviceTable``."""
+
+    __slots__ = ("_table", "_i")
+
+    def __init__(self, table: "DeviceTable", i: int):
+        self._table = table
+        self._i = i
+
+    @property
+    def label(self) -> str:
+        return self._table.labels[self._i]
+
+    @property
+    def category(self) -> str:
+        return self._table.categories[self._i]
+
+    @property
+    def on(self) -> bool:
+        return bool(self._table.on[self._i])
+
+    @on.setter
+    def on(self, value):
+        self._table.on[self._i] = value
+
+    @property
+    def current(self) -> float:
+        return float(self._table.current[self._i])
+
+    @current.setter
+    def current(self, value):
+        self._table.current[self._i] = value
+
+    @property
+    def speed(self) -> float:
+        return float(self._table.speed[self._i])
+
+    @speed.setter
+    def speed(self, value):
+        self._table.speed[self._i] = value
+
+    @property
+    def torque(self) -> float:
+        return float(self._table.torque[self._i])
+
+    @torque.setter
+    def torque(self, value):
+        self._table.torque[self._i] = value
+
+    # dict-style access, so sources and GUIs can keep state["on"]
+    def __getitem__(self, field: str):
+        if field in FIELDS or field == "category":
+            return getattr(self, field)
+        raise KeyError(field)
+
+    def __setitem__(self, field: str, value):
+        if field not in FIELDS:
+            raise KeyError(field)
+        setattr(self, field, value)
+
+    def get(self, field: str, default=None):
+        try:
+            return self[field]
+        except KeyError:
+            return default
+
+    def update(self, fields: Optional[Dict] = None, **kwargs):
+        for field, value in {**(fields or {}), **kwargs}.items():
+            self[field] = value
+
+    def keys(self) -> Tuple[str, ...]:
+        return ("category",) + FIELDS
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.keys())
+
+    def __len__(self) -> int:
+        return len(FIELDS) + 1
+
+    def to_dict(self) -> Dict:
+        return {k: self[k] for k in self.keys()}
+
+    def __repr__(self) -> str:
+        return f"DeviceView({self.label!r}, {self.to_dict()})"
+
+
+class DeviceTable:
+    """Label-indexed device state; iteration and ``items()`` follow catalog order."""
+
+    __slots__ = ("labels", "categories", "index", "on", "current", "speed", "torque", "_views")
+
+    def __init__(self, labels: Sequence[str], categories: Sequence[str],
+                 on: Optional[Iterable[bool]] = None, _arrays: Optional[Tuple[np.ndarray, ...]] = None,
+                 _index: Optional[Dict[str, int]] = None):
+        self.labels: Tuple[str, ...] = tuple(labels)
+        self.categories: Tuple[str, ...] = tuple(categories)
+        self.index: Dict[str, int] = _index if _index is not None else {l: i for i, l in enumerate(self.labels)}
+        n = len(self.labels)
+        if _arrays is None:
+            _arrays = (
+                np.zeros(n, dtype=bool) if on is None else np.fromiter(on, dtype=bool, count=n),
+                np.zeros(n), np.zeros(n), np.zeros(n),
+            )
+        self.on, self.current, self.speed, self.torque = _arrays
+        self._views: Optional[Tuple[DeviceView, ...]] = None   # built on first access
+
+    @classmethod
+    def from_catalog(cls, catalog) -> "DeviceTable":
+        return cls([d.label for d in catalog], [d.category for d in catalog],
+                   on=[d.initially_on for d in catalog])
+
+    # --------------------------------------------------------
+    # Mapping interface (label -> DeviceView)
+    # --------------------------------------------------------
+    def _all_views(self) -> Tuple[DeviceView, ...]:
+        if self._views is None:
+            self._views = tuple(DeviceView(self, i) for i in range(len(self.labels)))
+        return self._views
+
+    def __getitem__(self, label: str) -> DeviceView:
+        return self._all_views()[self.index[label]]
+
+    def get(self, label: str, default=None):
+        i = self.index.get(label)
+        return default if i is None else self._all_views()[i]
+
+    def __contains__(self, label) -> bool:
+        return label in self.index
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.labels)
+
+    def __len__(self) -> int:
+        return len(self.labels)
+
+    def keys(self) -> Tuple[str, ...]:
+        return self.labels
+
+    def values(self) -> Tuple[DeviceView, ...]:
+        return self._all_views()
+
+    def items(self):
+        return zip(self.labels, self._all_views())
+
+    # --------------------------------------------------------
+    # Vector operations
+    # --------------------------------------------------------
+    def indexes(self, labels: Iterable[str]) -> np.ndarray:
+        return np.fromiter((self.index[l] for l in labels), dtype=np.intp)
+
+    def effective_current(self) -> np.ndarray:
+        """Per-device current, 0 where the device is OFF."""
+        return np.where(self.on, self.current, 0.0)
+
+    def total_current(self) -> float:
+        return float(self.current @ self.on)
+
+    def matrix(self) -> np.ndarray:
+        """(n, 4) float array in ``FIELDS`` order, one row per device."""
+        return np.column_stack([self.on, self.current, self.speed, self.torque]).astype(np.float64)
+
+    # --------------------------------------------------------
+    # Copies
+    # --------------------------------------------------------
+    def _copy(self, arrays) -> "DeviceTable":
+        return DeviceTable(self.labels, self.categories, _arrays=arrays, _index=self.index)
+
+    def copy(self) -> "DeviceTable":
+        """Independent, writable copy."""
+        return self._copy(tuple(a.copy() for a in (self.on, self.current, self.speed, self.torque)))
+
+    def snapshot(self) -> "DeviceTable":
+        """Read-only copy; safe to share between sessions."""
+        arrays = tuple(a.copy() for a in (self.on, self.current, self.speed, self.torque))
+        for a in arrays:
+            a.flags.writeable = False
+        return self._copy(arrays)
+
+    def select(self, labels: Iterable[str]) -> "DeviceTable":
+        """Writable table holding only ``labels`` (in the given order)."""
+        idx = self.indexes(labels)
+        return DeviceTable([self.labels[i] for i in idx], [self.categories[i] for i in idx],
+                           _arrays=tuple(a[idx].copy() for a in (self.on, self.current, self.speed, self.torque)))
+
+    def __repr__(self) -> str:
+        return f"DeviceTable({len(self)} devices, {int(self.on.sum())} on)"
@@ -0,0 +1,136 @@
+"""
+Hidden "Diagnostics" tab shared by both GUIs.
+
+The tab appears when timing is on (``TBM_PERF=1``) or the page is opened
+with ``?diagnostics=1``.  It shows the ``perf`` section timers, the rerun
+duration histogram, acquisition tick jitter, the size of this session's
+``st.session_state`` and the gauges registered by ``register_engine()``,
+and exports them as Prometheus text or JSON, either as a download or to a
+fixed file under the journal directory.
+"""
+import json
+import sys
+import time
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+import perf
+from acquisition import AcquisitionEngine
+from journal import JOURNAL_DIR, JournalWriter
+
+EXPORT_PATH = JOURNAL_DIR / "diagnostics.prom"
+
+
+def visible() -> bool:
+    return perf.enabled() or st.query_params.get("diagnostics") in ("1", "true")
+
+
+def register_engine(engine: AcquisitionEngine, journal: Optional[JournalWriter] = None):
+    """Gauges for the acquisition thread and the journal writer's backlog."""
+    perf.gauge("acquisition.samples", lambda: engine.seq)
+    perf.gauge("acquisition.overruns", lambda: engine.overruns)
+    perf.gauge("acquisition.max_lateness_s", lambda: engine.max_lateness)
+    perf.gauge("acquisition.sample_age_s",
+               lambda: time.time() - engine.last_sample_at if engine.last_sample_at else np.nan)
+    if journal is not None:
+        perf.gauge("journal.pending_rows", lambda: journal.pending_rows)
+        perf.gauge("journal.rows_written", lambda: journal.rows_written)
+
+
+def deep_sizeof(obj, _seen=None) -> int:
+    """Approximate retained size in bytes, counting array and frame buffers."""
+    seen = set() if _seen is None else _seen
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    if isinstance(obj, np.ndarray):
+        return obj.nbytes + sys.getsizeof(obj) * (obj.base is None)
+    if isinstance(obj, (pd.DataFrame, pd.Series)):
+        return int(np.sum(obj.memory_usage(deep=True)))
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(deep_sizeof(k, seen) + deep_sizeof(v, seen) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        size += sum(deep_sizeof(v, seen) for v in obj)
+    elif hasattr(obj, "__dict__"):
+        size += deep_sizeof(vars(obj), seen)
+    return size
+
+
+def _session_sizes() -> pd.DataFrame:
+    rows = [(str(k), deep_sizeof(v)) for k, v in st.session_state.items()]
+    df = pd.DataFrame(rows, columns=["Key", "Bytes"]).sort_values("Bytes", ascending=False)
+    return df.reset_index(drop=True)
+
+
+def _prepare_export():
+    st.session_state.diag_export = (time.strftime("%H:%M:%S"), perf.prometheus_text(),
+                                    json.dumps(perf.to_dict(), indent=2))
+
+
+def render():
+    # Read-only: timing is process-wide, so one viewer must not switch it for
+    # every other session.  It is set at startup with TBM_PERF=1.
+    st.caption(f"Timing collection is **{'on' if perf.enabled() else 'off'}** for this server process "
+               "(set TBM_PERF=1 at startup to turn it on).")
+    sections = perf.stats()
+    sizes = _session_sizes()
+    session_bytes = int(sizes["Bytes"].sum())
+    perf.gauge("session_state.bytes", lambda: session_bytes)   # last session to render
+    gauges = perf.gauges()
+
+    def p95(name):
+        return f"{sections[name]['p95_ms']:.1f} ms" if name in sections else "–"
+
+    c1, c2, c3, c4 = st.columns(4)
+    c1.metric("Rerun p95", p95("rerun"))
+    c2.metric("Tick jitter p95", p95("acquisition.tick_jitter"))
+    pending = gauges.get("journal.pending_rows", np.nan)
+    c3.metric("Journal queue", "–" if np.isnan(pending) else f"{pending:.0f} rows")
+    c4.metric("Session state", f"{session_bytes / 1024:.1f} kB")
+
+    st.markdown("#### Section timers (last %d samples each)" % perf.MAX_SAMPLES)
+    if sections:
+        df = pd.DataFrame.from_dict(sections, orient="index").sort_values("mean_ms", ascending=False)
+        st.dataframe(df.round(2), use_container_width=True)
+    else:
+        st.caption("No timings yet. Start the server with TBM_PERF=1 to collect them.")
+
+    st.markdown("#### Duration histogram")
+    names = sorted(sections) or ["rerun"]
+    name = st.selectbox("Section", names, index=names.index("rerun") if "rerun" in names else 0,
+                        key="diag_hist_section")
+    hist = perf.histogram(name)
+    st.bar_chart(pd.Series(hist, name="count"), sort=False)
+
+    left, right = st.columns(2)
+    with left:
+        st.markdown("#### Session state")
+        st.dataframe(sizes.head(20), hide_index=True, use_container_width=True)
+    with right:
+        st.markdown("#### Gauges")
+        st.dataframe(pd.Series(gauges, name="value").rename_axis("gauge"), use_container_width=True)
+
+    st.markdown("#### Export")
+    # Fixed server-side paths: the tab is reachable by anyone with the URL,
+    # so viewers must not choose where the server writes.
+    st.caption(f"Server copies go to `{EXPORT_PATH.parent}`.")
+    b1, b2, b3 = st.columns(3)
+    if b1.button("Write Prometheus text", key="diag_export_prom"):
+        st.success(f"Wrote {perf.export(EXPORT_PATH)}")
+    if b2.button("Write JSON", key="diag_export_json"):
+        st.success(f"Wrote {perf.export(EXPORT_PATH.with_suffix('.json'))}")
+    # Export text is built only on request, not on every render.
+    b3.button("Prepare downloads", key="diag_prepare_export", on_click=_prepare_export)
+    prepared = st.session_state.get("diag_export")
+    if prepared is not None:
+        taken_at, prom, as_json = prepared
+        st.caption(f"Snapshot taken at {taken_at}.")
+        d1, d2 = st.columns(2)
+        d1.download_button("Download Prometheus text", prom, file_name=EXPORT_PATH.name,
+                           mime="text/plain", key="diag_download_prom")
+        d2.download_button("Download JSON", as_json, file_name=EXPORT_PATH.with_suffix(".json").name,
+                           mime="application/json", key="diag_download_json")
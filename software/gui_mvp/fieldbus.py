@@ -0,0 +1,261 @@
+"""
+Field-bus data sources: batched, connection-pooled Modbus TCP tag reads.
+
+The PLC (unit 1) exposes one block of holding registers per device from
+tbm_systems_power.json; the IO-Link master (unit 2) exposes process values
+such as PT-101 pressure and CTH-101 enclosure temperature.  ``tag_map()``
+is the single source of truth for that layout and is shared with the local
+stand-in server in ``sim_plc.py``.
+
+Reads are grouped into as few contiguous "read holding registers" requests
+as possible and issued concurrently over a small pool of asyncio
+connections, so polling many tags costs a few round trips per cycle.
+Only the Modbus TCP subset we need (functions 3 and 6) is implemented;
+there is no third-party dependency.
+"""
+import asyncio
+import itertools
+import struct
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from acquisition import SignalSource
+from device_state import DeviceTable
+
+PLC_UNIT = 1
+IOLINK_UNIT = 2
+MAX_REGS_PER_READ = 125            # Modbus limit for function 3
+
+# Per-device register block on the PLC: offset -> (field, scale)
+DEVICE_FIELDS = (("on", 1.0), ("current", 100.0), ("speed", 10.0), ("torque", 10.0))
+REGS_PER_DEVICE = len(DEVICE_FIELDS)
+
+# IO-Link process values: (channel, register, scale)
+IOLINK_CHANNELS = (
+    ("pressure", 0, 100.0),          # bar
+    ("enclosure_temp", 1, 10.0),     # °C
+)
+
+
+class Tag(NamedTuple):
+    name: str          # "<label>.<field>" or channel name
+    unit: int
+    address: int
+    scale: float
+
+
+class ModbusError(Exception):
+    pass
+
+
+def tag_map(labels: Iterable[str]) -> List[Tag]:
+    """Register layout for the given device labels plus the IO-Link channels."""
+    tags = []
+    for i, label in enumerate(labels):
+        for offset, (field, scale) in enumerate(DEVICE_FIELDS):
+            tags.append(Tag(f"{label}.{field}", PLC_UNIT, i * REGS_PER_DEVICE + offset, scale))
+    for channel, address, scale in IOLINK_CHANNELS:
+        tags.append(Tag(channel, IOLINK_UNIT, address, scale))
+    return tags
+
+
+def plan_reads(tags: Iterable[Tag]) -> List[Tuple[int, int, int, List[Tag]]]:
+    """Group tags into (unit, start, count, tags) contiguous read requests."""
+    plans = []
+    by_unit: Dict[int, List[Tag]] = {}
+    for tag in tags:
+        by_unit.setdefault(tag.unit, []).append(tag)
+    for unit, unit_tags in sorted(by_unit.items()):
+        unit_tags.sort(key=lambda t: t.address)
+        start = None
+        group: List[Tag] = []
+        for tag in unit_tags:
+            if start is not None and (tag.address - start >= MAX_REGS_PER_READ
+                                      or tag.address > group[-1].address + 1):
+                plans.append((unit, start, group[-1].address - start + 1, group))
+                start, group = None, []
+            if start is None:
+                start = tag.address
+            group.append(tag)
+        if group:
+            plans.append((unit, start, group[-1].address - start + 1, group))
+    return plans
+
+
+def to_signed(reg: int) -> int:
+    return reg - 0x10000 if reg & 0x8000 else reg
+
+
+def to_register(value: float, scale: float) -> int:
+    raw = int(round(value * scale))
+    raw = max(-0x8000, min(0x7FFF, raw))
+    return raw & 0xFFFF
+
+
+# ------------------------------------------------------------
+# Client
+# ------------------------------------------------------------
+class _Connection:
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.reader = reader
+        self.writer = writer
+
+    async def request(self, tid: int, unit: int, pdu: bytes) -> bytes:
+        self.writer.write(struct.pack(">HHHB", tid, 0, len(pdu) + 1, unit) + pdu)
+        await self.writer.drain()
+        header = await self.reader.readexactly(7)
+        rtid, _, length, _ = struct.unpack(">HHHB", header)
+        body = await self.reader.readexactly(length - 1)
+        if rtid != tid:
+            raise ModbusError(f"transaction id mismatch ({rtid} != {tid})")
+        if body[0] & 0x80:
+            raise ModbusError(f"exception code {body[1]} for function {body[0] & 0x7F}")
+        return body
+
+    def close(self):
+        self.writer.close()
+
+
+class ModbusClient:
+    """Pool of Modbus TCP connections; one request in flight per connection."""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 5020, pool_size: int = 4,
+                 timeout: float = 1.0):
+        self.host = host
+        self.port = port
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self._idle: Optional[asyncio.Queue] = None
+        self._opened = 0
+        self._tid = itertools.count(1)
+        self.requests = 0
+
+    async def _acquire(self) -> _Connection:
+        if self._idle is None:
+            self._idle = asyncio.Queue()
+        if self._idle.empty() and self._opened < self.pool_size:
+            self._opened += 1
+            try:
+                reader, writer = await asyncio.wait_for(
+                    asyncio.open_connection(self.host, self.port), self.timeout
+                )
+            except BaseException:
+                self._opened -= 1
+                raise
+            return _Connection(reader, writer)
+        # A connection lost without being returned would otherwise block forever.
+        return await asyncio.wait_for(self._idle.get(), self.timeout)
+
+    async def _call(self, unit: int, pdu: bytes) -> bytes:
+        conn = await self._acquire()
+        try:
+            tid = next(self._tid) & 0xFFFF
+            body = await asyncio.wait_for(conn.request(tid, unit, pdu), self.timeout)
+        except BaseException:
+            # Connection state is unknown after an error: drop it.
+            conn.close()
+            self._opened -= 1
+            raise
+        self._idle.put_nowait(conn)
+        self.requests += 1
+        return body
+
+    async def read_registers(self, unit: int, start: int, count: int) -> List[int]:
+        body = await self._call(unit, struct.pack(">BHH", 3, start, count))
+        return list(struct.unpack(f">{body[1] // 2}H", body[2:]))
+
+    async def write_register(self, unit: int, address: int, value: int):
+        await self._call(unit, struct.pack(">BHH", 6, address, value))
+
+    async def read_tags(self, tags: Iterable[Tag]) -> Dict[str, float]:
+        """Read every tag with concurrent, batched requests; values are unscaled."""
+        plans = plan_reads(tags)
+        blocks = await asyncio.gather(
+            *(self.read_registers(unit, start, count) for unit, start, count, _ in plans)
+        )
+        values = {}
+        for (_, start, _, group), regs in zip(plans, blocks):
+            for tag in group:
+                values[tag.name] = to_signed(regs[tag.address - start]) / tag.scale
+        return values
+
+    async def close(self):
+        if self._idle is not None:
+            while not self._idle.empty():
+                self._idle.get_nowait().close()
+        self._opened = 0
+
+
+# ------------------------------------------------------------
+# Acquisition source
+# ------------------------------------------------------------
+class ModbusSource(SignalSource):
+    """
+    Polls the PLC and IO-Link master over Modbus TCP from the engine thread.
+    Operator ON/OFF commands are written to the PLC before each read.  The
+    engine polls without its lock, so a slow or dead PLC delays only the
+    next sample, never the dashboard.
+    """
+
+    name = "modbus"
+
+    def __init__(self, labels: Iterable[str], host: str = "127.0.0.1", port: int = 5020,
+                 pool_size: int = 4, timeout: float = 1.0):
+        self.labels = list(labels)
+        self.tags = tag_map(self.labels)
+        self._address = {t.name: t.address for t in self.tags}
+        self.client = ModbusClient(host, port, pool_size, timeout)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._written_on: Dict[str, bool] = {}
+        self.errors = 0
+        self.last_error: Optional[str] = None
+
+    def _run(self, coro):
+        if self._loop is None:
+            self._loop = asyncio.new_event_loop()
+        try:
+            return self._loop.run_until_complete(coro)
+        except BaseException:
+            # gather() fails on the first error and leaves the other requests
+            # queued for a connection; cancel them so they cannot run later
+            # as stale writes.
+            pending = asyncio.all_tasks(self._loop)
+            for task in pending:
+                task.cancel()
+            if pending:
+                self._loop.run_until_complete(asyncio.gather(*pending, return_exceptions=True))
+            raise
+
+    async def _cycle(self, devices: DeviceTable) -> Dict[str, float]:
+        writes = [
+            self.client.write_register(PLC_UNIT, self._address[f"{label}.on"], int(devices[label]["on"]))
+            for label in self.labels
+            if self._written_on.get(label) != devices[label]["on"]
+        ]
+        if writes:
+            await asyncio.gather(*writes)
+            self._written_on.update({label: devices[label]["on"] for label in self.labels})
+        return await self.client.read_tags(self.tags)
+
+    def poll(self, devices: DeviceTable, now: float) -> Dict[str, float]:
+        try:
+            tags = self._run(self._cycle(devices))
+        except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError, ModbusError) as e:
+            self.errors += 1
+            self.last_error = str(e)
+            return {}
+        self.last_error = None
+
+        for label in self.labels:
+            state = devices[label]
+            for field, _ in DEVICE_FIELDS[1:]:
+                state[field] = tags[f"{label}.{field}"]
+        values = {channel: tags[channel] for channel, _, _ in IOLINK_CHANNELS}
+        values["cutterhead_current"] = tags.get("Cutter Head Motor.current", 0.0)
+        values["jack_current"] = tags.get("Screw Jack.current", 0.0)
+        return values
+
+    def close(self):
+        if self._loop is not None:
+            self._run(self.client.close())
+            self._loop.close()
+            self._loop = None
@@ -0,0 +1,149 @@
+"""
+Multi-resolution history: a bounded raw tier plus min/max/mean rollups.
+
+Timestamps are numeric (epoch seconds, float64).  Every tier is a fixed
+capacity ``TelemetryStore`` so memory is flat no matter how long the GUI
+runs, and ``window()`` picks the finest tier that still covers the visible
+span within the point budget, so chart cost is flat too.
+"""
+import datetime
+import math
+import time
+from typing import Dict, Iterable, Mapping, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from telemetry import TelemetryStore
+
+# (tier name, bucket width in seconds, capacity in buckets)
+ROLLUP_TIERS = (
+    ("10s", 10.0, 6 * 360),      # 6 h
+    ("1min", 60.0, 24 * 60),     # 24 h
+    ("10min", 600.0, 7 * 144),   # 7 days
+)
+RAW_CAPACITY = 3600              # 1 h at the 1 s refresh rate
+STATS = ("min", "max", "mean")
+
+
+class _Rollup:
+    """One rollup tier: a store of closed buckets plus the open accumulator."""
+
+    def __init__(self, channels: Tuple[str, ...], width: float, capacity: int):
+        self.channels = channels
+        self.width = width
+        self.store = TelemetryStore(
+            [f"{c}_{s}" for c in channels for s in STATS],
+            capacity=capacity,
+            time_dtype="float64",
+        )
+        n = len(channels)
+        self._start = None
+        self._count = np.zeros(n)
+        self._sum = np.zeros(n)
+        self._min = np.full(n, np.inf)
+        self._max = np.full(n, -np.inf)
+
+    def add(self, t: float, row: np.ndarray):
+        start = math.floor(t / self.width) * self.width
+        if self._start is not None and start != self._start:
+            self.flush()
+        self._start = start
+        ok = ~np.isnan(row)
+        self._count += ok
+        self._sum += np.where(ok, row, 0.0)
+        self._min = np.where(ok, np.minimum(self._min, row), self._min)
+        self._max = np.where(ok, np.maximum(self._max, row), self._max)
+
+    def flush(self):
+        if self._start is None:
+            return
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean = self._sum / self._count
+        empty = self._count == 0
+        values = {}
+        for i, c in enumerate(self.channels):
+            values[f"{c}_min"] = np.nan if empty[i] else self._min[i]
+            values[f"{c}_max"] = np.nan if empty[i] else self._max[i]
+            values[f"{c}_mean"] = mean[i]
+        self.store.append(self._start, values)
+        self._start = None
+        self._count[:] = 0
+        self._sum[:] = 0
+        self._min[:] = np.inf
+        self._max[:] = -np.inf
+
+
+class MultiResolutionHistory:
+    def __init__(self, channels: Iterable[str], raw_capacity: int = RAW_CAPACITY,
+                 tiers=ROLLUP_TIERS):
+        self.channels = tuple(channels)
+        self.raw = TelemetryStore(self.channels, capacity=raw_capacity, time_dtype="float64")
+        self.rollups = {name: _Rollup(self.channels, width, cap) for name, width, cap in tiers}
+
+    def __len__(self) -> int:
+        return len(self.raw)
+
+    def append(self, values: Mapping[str, float], t: Optional[float] = None):
+        """Record one sample (``t`` in epoch seconds, defaults to now)."""
+        t = time.time() if t is None else float(t)
+        self.raw.append(t, values)
+        row = np.array([values.get(c, np.nan) for c in self.channels], dtype=np.float64)
+        for tier in self.rollups.values():
+            tier.add(t, row)
+
+    def latest(self, name: str, default: float = 0.0) -> float:
+        return self.raw.latest(name, default)
+
+    # --------------------------------------------------------
+    # Tier selection
+    # --------------------------------------------------------
+    def pick_tier(self, seconds: float, now: float, max_points: int) -> str:
+        """Finest tier that covers ``seconds`` back from ``now`` within ``max_points``."""
+        raw_t = self.raw.times()
+        if len(raw_t):
+            raw_covers = self.raw.total_appended == len(self.raw) or raw_t[0] <= now - seconds
+            in_window = len(raw_t) - np.searchsorted(raw_t, now - seconds)
+            if raw_covers and in_window <= max_points:
+                return "raw"
+        for name, tier in self.rollups.items():
+            store = tier.store
+            t = store.times()
+            covers = store.total_appended == len(store) or (len(t) and t[0] <= now - seconds)
+            if covers and seconds / tier.width <= max_points:
+                return name
+        return list(self.rollups)[-1]
+
+    def window(self, seconds: float, now: Optional[float] = None,
+               max_points: int = 600) -> Tuple[str, np.ndarray, Dict[str, np.ndarray]]:
+        """
+        (tier, times, columns) for the last ``seconds``.
+        Raw columns are keyed by channel; rollup columns by ``<channel>_<stat>``.
+        """
+        now = time.time() if now is None else now
+        tier = self.pick_tier(seconds, now, max_points)
+        store = self.raw if tier == "raw" else self.rollups[tier].store
+        t = store.times()
+        n = len(t) - int(np.searchsorted(t, now - seconds))
+        return tier, store.times(n), store.last(n)
+
+    def frame(self, seconds: float, columns: Mapping[str, str],
+              now: Optional[float] = None, max_points: int = 600) -> pd.DataFrame:
+        """
+        Chart-ready DataFrame indexed by datetime for the visible window.
+        ``columns`` maps channel names to display names; rollup tiers add
+        ``"<name> min"`` / ``"<name> max"`` envelope columns next to the mean.
+        """
+        tier, t, cols = self.window(seconds, now=now, max_points=max_points)
+        data = {}
+        for channel, label in columns.items():
+            if tier == "raw":
+                data[label] = cols[channel]
+            else:
+                data[label] = cols[f"{channel}_mean"]
+                data[f"{label} min"] = cols[f"{channel}_min"]
+                data[f"{label} max"] = cols[f"{channel}_max"]
+        # Display in local wall-clock time, like the rest of the GUI
+        local_tz = datetime.datetime.now().astimezone().tzinfo
+        index = pd.to_datetime(np.asarray(t), unit="s", utc=True).tz_convert(local_tz).tz_localize(None)
+        return pd.DataFrame(data, index=pd.Index(index, name="Time"))
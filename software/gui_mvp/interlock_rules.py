@@ -0,0 +1,260 @@
+"""
+Compiled interlock rule engine.
+
+Trip conditions such as ``"≥155 °F"`` or ``">60 psi"`` are parsed once into
+parallel NumPy arrays (channel index, threshold, clear level, direction).
+``RuleEvaluator.evaluate`` then checks a whole batch of samples against every
+rule with a handful of array operations: no per-row or per-rule Python
+branching, so it scales to hundreds of rules at kHz sample rates.
+
+Semantics per rule:
+
+* Hysteresis: a rule becomes *active* when the signal crosses the threshold
+  and stays active until it is back past the clear level
+  (``threshold - hysteresis`` for high limits, ``threshold + hysteresis``
+  for low limits).
+* Every trip sets *latched*. How the latch is released depends on ``Reset``:
+
+  - ``L``     latch; the automatic reset (``auto_reset``, run after every
+              sample) releases it once the condition has stayed clear for
+              ``AUTO_RESET_S``, and an operator reset releases it sooner.
+  - ``MR``    manual reset; the trip follows the condition, but the rule is
+              not ready again until an operator reset.
+  - ``L+MR``  the trip itself is held: the rule stays active after the
+              condition clears, until an operator reset releases it.
+
+  A reset is always refused while the condition is still present.
+
+Several rules may drive one interlock (e.g. a low and a high limit on the
+same pressure): ``Rule.interlock`` names it and defaults to the rule id.
+"""
+import re
+import time
+from typing import Dict, Iterable, List, Mapping, NamedTuple, Optional, Sequence
+
+import numpy as np
+
+RESET_MODES = ("L", "MR", "L+MR")
+_OPS = {"≥": ">=", ">=": ">=", ">": ">", "≤": "<=", "<=": "<=", "<": "<"}
+_CONDITION_RE = re.compile(r"^\s*(≥|≤|>=|<=|>|<)\s*([-+]?\d+(?:\.\d+)?)\s*(.*?)\s*$")
+
+DEFAULT_HYSTERESIS_FRAC = 0.02   # clear 2 % inside the trip threshold
+AUTO_RESET_S = 10.0              # how long an L rule's condition must stay clear before auto_reset
+
+
+class Rule(NamedTuple):
+    id: str
+    channel: str
+    op: str            # one of >=, >, <=, <
+    threshold: float
+    unit: str
+    hysteresis: float
+    reset: str
+    interlock: str     # interlock the rule drives; several rules may share one
+
+
+def parse_condition(text: str):
+    """``"≥155 °F"`` -> (">=", 155.0, "°F")."""
+    m = _CONDITION_RE.match(text)
+    if not m:
+        raise ValueError(f"Unrecognised trip condition {text!r}")
+    op, value, unit = m.groups()
+    return _OPS[op], float(value), unit
+
+
+def make_rule(rule_id: str, channel: str, condition: str, reset: str = "L+MR",
+              hysteresis: Optional[float] = None, interlock: Optional[str] = None) -> Rule:
+    op, threshold, unit = parse_condition(condition)
+    if reset not in RESET_MODES:
+        raise ValueError(f"Rule {rule_id}: unknown reset mode {reset!r}")
+    if hysteresis is None:
+        hysteresis = abs(threshold) * DEFAULT_HYSTERESIS_FRAC
+    return Rule(rule_id, channel, op, threshold, unit, float(hysteresis), reset, interlock or rule_id)
+
+
+def rules_from_table(rows: Iterable[Mapping], channels: Mapping[str, str]) -> List[Rule]:
+    """
+    Build rules from ``demo_interlocks``-style rows (``ID``, ``Measurement``,
+    ``Trip Condition``, ``Reset``). ``channels`` binds each measurement to a
+    telemetry channel; rows without a binding are skipped.
+    """
+    rules = []
+    for row in rows:
+        channel = channels.get(row["Measurement"])
+        if channel is None:
+            continue
+        rules.append(make_rule(row["ID"], channel, row["Trip Condition"], row.get("Reset", "L+MR"),
+                               row.get("Hysteresis")))
+    return rules
+
+
+class BatchResult(NamedTuple):
+    active: np.ndarray         # (n_samples, n_rules) bool, hysteresis and L+MR holds applied
+    tripped: List[str]         # rule ids that tripped during the batch
+    cleared: List[str]         # rule ids that went inactive (L+MR rules wait for reset())
+    latency_s: float
+
+
+class RuleEvaluator:
+    def __init__(self, rules: Sequence[Rule]):
+        self.rules = list(rules)
+        self.ids = [r.id for r in self.rules]
+        self.index = {rid: i for i, rid in enumerate(self.ids)}
+        self.by_interlock: Dict[str, List[int]] = {}
+        for i, r in enumerate(self.rules):
+            self.by_interlock.setdefault(r.interlock, []).append(i)
+        self.channels = sorted({r.channel for r in self.rules})
+        chan_index = {c: i for i, c in enumerate(self.channels)}
+
+        # Normalise every rule to "y >= T" / "y > T" with y = sign * x so
+        # high and low limits share one comparison.
+        high = np.array([r.op in (">=", ">") for r in self.rules], dtype=bool)
+        self._sign = np.where(high, 1.0, -1.0)
+        thr = np.array([r.threshold for r in self.rules], dtype=np.float64)
+        hyst = np.array([r.hysteresis for r in self.rules], dtype=np.float64)
+        self._trip_level = self._sign * thr
+        self._clear_level = self._sign * thr - hyst
+        self._strict = np.array([r.op in (">", "<") for r in self.rules], dtype=bool)
+        self._has_hyst = hyst > 0
+        self._chan = np.array([chan_index[r.channel] for r in self.rules], dtype=np.intp)
+        self._manual_only = np.array([r.reset in ("MR", "L+MR") for r in self.rules], dtype=bool)
+        self._hold = np.array([r.reset == "L+MR" for r in self.rules], dtype=bool)
+
+        n = len(self.rules)
+        self.condition = np.zeros(n, dtype=bool)   # threshold crossed, hysteresis applied
+        self.active = np.zeros(n, dtype=bool)      # condition, or an L+MR trip not yet reset
+        self.latched = np.zeros(n, dtype=bool)
+        self.last_value = np.full(n, np.nan)
+        self.last_trip_at = np.full(n, np.nan)   # epoch seconds
+        self.cleared_at = np.full(n, np.nan)     # epoch seconds the condition last cleared
+
+        self.batches = 0
+        self.samples = 0
+        self.last_latency_s = 0.0
+        self.total_latency_s = 0.0
+
+    # --------------------------------------------------------
+    # Evaluation
+    # --------------------------------------------------------
+    def evaluate(self, values: np.ndarray, times: Optional[np.ndarray] = None) -> BatchResult:
+        """
+        Evaluate a batch. ``values`` is (n_samples, n_channels) in ``self.channels``
+        order; NaN means "no reading" and never trips or clears a rule.
+        """
+        t0 = time.perf_counter()
+        values = np.asarray(values, dtype=np.float64)
+        n = values.shape[0]
+        if n == 0 or not self.rules:
+            return BatchResult(np.zeros((n, len(self.rules)), dtype=bool), [], [], 0.0)
+
+        y = values[:, self._chan] * self._sign                     # (n, R)
+        valid = ~np.isnan(y)
+        trip = np.where(self._strict, y > self._trip_level, y >= self._trip_level)
+        clear = valid & np.where(self._has_hyst, y <= self._clear_level, ~trip)
+
+        # Schmitt trigger over time without a Python loop: the state at each
+        # sample is the most recent trip (+1) or clear (-1) event so far.
+        event = np.where(trip, 1, np.where(clear, -1, 0)).astype(np.int8)
+        rows = np.arange(n)[:, None]
+        last = np.maximum.accumulate(np.where(event != 0, rows, -1), axis=0)
+        decided = last >= 0
+        picked = np.take_along_axis(event, np.maximum(last, 0), axis=0) == 1
+        condition = np.where(decided, picked, self.condition)
+        # L+MR: once tripped, stay active until reset() releases the hold.
+        held = self._hold & (np.logical_or.accumulate(condition, axis=0) | self.active)
+        active = condition | held
+
+        prev = np.vstack([self.active[None, :], active[:-1]])
+        rising = active & ~prev
+        falling = ~active & prev
+        any_rise = rising.any(axis=0)
+
+        if times is not None and any_rise.any():
+            first = np.argmax(rising, axis=0)
+            self.last_trip_at = np.where(any_rise, np.asarray(times, dtype=np.float64)[first], self.last_trip_at)
+        elif any_rise.any():
+            self.last_trip_at = np.where(any_rise, time.time(), self.last_trip_at)
+
+        cond_prev = np.vstack([self.condition[None, :], condition[:-1]])
+        cond_fall = cond_prev & ~condition
+        any_fall = cond_fall.any(axis=0)
+        if any_fall.any():
+            last_fall = n - 1 - np.argmax(cond_fall[::-1], axis=0)
+            at = np.asarray(times, dtype=np.float64)[last_fall] if times is not None else time.time()
+            self.cleared_at = np.where(any_fall, at, self.cleared_at)
+
+        self.latched |= any_rise
+        self.condition = condition[-1].copy()
+        self.active = active[-1].copy()
+        has_value = valid.any(axis=0)
+        last_valid = np.where(has_value, np.argmax(valid[::-1], axis=0), 0)
+        self.last_value = np.where(
+            has_value,
+            (y[n - 1 - last_valid, np.arange(len(self.rules))] * self._sign),
+            self.last_value,
+        )
+
+        latency = time.perf_counter() - t0
+        self.batches += 1
+        self.samples += n
+        self.last_latency_s = latency
+        self.total_latency_s += latency
+        ids = self.ids
+        return BatchResult(
+            active,
+            [ids[i] for i in np.flatnonzero(any_rise)],
+            [ids[i] for i in np.flatnonzero(falling.any(axis=0) & ~self.active)],
+            latency,
+        )
+
+    def evaluate_sample(self, values: Mapping[str, float], t: Optional[float] = None) -> BatchResult:
+        """Convenience wrapper for one engine sample given as a channel dict."""
+        row = np.array([[values.get(c, np.nan) for c in self.channels]], dtype=np.float64)
+        return self.evaluate(row, None if t is None else np.array([t]))
+
+    # --------------------------------------------------------
+    # Reset / status
+    # --------------------------------------------------------
+    def reset(self, ids: Iterable[str], manual: bool = True) -> List[str]:
+        """Release latches (and L+MR holds); returns the ids that were actually reset."""
+        done = []
+        for rid in ids:
+            i = self.index.get(rid)
+            if i is None or self.condition[i] or not self.latched[i]:
+                continue
+            if self._manual_only[i] and not manual:
+                continue
+            self.latched[i] = False
+            self.active[i] = False
+            done.append(rid)
+        return done
+
+    def auto_reset(self, now: Optional[float] = None, delay_s: float = AUTO_RESET_S) -> List[str]:
+        """Automatic reset sequence: release ``L`` latches clear for ``delay_s``; returns their ids."""
+        now = time.time() if now is None else now
+        due = self.latched & ~self.condition & ~self._manual_only & (now - self.cleared_at >= delay_s)
+        if not due.any():
+            return []
+        return self.reset([self.ids[i] for i in np.flatnonzero(due)], manual=False)
+
+    def interlock_present(self, interlock: str) -> bool:
+        """Whether any rule driving ``interlock`` still sees its condition."""
+        return bool(self.condition[self.by_interlock[interlock]].any())
+
+    def status(self, rid: str) -> str:
+        """"TRIPPED", "RESET REQUIRED" (MR), "LATCHED" or "OK"."""
+        i = self.index[rid]
+        if self.condition[i]:
+            return "TRIPPED"
+        if self.latched[i]:
+            return "RESET REQUIRED" if self.rules[i].reset == "MR" else "LATCHED"
+        return "OK"
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "rules": len(self.rules),
+            "batches": self.batches,
+            "samples": self.samples,
+            "last_latency_ms": 1000 * self.last_latency_s,
+            "mean_latency_ms": 1000 * self.total_latency_s / self.batches if self.batches else 0.0,
+        }
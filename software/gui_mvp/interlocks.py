@@ -0,0 +1,139 @@
+"""
+Indexed interlock registry.
+
+Definitions are indexed once by category, severity and criticality, and the
+active / latched counts are maintained incrementally as states change, so
+SAFETY_OK, ESTOP_LATCHED, per-category counts and the highest active severity
+are O(1) reads.  Every transition is appended to a bounded event stream and
+pushed to subscribers, so the UI and loggers only react to changes.
+"""
+import datetime
+import itertools
+from collections import Counter, deque
+from typing import Callable, Dict, Iterable, List, Mapping, NamedTuple, Optional, Tuple
+
+SEVERITIES = ("Low", "Medium", "High", "Critical")   # ascending
+
+
+class InterlockEvent(NamedTuple):
+    seq: int
+    at: datetime.datetime
+    id: str
+    kind: str          # "trip", "clear", "reset"
+    active: bool
+    latched: bool
+
+
+class InterlockRegistry:
+    def __init__(self, defs: Iterable[Mapping], critical_ids: Iterable[str],
+                 max_events: int = 1000):
+        self.defs: Dict[str, Mapping] = {d["id"]: d for d in defs}
+        self.ids: Tuple[str, ...] = tuple(self.defs)
+        self.critical = frozenset(critical_ids)
+
+        by_category: Dict[str, List[str]] = {}
+        by_severity: Dict[str, List[str]] = {}
+        for iid, d in self.defs.items():
+            by_category.setdefault(d["category"], []).append(iid)
+            by_severity.setdefault(d["severity"], []).append(iid)
+        self.by_category = {k: tuple(v) for k, v in by_category.items()}
+        self.by_severity = {k: tuple(v) for k, v in by_severity.items()}
+        self.categories = tuple(sorted(self.by_category))
+
+        self.states = {
+            iid: {"active": False, "latched": False, "last_trip": None}
+            for iid in self.ids
+        }
+        self.active_count = 0
+        self.latched_count = 0
+        self.active_critical = 0
+        self.active_by_category: Counter = Counter()
+        self.latched_by_category: Counter = Counter()
+        self.active_by_severity: Counter = Counter()
+
+        self.events: deque = deque(maxlen=max_events)
+        self._seq = itertools.count(1)
+        self.last_seq = 0
+        self._subscribers: List[Callable[[InterlockEvent], None]] = []
+
+    # --------------------------------------------------------
+    # O(1) aggregates
+    # --------------------------------------------------------
+    @property
+    def safety_ok(self) -> bool:
+        # In real system this is from the safety PLC.
+        return self.active_critical == 0
+
+    def is_latched(self, iid: str) -> bool:
+        return self.states[iid]["latched"]
+
+    def highest_active_severity(self) -> Optional[str]:
+        for sev in reversed(SEVERITIES):
+            if self.active_by_severity[sev]:
+                return sev
+        return None
+
+    def counts(self) -> Dict[str, object]:
+        return {
+            "active": self.active_count,
+            "latched": self.latched_count,
+            "active_critical": self.active_critical,
+            "active_by_category": dict(self.active_by_category),
+            "latched_by_category": dict(self.latched_by_category),
+            "highest_active_severity": self.highest_active_severity(),
+        }
+
+    # --------------------------------------------------------
+    # Transitions
+    # --------------------------------------------------------
+    def _set(self, iid: str, kind: str, active: bool, latched: bool,
+             when: Optional[datetime.datetime] = None) -> bool:
+        state = self.states[iid]
+        d = self.defs[iid]
+        if kind == "trip":
+            state["last_trip"] = when or datetime.datetime.now()
+        if state["active"] == active and state["latched"] == latched and kind != "trip":
+            return False
+
+        if state["active"] != active:
+            step = 1 if active else -1
+            self.active_count += step
+            self.active_by_category[d["category"]] += step
+            self.active_by_severity[d["severity"]] += step
+            if iid in self.critical:
+                self.active_critical += step
+        if state["latched"] != latched:
+            step = 1 if latched else -1
+            self.latched_count += step
+            self.latched_by_category[d["category"]] += step
+        state["active"] = active
+        state["latched"] = latched
+
+        event = InterlockEvent(next(self._seq), when or datetime.datetime.now(), iid, kind, active, latched)
+        self.last_seq = event.seq
+        self.events.append(event)
+        for fn in self._subscribers:
+            fn(event)
+        return True
+
+    def trip(self, iid: str, when: Optional[datetime.datetime] = None) -> bool:
+        return self._set(iid, "trip", True, True, when)
+
+    def clear(self, iid: str) -> bool:
+        """Trip condition gone; the latch stays until reset."""
+        return self._set(iid, "clear", False, self.states[iid]["latched"])
+
+    def reset(self, iid: str) -> bool:
+        return self._set(iid, "reset", False, False)
+
+    # --------------------------------------------------------
+    # Change events
+    # --------------------------------------------------------
+    def subscribe(self, fn: Callable[[InterlockEvent], None]):
+        self._subscribers.append(fn)
+
+    def events_since(self, seq: int) -> List[InterlockEvent]:
+        """Events newer than ``seq`` still held in the bounded stream."""
+        if seq >= self.last_seq:
+            return []
+        return [e for e in self.events if e.seq > seq]
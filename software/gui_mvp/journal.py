@@ -0,0 +1,282 @@
+"""
+Append-only on-disk telemetry journal.
+
+One run is one directory holding ``meta.json`` and one fixed-width float64
+column file per channel (``time.f64``, ``c0000.f64``, ...).  Columns are
+only ever appended, so a reader can memory-map them and hand out zero-copy
+slices for any time range; opening a multi-hour run costs a few mmap calls.
+A torn final row after a crash is ignored (length = shortest column).
+Discrete events such as interlock trips go to ``events.ndjson`` alongside.
+
+Writers buffer rows in a preallocated block and a background thread
+flushes full or aged blocks, so ``append()`` on the acquisition thread is
+a row copy under a lock.  Runs live under ``TBM_JOURNAL_DIR`` (default
+``software/gui_mvp/runs``).
+"""
+import atexit
+import datetime
+import functools
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, List, Mapping, Optional, Tuple
+
+import numpy as np
+
+from device_state import FIELDS as DEVICE_FIELDS, DeviceTable
+
+JOURNAL_DIR = Path(os.environ.get("TBM_JOURNAL_DIR", Path(__file__).with_name("runs")))
+FORMAT_VERSION = 1
+DTYPE = np.dtype("<f8")
+
+
+def device_channels(labels: Iterable[str]) -> List[str]:
+    """Journal channel names for every field of every device."""
+    return list(_device_channels(tuple(labels)))
+
+
+@functools.lru_cache(maxsize=8)
+def _device_channels(labels: Tuple[str, ...]) -> Tuple[str, ...]:
+    return tuple(f"{label}.{field}" for label in labels for field in DEVICE_FIELDS)
+
+
+def device_values(devices: Mapping[str, Mapping]) -> Dict[str, float]:
+    """Flatten device states into journal channel values."""
+    if isinstance(devices, DeviceTable):
+        return dict(zip(_device_channels(devices.labels), devices.matrix().ravel().tolist()))
+    return {
+        f"{label}.{field}": float(state[field])
+        for label, state in devices.items()
+        for field in DEVICE_FIELDS
+    }
+
+
+def _column_file(i: int) -> str:
+    return f"c{i:04d}.f64"
+
+
+# ------------------------------------------------------------
+# Writer
+# ------------------------------------------------------------
+class JournalWriter:
+    def __init__(self, channels: Iterable[str], root: Path = JOURNAL_DIR, name: str = "run",
+                 block_rows: int = 4096, flush_interval: float = 1.0, meta: Optional[Dict] = None):
+        self.channels = list(channels)
+        self._index = {c: i for i, c in enumerate(self.channels)}
+        created = datetime.datetime.now()
+        base = f"{created:%Y%m%d-%H%M%S}-{name}"
+        Path(root).mkdir(parents=True, exist_ok=True)
+        for n in range(1, 1000):
+            self.run_id = base if n == 1 else f"{base}-{n}"
+            self.path = Path(root) / self.run_id
+            try:
+                self.path.mkdir()
+                break
+            except FileExistsError:
+                continue
+        (self.path / "meta.json").write_text(json.dumps({
+            "format": FORMAT_VERSION,
+            "run_id": self.run_id,
+            "created": created.isoformat(timespec="seconds"),
+            "channels": self.channels,
+            **(meta or {}),
+        }, indent=2))
+
+        self._files = [open(self.path / "time.f64", "ab")] + [
+            open(self.path / _column_file(i), "ab") for i in range(len(self.channels))
+        ]
+        self._events = open(self.path / "events.ndjson", "a")
+        self._events_lock = threading.Lock()
+        self.block_rows = block_rows
+        self.flush_interval = flush_interval
+        self._block = self._new_block()
+        self._n = 0
+        self._pending: List[np.ndarray] = []
+        self._lock = threading.Lock()
+        self._io_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._closed = False
+        self.rows_written = 0
+        self._thread = threading.Thread(target=self._run, name="tbm-journal", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def _new_block(self) -> np.ndarray:
+        return np.full((self.block_rows, len(self.channels) + 1), np.nan, dtype=DTYPE)
+
+    # --------------------------------------------------------
+    # Producer side
+    # --------------------------------------------------------
+    def append(self, t: float, values: Mapping[str, float]):
+        """Queue one row; unknown channels are ignored, missing ones are NaN."""
+        index = self._index
+        with self._lock:
+            row = self._block[self._n]
+            row[0] = t
+            for name, value in values.items():
+                i = index.get(name)
+                if i is not None:
+                    row[i + 1] = value
+            self._n += 1
+            if self._n == self.block_rows:
+                self._rotate()
+
+    def extend(self, times: np.ndarray, values: np.ndarray):
+        """Queue a batch: ``values`` is (n, len(channels)) in channel order."""
+        rows = np.column_stack([np.asarray(times, dtype=DTYPE), np.asarray(values, dtype=DTYPE)])
+        with self._lock:
+            self._rotate()
+            self._pending.append(rows)
+        self._wake.set()
+
+    @property
+    def pending_rows(self) -> int:
+        """Rows queued but not yet written (the writer thread's backlog)."""
+        with self._lock:
+            return self._n + sum(len(rows) for rows in self._pending)
+
+    def _rotate(self):
+        # caller holds self._lock
+        if self._n:
+            self._pending.append(self._block[:self._n].copy())
+            self._block[:self._n] = np.nan
+            self._n = 0
+            self._wake.set()
+
+    # --------------------------------------------------------
+    # Writer thread
+    # --------------------------------------------------------
+    def flush(self):
+        """Write everything queued so far and flush the OS buffers."""
+        with self._io_lock:
+            with self._lock:
+                self._rotate()
+                pending, self._pending = self._pending, []
+            for rows in pending:
+                # Column-major copy so every column is one contiguous write.
+                cols = np.asfortranarray(rows)
+                for j, f in enumerate(self._files):
+                    f.write(cols[:, j].tobytes())
+                self.rows_written += len(rows)
+            for f in self._files:
+                f.flush()
+
+    def _run(self):
+        while not self._closed:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            self.flush()
+
+    def log_event(self, t: float, **fields):
+        """Record a discrete event (e.g. an interlock trip) next to the samples."""
+        line = json.dumps({"t": t, **fields}) + "\n"
+        with self._events_lock:
+            self._events.write(line)
+            self._events.flush()
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        self._wake.set()
+        self._thread.join(5)
+        self.flush()
+        for f in self._files:
+            f.close()
+        self._events.close()
+
+
+# ------------------------------------------------------------
+# Reader
+# ------------------------------------------------------------
+class JournalRun:
+    """
+    Memory-mapped view of one run; call ``refresh()`` to see rows appended
+    since opening.  Safe to share between viewers: a refresh swaps in a new
+    set of maps, and every read works on the set it started with.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.meta = json.loads((self.path / "meta.json").read_text())
+        self.run_id = self.meta["run_id"]
+        self.channels: List[str] = list(self.meta["channels"])
+        self._index = {c: i for i, c in enumerate(self.channels)}
+        self._view: Tuple[np.ndarray, Dict[int, np.ndarray]] = (np.empty(0, dtype=DTYPE), {})
+        self.refresh()
+
+    def _map(self, name: str, rows: int) -> np.ndarray:
+        if rows == 0:
+            return np.empty(0, dtype=DTYPE)
+        return np.memmap(self.path / name, dtype=DTYPE, mode="r", shape=(rows,))
+
+    def refresh(self) -> int:
+        files = ["time.f64"] + [_column_file(i) for i in range(len(self.channels))]
+        sizes = [(self.path / f).stat().st_size if (self.path / f).exists() else 0 for f in files]
+        rows = min(sizes) // DTYPE.itemsize
+        if rows != len(self.times):
+            self._view = (self._map("time.f64", rows), {})
+        return rows
+
+    @property
+    def times(self) -> np.ndarray:
+        return self._view[0]
+
+    def __len__(self) -> int:
+        return len(self.times)
+
+    @property
+    def start(self) -> Optional[float]:
+        return float(self.times[0]) if len(self.times) else None
+
+    @property
+    def end(self) -> Optional[float]:
+        return float(self.times[-1]) if len(self.times) else None
+
+    def column(self, name: str) -> np.ndarray:
+        return self._column(self._view, name)
+
+    def _column(self, view, name: str) -> np.ndarray:
+        times, maps = view
+        i = self._index[name]
+        if i not in maps:
+            maps[i] = self._map(_column_file(i), len(times))
+        return maps[i]
+
+    def span(self, t0: Optional[float] = None, t1: Optional[float] = None) -> Tuple[int, int]:
+        """Row range [i0, i1) covering times t0..t1 (inclusive)."""
+        times = self.times
+        i0 = 0 if t0 is None else int(np.searchsorted(times, t0, side="left"))
+        i1 = len(times) if t1 is None else int(np.searchsorted(times, t1, side="right"))
+        return i0, i1
+
+    def window(self, t0: Optional[float] = None, t1: Optional[float] = None,
+               columns: Optional[Iterable[str]] = None) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+        """Zero-copy (times, {channel: values}) slices for a time range."""
+        view = self._view
+        times = view[0]
+        i0 = 0 if t0 is None else int(np.searchsorted(times, t0, side="left"))
+        i1 = len(times) if t1 is None else int(np.searchsorted(times, t1, side="right"))
+        names = self.channels if columns is None else list(columns)
+        return times[i0:i1], {c: self._column(view, c)[i0:i1] for c in names}
+
+    def events(self) -> List[Dict]:
+        """Events logged with ``JournalWriter.log_event``, oldest first."""
+        path = self.path / "events.ndjson"
+        if not path.exists():
+            return []
+        with open(path) as f:
+            return [json.loads(line) for line in f if line.endswith("\n")]
+
+
+def list_runs(root: Path = JOURNAL_DIR) -> List[str]:
+    """Run ids under ``root``, newest first."""
+    root = Path(root)
+    if not root.is_dir():
+        return []
+    return sorted((p.name for p in root.iterdir() if (p / "meta.json").exists()), reverse=True)
+
+
+def open_run(run_id: str, root: Path = JOURNAL_DIR) -> JournalRun:
+    return JournalRun(Path(root) / run_id)
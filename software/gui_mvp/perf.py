@@ -0,0 +1,225 @@
+"""
+Section timers and gauges for the GUIs and the acquisition path.
+
+    with perf.section("tab:overview"):
+        ...
+
+Timing is off unless ``TBM_PERF=1`` (or ``perf.enable()``); when off,
+``section()`` hands back one shared no-op context manager, so the cost is
+a function call and an attribute lookup.  Durations are kept per section
+in a bounded ring, so ``stats()`` reports recent behaviour, and in a
+cumulative histogram (``HIST_BUCKETS_MS``) for the lifetime of the process.
+
+Gauges are callables registered once (``gauge("journal.pending_rows", fn)``)
+and only evaluated when read, so they cost nothing between exports.
+``export(path)`` writes everything as Prometheus text, or JSON for ``.json``.
+"""
+import bisect
+import contextlib
+import functools
+import json
+import math
+import os
+import re
+import threading
+import time
+from collections import deque
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+MAX_SAMPLES = 1000                  # per section
+HIST_BUCKETS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+_BUCKETS_S = [b / 1000.0 for b in HIST_BUCKETS_MS]
+_enabled = os.environ.get("TBM_PERF", "") not in ("", "0")
+_lock = threading.Lock()
+_samples: Dict[str, deque] = {}
+_counts: Dict[str, int] = {}
+_sums: Dict[str, float] = {}
+_hist: Dict[str, List[int]] = {}    # per bucket, last one is +Inf
+_gauges: Dict[str, Callable[[], float]] = {}
+_NULL = contextlib.nullcontext()
+
+
+def enabled() -> bool:
+    return _enabled
+
+
+def enable(on: bool = True):
+    global _enabled
+    _enabled = on
+
+
+def record(name: str, seconds: float):
+    with _lock:
+        ring = _samples.get(name)
+        if ring is None:
+            ring = _samples[name] = deque(maxlen=MAX_SAMPLES)
+            _counts[name] = 0
+            _sums[name] = 0.0
+            _hist[name] = [0] * (len(_BUCKETS_S) + 1)
+        ring.append(seconds)
+        _counts[name] += 1
+        _sums[name] += seconds
+        _hist[name][bisect.bisect_left(_BUCKETS_S, seconds)] += 1
+
+
+class _Section:
+    __slots__ = ("name", "t0")
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __enter__(self):
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        record(self.name, time.perf_counter() - self.t0)
+        return False
+
+
+def section(name: str):
+    """Context manager timing ``name``; a shared no-op when timing is off."""
+    return _Section(name) if _enabled else _NULL
+
+
+def timed(name: str):
+    """Decorator form of ``section()``."""
+    def wrap(fn):
+        @functools.wraps(fn)
+        def inner(*args, **kwargs):
+            if not _enabled:
+                return fn(*args, **kwargs)
+            with _Section(name):
+                return fn(*args, **kwargs)
+        return inner
+    return wrap
+
+
+def start() -> Optional[float]:
+    """Start time for ``stop()``, or None when timing is off."""
+    return time.perf_counter() if _enabled else None
+
+
+def stop(name: str, t0: Optional[float]):
+    """Record the time since ``start()``; for spans that don't fit a ``with`` block."""
+    if t0 is not None:
+        record(name, time.perf_counter() - t0)
+
+
+def stats(prefix: Optional[str] = None) -> Dict[str, Dict[str, float]]:
+    """Per-section count and mean / p50 / p95 / max in milliseconds."""
+    with _lock:
+        items = [(k, np.array(v), _counts[k]) for k, v in _samples.items()
+                 if prefix is None or k.startswith(prefix)]
+    out = {}
+    for name, v, count in sorted(items):
+        ms = v * 1000.0
+        out[name] = {
+            "count": count,
+            "mean_ms": float(ms.mean()),
+            "p50_ms": float(np.percentile(ms, 50)),
+            "p95_ms": float(np.percentile(ms, 95)),
+            "max_ms": float(ms.max()),
+        }
+    return out
+
+
+def histogram(name: str) -> Dict[str, int]:
+    """Lifetime bucket counts (not cumulative) keyed "≤N ms", plus ">5000 ms"."""
+    with _lock:
+        counts = list(_hist.get(name, [0] * (len(_BUCKETS_S) + 1)))
+    labels = [f"≤{b} ms" for b in HIST_BUCKETS_MS] + [f">{HIST_BUCKETS_MS[-1]} ms"]
+    return dict(zip(labels, counts))
+
+
+def reset():
+    with _lock:
+        _samples.clear()
+        _counts.clear()
+        _sums.clear()
+        _hist.clear()
+
+
+# ------------------------------------------------------------
+# Gauges
+# ------------------------------------------------------------
+def gauge(name: str, fn: Callable[[], float]):
+    """Register (or replace) a gauge read by ``gauges()`` and the exports."""
+    with _lock:
+        _gauges[name] = fn
+
+
+def gauges() -> Dict[str, float]:
+    with _lock:
+        items = sorted(_gauges.items())
+    out = {}
+    for name, fn in items:
+        try:
+            out[name] = float(fn())
+        except Exception:
+            out[name] = math.nan
+    return out
+
+
+# ------------------------------------------------------------
+# Export
+# ------------------------------------------------------------
+def _metric(name: str) -> str:
+    return "tbm_" + re.sub(r"[^a-zA-Z0-9_]", "_", name)
+
+
+def _label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"')
+
+
+def to_dict() -> Dict:
+    with _lock:
+        hist = {k: list(v) for k, v in _hist.items()}
+        sums = dict(_sums)
+    return {
+        "time": time.time(),
+        "enabled": _enabled,
+        "sections": stats(),
+        "histograms": {
+            name: {"buckets_ms": list(HIST_BUCKETS_MS), "counts": counts, "sum_s": sums[name]}
+            for name, counts in sorted(hist.items())
+        },
+        "gauges": gauges(),
+    }
+
+
+def prometheus_text() -> str:
+    """Sections as one ``tbm_section_seconds`` histogram, gauges as ``tbm_<name>``."""
+    with _lock:
+        hist = {k: list(v) for k, v in _hist.items()}
+        sums = dict(_sums)
+    lines = [
+        "# HELP tbm_section_seconds Wall time of instrumented sections.",
+        "# TYPE tbm_section_seconds histogram",
+    ]
+    for name, counts in sorted(hist.items()):
+        lbl = f'section="{_label(name)}"'
+        cumulative = np.cumsum(counts)
+        for le, c in zip(_BUCKETS_S, cumulative):
+            lines.append(f'tbm_section_seconds_bucket{{{lbl},le="{le:g}"}} {c}')
+        lines.append(f'tbm_section_seconds_bucket{{{lbl},le="+Inf"}} {cumulative[-1]}')
+        lines.append(f"tbm_section_seconds_sum{{{lbl}}} {sums[name]:.6f}")
+        lines.append(f"tbm_section_seconds_count{{{lbl}}} {cumulative[-1]}")
+    for name, value in gauges().items():
+        lines.append(f"# TYPE {_metric(name)} gauge")
+        lines.append(f"{_metric(name)} {'NaN' if math.isnan(value) else format(value, 'g')}")
+    return "\n".join(lines) + "\n"
+
+
+def export(path) -> Path:
+    """Write Prometheus text (or JSON for a ``.json`` path) atomically."""
+    path = Path(path)
+    text = json.dumps(to_dict(), indent=2) if path.suffix == ".json" else prometheus_text()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(text)
+    os.replace(tmp, path)
+    return path
@@ -0,0 +1,140 @@
+"""
+Local stand-in PLC: a Modbus TCP server on localhost that serves the devices
+in tbm_systems_power.json with the register layout from ``fieldbus.tag_map``.
+
+Unit 1 is the PLC (per-device ON / current / speed / torque), unit 2 the
+IO-Link master (pressure, enclosure temperature). Values are simulated the
+same way as ``acquisition.SimulatedSource`` and refreshed at ``--rate`` Hz;
+writing 1/0 to a device's ON register starts/stops it.
+
+    python sim_plc.py --port 5020
+    TBM_DATA_SOURCE=modbus streamlit run tbm_gui_advanced.py
+"""
+import argparse
+import asyncio
+import random
+import struct
+import threading
+import time
+from typing import Dict, Iterable, List, Optional
+
+from acquisition import SimulatedSource, load_devices
+from fieldbus import IOLINK_UNIT, PLC_UNIT, Tag, tag_map, to_register, to_signed
+
+
+class SimulatedPLC:
+    def __init__(self, labels: Iterable[str], seed: Optional[int] = None):
+        self.labels = list(labels)
+        self.tags: Dict[str, Tag] = {t.name: t for t in tag_map(self.labels)}
+        self.registers: Dict[int, List[int]] = {PLC_UNIT: [], IOLINK_UNIT: []}
+        for tag in self.tags.values():
+            regs = self.registers[tag.unit]
+            regs.extend([0] * (tag.address + 1 - len(regs)))
+        self.rng = random.Random(seed)
+        self.requests = 0
+        self.changed_at: Dict[str, float] = {}   # tag -> time.perf_counter() of last set()
+
+    # --------------------------------------------------------
+    # Register access
+    # --------------------------------------------------------
+    def get(self, name: str) -> float:
+        tag = self.tags[name]
+        return to_signed(self.registers[tag.unit][tag.address]) / tag.scale
+
+    def set(self, name: str, value: float):
+        tag = self.tags[name]
+        self.registers[tag.unit][tag.address] = to_register(value, tag.scale)
+        self.changed_at[name] = time.perf_counter()
+
+    def step(self):
+        """Advance the simulation by one scan."""
+        for label in self.labels:
+            on = self.get(f"{label}.on") >= 1
+            profile = SimulatedSource.PROFILES.get(label)
+            if profile is None:
+                continue
+            for field, bounds in zip(("current", "speed", "torque"), profile):
+                self.set(f"{label}.{field}", round(self.rng.uniform(*bounds), 2) if on else 0.0)
+        # Process pressure & temp (pretend IO-Link PT/CTH)
+        self.set("pressure", round(self.rng.uniform(1.0, 5.0), 2))
+        self.set("enclosure_temp", round(self.rng.uniform(25.0, 45.0), 1))
+
+    # --------------------------------------------------------
+    # Modbus TCP
+    # --------------------------------------------------------
+    def _dispatch(self, unit: int, pdu: bytes) -> bytes:
+        fn = pdu[0]
+        regs = self.registers.get(unit)
+        if fn not in (3, 6):
+            return bytes([fn | 0x80, 1])        # illegal function
+        addr, arg = struct.unpack(">HH", pdu[1:5])
+        if fn == 3:
+            if regs is None or arg < 1 or arg > 125 or addr + arg > len(regs):
+                return bytes([fn | 0x80, 2])    # illegal data address
+            block = regs[addr:addr + arg]
+            return struct.pack(f">BB{arg}H", 3, 2 * arg, *block)
+        if regs is None or addr >= len(regs):
+            return bytes([fn | 0x80, 2])
+        regs[addr] = arg
+        return pdu[:5]
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                header = await reader.readexactly(7)
+                tid, proto, length, unit = struct.unpack(">HHHB", header)
+                pdu = await reader.readexactly(length - 1)
+                self.requests += 1
+                reply = self._dispatch(unit, pdu)
+                writer.write(struct.pack(">HHHB", tid, proto, len(reply) + 1, unit) + reply)
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, host: str = "127.0.0.1", port: int = 5020, rate_hz: float = 10.0,
+                    started: Optional[threading.Event] = None):
+        server = await asyncio.start_server(self.handle, host, port)
+        self.port = server.sockets[0].getsockname()[1]
+        if started is not None:
+            started.set()
+        async with server:
+            while True:
+                if rate_hz > 0:
+                    self.step()
+                await asyncio.sleep(1.0 / rate_hz if rate_hz > 0 else 3600)
+
+
+def start_in_thread(labels: Optional[Iterable[str]] = None, port: int = 0,
+                    rate_hz: float = 10.0, seed: Optional[int] = None) -> SimulatedPLC:
+    """Run a SimulatedPLC on a daemon thread; ``plc.port`` is the bound port."""
+    plc = SimulatedPLC(labels if labels is not None else load_devices(), seed=seed)
+    started = threading.Event()
+    threading.Thread(
+        target=lambda: asyncio.run(plc.serve("127.0.0.1", port, rate_hz, started)),
+        name="sim-plc",
+        daemon=True,
+    ).start()
+    started.wait(5)
+    return plc
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local Modbus TCP stand-in for the TBM PLC")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=5020)
+    parser.add_argument("--rate", type=float, default=10.0, help="simulation scan rate (Hz)")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    plc = SimulatedPLC(load_devices(), seed=args.seed)
+    print(f"Serving {len(plc.tags)} tags on {args.host}:{args.port} (Ctrl+C to stop)")
+    try:
+        asyncio.run(plc.serve(args.host, args.port, args.rate))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
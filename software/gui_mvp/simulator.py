@@ -0,0 +1,284 @@
+"""
+Vectorized batch simulator: correlated synthetic telemetry for every device.
+
+Generates whole blocks of samples with NumPy instead of one ``random.uniform``
+per channel per tick, for load-testing acquisition, interlock rules and the
+journal.  Signals are driven by a shared "ground hardness" process, so
+cutterhead current, torque, speed, hydraulic pressure and motor temperature
+move together the way they do on the machine:
+
+    hardness (AR(1)) -> drive loads -> currents / torque / speed
+    cutter load - conveyor load     -> muck level (leaky integral)
+    pump load                       -> pump / nozzle / process pressure
+    motor current, coolant flow     -> motor temperature (first-order lag)
+    total current                   -> panel / enclosure temperature
+
+Every channel has its own sample rate (decimated from the fastest one), the
+generator is seeded and continues seamlessly from block to block, and fault
+scenarios can be injected at given times.  Channel names match the rule
+channels of both GUIs (``MEASUREMENT_CHANNELS`` in tbm_gui.py and the
+``LOG_CHANNELS`` of tbm_gui_advanced.py).
+"""
+import math
+from typing import Dict, Iterable, List, Mapping, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from acquisition import SignalSource, load_devices
+from device_state import DeviceTable
+
+# label -> (idle A, full-load A); anything not listed uses its category default
+CURRENT_PROFILES = {
+    "Cutter Head Motor": (4.0, 6.8),
+    "Screw Jack": (3.0, 6.0),
+    "Conveyor Motor": (2.5, 5.0),
+    "Conditioner Pump": (1.5, 3.5),
+    "Primary Intake Fan": (1.2, 1.6),
+    "Secondary Intake Fan": (1.2, 1.6),
+}
+CATEGORY_CURRENT = {
+    "Electronics & I/O": (0.2, 0.4),
+    "Sensors": (0.02, 0.05),
+}
+# Drives with speed/torque channels: label -> (no-load RPM, Nm per A)
+DRIVES = {
+    "Cutter Head Motor": (20.0, 60.0),
+    "Screw Jack": (15.0, 25.0),
+}
+
+HARDNESS_TAU_S = 30.0      # ground changes over tens of seconds
+LOAD_TAU_S = 2.0           # per-device load jitter
+MOTOR_TAU_S = 120.0        # motor winding thermal lag
+PANEL_TAU_S = 300.0        # panel air thermal lag
+MUCK_TAU_S = 60.0          # muck level leak
+
+PROCESS_CHANNELS = (
+    "cutter_motor_temp_f", "panel_temp_f", "nozzle_pressure_psi", "pump_pressure_psi",
+    "muck_level", "coolant_flow_lpm", "hydraulic_pressure_bar",
+    "cutterhead_current", "jack_current", "pressure", "enclosure_temp",
+)
+
+
+class Fault(NamedTuple):
+    kind: str
+    start: float           # seconds from simulator start
+    duration: float        # seconds; faults end abruptly
+    magnitude: float = 1.0
+
+
+# kind -> (what it does, demo_interlocks IDs it should trip, advanced GUI IDs)
+FAULTS = {
+    "overcurrent": ("Cutterhead jams: motor current ~2.5x, motor heats up", ("M1", "G1"), ("B3",)),
+    "pressure_spike": ("Nozzle clog: pump pressure +45 psi", ("P1", "P2"), ("B4",)),
+    "coolant_loss": ("Coolant flow drops to 2 l/min, motor heats up", ("C1", "G1"), ()),
+    "blockage": ("Muck builds up: conveyor stalls", ("B1",), ()),
+    "conveyor_overload": ("Conveyor motor current ~1.5x", ("M2",), ()),
+    "fan_overload": ("Fan seizes: current ~9x", ("F1",), ()),
+    "hydraulic_overpressure": ("Hydraulic pressure +90 bar", ("H1",), ()),
+    "panel_overheat": ("Panel fans lost: panel temperature climbs", ("T2",), ("B5",)),
+}
+
+
+def _ar1(drive: np.ndarray, a: float, x0: float) -> np.ndarray:
+    """x[k] = a * x[k-1] + drive[k], vectorized in chunks small enough to stay exact."""
+    out = np.empty_like(drive)
+    n = len(drive)
+    if a <= 0.0:
+        out[:] = drive
+        return out
+    # keep a**-m below ~1e6 so the cumulative sum keeps its precision
+    m = max(1, min(8192, int(13.8 / -math.log(a)) if a < 1.0 else 8192))
+    powers = a ** np.arange(1, m + 1)
+    for s in range(0, n, m):
+        e = drive[s:s + m]
+        p = powers[:len(e)]
+        out[s:s + len(e)] = p * (x0 + np.cumsum(e / p))
+        x0 = out[s + len(e) - 1]
+    return out
+
+
+def _lag(target: np.ndarray, dt: float, tau: float, x0: float) -> np.ndarray:
+    """First-order lag of ``target`` with time constant ``tau``."""
+    a = math.exp(-dt / tau)
+    return _ar1((1.0 - a) * target, a, x0)
+
+
+class BatchSimulator:
+    def __init__(self, devices: Optional[Mapping[str, Mapping]] = None,
+                 rates: Optional[Mapping[str, float]] = None, default_rate: float = 10.0,
+                 seed: Optional[int] = None, faults: Iterable[Fault] = (), start_time: float = 0.0,
+                 all_on: bool = True):
+        devices = load_devices() if devices is None else devices
+        self.labels = list(devices)
+        self.on = np.array([all_on or bool(devices[l].get("on")) for l in self.labels])
+        self.profiles = np.array([
+            CURRENT_PROFILES.get(l, CATEGORY_CURRENT.get(devices[l].get("category"), (0.1, 0.2)))
+            for l in self.labels
+        ])
+        self._index = {l: i for i, l in enumerate(self.labels)}
+
+        self.channels: List[str] = (
+            list(self.labels)
+            + [f"{label}.{field}" for label in DRIVES if label in self._index for field in ("speed", "torque")]
+            + list(PROCESS_CHANNELS)
+        )
+        rates = dict(rates or {})
+        self.rates = {c: float(rates.get(c, default_rate)) for c in self.channels}
+        self.base_rate = max(self.rates.values())
+        self.faults = list(faults)
+        self.rng = np.random.default_rng(seed)
+        self.t0 = start_time
+        self.n = 0                       # base-rate samples generated so far
+        self._state = {
+            "hardness": 0.0,
+            "loads": np.zeros(len(self.labels)),
+            "motor_temp_f": 120.0,
+            "panel_temp_f": 92.0,
+            "muck": 2.0,
+        }
+
+    # --------------------------------------------------------
+    # Faults
+    # --------------------------------------------------------
+    def _fault(self, kind: str, t: np.ndarray) -> np.ndarray:
+        """0..magnitude envelope for ``kind`` over the block times."""
+        env = np.zeros(len(t))
+        for f in self.faults:
+            if f.kind == kind:
+                rel = t - self.t0 - f.start
+                env = np.maximum(env, np.where((rel >= 0) & (rel < f.duration), f.magnitude, 0.0))
+        return env
+
+    # --------------------------------------------------------
+    # Generation
+    # --------------------------------------------------------
+    def _base_block(self, n: int) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+        dt = 1.0 / self.base_rate
+        t = self.t0 + (self.n + np.arange(1, n + 1)) * dt
+        rng, st = self.rng, self._state
+        sig = {}
+
+        # Shared ground hardness, 0..1
+        a = math.exp(-dt / HARDNESS_TAU_S)
+        h = _ar1(rng.normal(0.0, 0.35 * math.sqrt(1 - a * a), n), a, st["hardness"])
+        st["hardness"] = h[-1]
+        hardness = np.clip(0.5 + h, 0.0, 1.0)
+
+        # Per-device load = hardness + own jitter; one AR(1) per device
+        a = math.exp(-dt / LOAD_TAU_S)
+        noise = rng.normal(0.0, 0.1 * math.sqrt(1 - a * a), (len(self.labels), n))
+        loads = np.empty_like(noise)
+        for i in range(len(self.labels)):
+            loads[i] = _ar1(noise[i], a, st["loads"][i])
+        st["loads"] = loads[:, -1]
+        load = np.clip(hardness[None, :] * 0.8 + 0.2 + loads, 0.0, 1.2)
+
+        idle, full = self.profiles[:, 0:1], self.profiles[:, 1:2]
+        currents = (idle + (full - idle) * load) * self.on[:, None]
+
+        ix = self._index
+        scale = {
+            "Cutter Head Motor": 1.0 + 1.5 * self._fault("overcurrent", t),
+            "Conveyor Motor": 1.0 + 0.5 * self._fault("conveyor_overload", t),
+            "Primary Intake Fan": 1.0 + 8.0 * self._fault("fan_overload", t),
+        }
+        for label, k in scale.items():
+            if label in ix:
+                currents[ix[label]] *= k
+        for label, i in ix.items():
+            sig[label] = currents[i]
+
+        for label, (rpm, nm_per_a) in DRIVES.items():
+            if label in ix:
+                i = ix[label]
+                sig[f"{label}.speed"] = rpm * (1.0 - 0.3 * load[i]) * self.on[i]
+                sig[f"{label}.torque"] = nm_per_a * currents[i]
+
+        cutter = sig.get("Cutter Head Motor", np.zeros(n))
+        pump_load = load[ix["Conditioner Pump"]] if "Conditioner Pump" in ix else np.full(n, 0.5)
+        conveyor_load = load[ix["Conveyor Motor"]] if "Conveyor Motor" in ix else np.full(n, 0.5)
+
+        # Mucking: cutter produces, conveyor removes; a blockage stops removal
+        produce = 0.12 * hardness
+        remove = 0.12 * np.minimum(conveyor_load, 1.0) * (1.0 - self._fault("blockage", t))
+        a = math.exp(-dt / MUCK_TAU_S)
+        muck = _ar1((produce - remove) * dt + (1.0 - a) * 2.0, a, st["muck"])
+        st["muck"] = muck[-1]
+        sig["muck_level"] = np.clip(muck, 0.0, 10.0)
+
+        # Hydraulics & pumping
+        sig["hydraulic_pressure_bar"] = (150.0 + 40.0 * hardness + rng.normal(0, 2.0, n)
+                                         + 90.0 * self._fault("hydraulic_overpressure", t))
+        pump_psi = 38.0 + 10.0 * pump_load + rng.normal(0, 0.8, n) + 45.0 * self._fault("pressure_spike", t)
+        sig["pump_pressure_psi"] = pump_psi
+        sig["nozzle_pressure_psi"] = pump_psi - 3.0 + rng.normal(0, 0.5, n)
+        sig["pressure"] = pump_psi / 14.5038
+
+        # Thermal: coolant removes motor heat, fans remove panel heat
+        flow = 12.0 + rng.normal(0, 0.3, n) - 10.0 * self._fault("coolant_loss", t)
+        sig["coolant_flow_lpm"] = flow
+        motor_target = 80.0 + 7.0 * cutter + 3.0 * np.maximum(0.0, 12.0 - flow) ** 1.3
+        motor = _lag(motor_target, dt, MOTOR_TAU_S, st["motor_temp_f"])
+        st["motor_temp_f"] = motor[-1]
+        sig["cutter_motor_temp_f"] = motor + rng.normal(0, 0.2, n)
+
+        panel_target = 80.0 + 0.4 * currents.sum(axis=0) + 60.0 * self._fault("panel_overheat", t)
+        panel = _lag(panel_target, dt, PANEL_TAU_S, st["panel_temp_f"])
+        st["panel_temp_f"] = panel[-1]
+        sig["panel_temp_f"] = panel + rng.normal(0, 0.2, n)
+        sig["enclosure_temp"] = (sig["panel_temp_f"] - 32.0) * 5.0 / 9.0
+
+        sig["cutterhead_current"] = cutter
+        sig["jack_current"] = sig.get("Screw Jack", np.zeros(n))
+
+        self.n += n
+        return t, sig
+
+    def block(self, seconds: float) -> Dict[str, Tuple[np.ndarray, np.ndarray]]:
+        """Next ``seconds`` of telemetry: channel -> (times, values) at that channel's rate."""
+        n = int(round(seconds * self.base_rate))
+        first = self.n
+        t, sig = self._base_block(n)
+        out = {}
+        for c in self.channels:
+            stride = self.base_rate / self.rates[c]
+            # samples of this channel that fall inside the block, on its own grid
+            k0 = math.ceil((first + 1) / stride)
+            k1 = math.floor((first + n) / stride)
+            idx = (np.arange(k0, k1 + 1) * stride).round().astype(np.int64) - first - 1
+            out[c] = (t[idx], sig[c][idx])
+        return out
+
+    def frame(self, seconds: float) -> Tuple[np.ndarray, np.ndarray]:
+        """Next ``seconds`` on the base-rate grid: (times, values[n, len(channels)])."""
+        t, sig = self._base_block(int(round(seconds * self.base_rate)))
+        return t, np.column_stack([sig[c] for c in self.channels])
+
+
+class BatchSource(SignalSource):
+    """
+    Acquisition source backed by BatchSimulator: each poll advances the
+    simulation by one engine period and reports the latest values.
+    Devices that are OFF read 0 A.
+    """
+
+    name = "batch-sim"
+
+    def __init__(self, rate_hz: float = 1.0, seed: Optional[int] = None, faults: Iterable[Fault] = ()):
+        self.sim = BatchSimulator(default_rate=rate_hz, seed=seed, faults=faults)
+        self.period = 1.0 / rate_hz
+        self._rows = None           # sim label -> device table row, set on first poll
+
+    def poll(self, devices: DeviceTable, now: float) -> Dict[str, float]:
+        if self._rows is None:
+            self._rows = devices.indexes(self.sim.labels)
+            drives = [l for l in DRIVES if l in devices and l in self.sim.labels]
+            self._drive_rows = devices.indexes(drives)
+            self._drive_cols = np.array([self.sim.channels.index(f"{l}.speed") for l in drives], dtype=np.intp)
+        self.sim.on = devices.on[self._rows].copy()
+        t, values = self.sim.frame(self.period)
+        latest = values[-1]
+        devices.current[self._rows] = np.round(latest[:len(self.sim.labels)], 2)
+        devices.speed[self._drive_rows] = np.round(latest[self._drive_cols], 1)
+        devices.torque[self._drive_rows] = np.round(latest[self._drive_cols + 1], 1)
+        return dict(zip(PROCESS_CHANNELS, latest[-len(PROCESS_CHANNELS):].tolist()))
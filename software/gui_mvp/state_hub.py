@@ -0,0 +1,185 @@
+"""
+Shared machine state for every viewer of the dashboard.
+
+One ``MachineHub`` per server process owns the authoritative machine model:
+the acquisition engine's device table, the interlock registry, system state
+and mode.  Every change bumps ``version``; ``snapshot()`` builds an immutable
+snapshot at most once per version and hands the same object to every session,
+and ``memo()`` does the same for derived data such as chart frames.  Per-tick
+cost therefore scales with the number of devices, not devices x viewers.
+Sessions keep only UI preferences in ``st.session_state``.
+"""
+import datetime
+from itertools import islice
+from types import MappingProxyType
+from typing import Callable, Dict, NamedTuple, Optional, Tuple
+
+import perf
+from acquisition import AcquisitionEngine
+from device_state import DeviceTable
+from interlock_rules import RuleEvaluator
+from interlocks import InterlockEvent, InterlockRegistry
+
+SYSTEM_STATES = ("IDLE", "READY", "RUNNING", "FAULT")
+SYSTEM_MODES = ("AUTO", "MANUAL")
+RECENT_EVENTS = 10          # interlock events carried in each snapshot
+
+
+class MachineSnapshot(NamedTuple):
+    version: int
+    config_version: int                # bumps only on operator/interlock changes
+    taken_at: Optional[float]
+    devices: DeviceTable               # read-only copy of the device arrays
+    interlocks: MappingProxyType       # id -> read-only state dict
+    interlock_counts: MappingProxyType  # registry.counts() at this version
+    interlock_seq: int                 # last interlock event sequence number
+    recent_events: Tuple[InterlockEvent, ...]  # newest first, at most RECENT_EVENTS
+    safety_ok: bool
+    values: MappingProxyType           # last sampled channel values
+    system_state: str
+    system_mode: str
+    state_changed_at: Optional[datetime.datetime]
+
+
+def _frozen(table: Dict[str, Dict]) -> MappingProxyType:
+    return MappingProxyType({k: MappingProxyType(dict(v)) for k, v in table.items()})
+
+
+class MachineHub:
+    def __init__(self, engine: AcquisitionEngine, registry: InterlockRegistry,
+                 run_device: str = "Cutter Head Motor",
+                 rules: Optional[RuleEvaluator] = None):
+        self.engine = engine
+        self.registry = registry
+        self.rules = rules
+        self.lock = engine.lock      # one lock guards the whole machine model
+        self.run_device = run_device
+        self.system_state = "IDLE"
+        self.system_mode = "AUTO"
+        self.state_changed_at: Optional[datetime.datetime] = None
+        self.version = 0
+        self.config_version = 0
+        self._snapshot: Optional[MachineSnapshot] = None
+        self._memo: Dict[str, tuple] = {}
+        engine.add_sink(self._on_sample)
+        with self.lock:
+            self._changed()
+
+    # --------------------------------------------------------
+    # Writers (all run under the engine lock)
+    # --------------------------------------------------------
+    def _changed(self, config: bool = True):
+        self.version += 1
+        if config:
+            self.config_version += 1
+        self._update_system_state()
+
+    def _on_sample(self, t: float, values: Dict[str, float]):
+        with perf.section("hub.update_state"):
+            seq = self.registry.last_seq
+            if self.rules is not None:
+                rules = self.rules
+                result = rules.evaluate_sample(values, t)
+                for rid in result.tripped:
+                    self.registry.trip(rules.rules[rules.index[rid]].interlock, datetime.datetime.fromtimestamp(t))
+                for rid in result.cleared:
+                    # Condition gone; the latch stays until an operator reset.
+                    iid = rules.rules[rules.index[rid]].interlock
+                    if not rules.active[rules.by_interlock[iid]].any():
+                        self.registry.clear(iid)
+                for rid in rules.auto_reset(t):
+                    iid = rules.rules[rules.index[rid]].interlock
+                    if not rules.latched[rules.by_interlock[iid]].any():
+                        self.registry.reset(iid)
+            self._changed(config=self.registry.last_seq != seq)
+
+    def _update_system_state(self):
+        old_state = self.system_state
+        if not self.registry.safety_ok:
+            self.system_state = "FAULT"
+        elif self.engine.devices[self.run_device]["on"]:
+            # Simple heuristic: RUNNING if cutterhead ON, else READY if safe
+            self.system_state = "RUNNING"
+        else:
+            self.system_state = "READY"
+        if old_state != self.system_state:
+            self.state_changed_at = datetime.datetime.now()
+
+    def command(self, label: str, **fields):
+        with self.lock:
+            self.engine.devices[label].update(fields)
+            self._changed()
+
+    def set_mode(self, mode: str):
+        if mode not in SYSTEM_MODES:
+            raise ValueError(f"Unknown mode {mode!r}")
+        with self.lock:
+            self.system_mode = mode
+            self._changed()
+
+    def trip(self, iid: str):
+        with self.lock:
+            self.registry.trip(iid)
+            self._changed()
+
+    def reset(self, iid: str) -> bool:
+        """
+        Operator reset.  Returns False when refused: a measured trip condition
+        is still present, or the interlock is neither active nor latched.
+        """
+        with self.lock:
+            if self.rules is not None and iid in self.rules.by_interlock:
+                if self.rules.interlock_present(iid):
+                    return False
+                self.rules.reset([self.rules.ids[i] for i in self.rules.by_interlock[iid]], manual=True)
+            done = self.registry.reset(iid)
+            if done:
+                self._changed()
+            return done
+
+    def condition_present(self, iid: str) -> bool:
+        """Whether a measured trip condition of ``iid`` is still present."""
+        with self.lock:
+            return (self.rules is not None and iid in self.rules.by_interlock
+                    and self.rules.interlock_present(iid))
+
+    # --------------------------------------------------------
+    # Readers
+    # --------------------------------------------------------
+    def snapshot(self) -> MachineSnapshot:
+        """Immutable view of the machine, rebuilt at most once per version."""
+        snap = self._snapshot
+        if snap is not None and snap.version == self.version:
+            return snap
+        with self.lock:
+            if self._snapshot is None or self._snapshot.version != self.version:
+                self._snapshot = MachineSnapshot(
+                    version=self.version,
+                    config_version=self.config_version,
+                    taken_at=self.engine.last_sample_at,
+                    devices=self.engine.devices.snapshot(),
+                    interlocks=_frozen(self.registry.states),
+                    interlock_counts=MappingProxyType(self.registry.counts()),
+                    interlock_seq=self.registry.last_seq,
+                    recent_events=tuple(islice(reversed(self.registry.events), RECENT_EVENTS)),
+                    safety_ok=self.registry.safety_ok,
+                    values=MappingProxyType(dict(self.engine.last_values)),
+                    system_state=self.system_state,
+                    system_mode=self.system_mode,
+                    state_changed_at=self.state_changed_at,
+                )
+            return self._snapshot
+
+    def memo(self, key: str, build: Callable[[], object]):
+        """
+        Shared derived data (e.g. a chart DataFrame) computed once per version
+        under the lock and reused by every session. Treat the result as read-only.
+        """
+        hit = self._memo.get(key)
+        if hit is not None and hit[0] == self.version:
+            return hit[1]
+        with self.lock:
+            version = self.version
+            value = build()
+            self._memo[key] = (version, value)
+            return value
@@ -1,20 +1,28 @@
 import streamlit as st
-import json
 import random
-import datetime
 import pandas as pd
 from streamlit_autorefresh import st_autorefresh
 
+import diagnostics
+import perf
+from acquisition import AcquisitionEngine, SetpointSource
+from catalog import get_catalog
+from decimate import CHART_POINTS, decimate_frame
+from history import MultiResolutionHistory
+from interlock_rules import RuleEvaluator, rules_from_table
+from journal import JournalWriter, device_channels, device_values
+
 # -------------------------------
-# Auto-refresh every 1 second
+# Auto-refresh every 1 second (render only; sampling runs on the acquisition thread)
 # -------------------------------
 st_autorefresh(interval=1000, key="power_refresh")
+rerun_t0 = perf.start()
 
 # -------------------------------
-# Load TBM system data
+# TBM device catalog (parsed once, reloaded when the file changes)
 # -------------------------------
-with open("tbm_systems_power.json") as f:
-    tbm_data = json.load(f)
+with perf.section("catalog"):
+    catalog = get_catalog()
 
 # -------------------------------
 # Helpers for thresholds & health
@@ -22,37 +30,52 @@ with open("tbm_systems_power.json") as f:
 SEVERITY_ORDER = {"OK": 0, "LOW": 1, "HIGH": 2, "TRIP": 3}
 SEVERITY_EMOJI = {"OK": "🟢", "LOW": "🟡", "HIGH": "🟠", "TRIP": "🔴"}
 
-def op_eval(op: str, value: float, thr: float) -> bool:
-    if op == "≥": return value >= thr
-    if op == "≤": return value <= thr
-    if op == ">": return value > thr
-    if op == "<": return value < thr
-    return False
-
 def max_sev(a: str, b: str) -> str:
     return a if SEVERITY_ORDER[a] >= SEVERITY_ORDER[b] else b
 
 # -------------------------------
-# Devices with RPM / Torque
+# Acquisition: one engine per server process samples every device's
+# setpoint current (and the total) into a shared multi-resolution history
 # -------------------------------
-HAS_SPEED_TORQUE = {
-    "Cutter Head Motor", 
-    "Screw Jack Motor", 
-    "Primary Intake Fan", 
-    "Secondary Intake Fan", 
-    "Conveyor Motor", 
-    "Conditioner Pump"
-}
+ACQ_RATE_HZ = 1.0
+
+@st.cache_resource
+def get_power_log() -> MultiResolutionHistory:
+    return MultiResolutionHistory(list(catalog.labels) + ["total_current"])
+
+@st.cache_resource
+def get_engine() -> AcquisitionEngine:
+    power_log = get_power_log()
+    journal = JournalWriter(list(power_log.channels) + device_channels(catalog.labels), name="basic")
+    engine = AcquisitionEngine(
+        [SetpointSource()],
+        rate_hz=ACQ_RATE_HZ,
+        sinks=[
+            lambda t, values: power_log.append(values, t=t),
+            lambda t, values: journal.append(t, {**values, **device_values(engine.devices)}),
+        ],
+    )
+    diagnostics.register_engine(engine, journal)
+    engine.sample()
+    return engine.start()
+
+engine = get_engine()
+power_log = get_power_log()
+with perf.section("engine.snapshot"):
+    device_states = engine.snapshot()
+
+def set_current(key: str, label: str):
+    """Slider callback: send the new setpoint to the shared engine."""
+    new_current = st.session_state[f"slider_{label}"]
+    if key in catalog.has_speed_torque:
+        torque, speed = round(new_current * 800, 1), round(new_current * 600, 1)
+    else:
+        torque, speed = 0, 0
+    engine.command(key, current=new_current, torque=torque, speed=speed)
 
 # -------------------------------
 # Session state
 # -------------------------------
-if "device_states" not in st.session_state:
-    st.session_state.device_states = {}
-if "current_log" not in st.session_state:
-    st.session_state.current_log = {category: {} for category in tbm_data.keys()}
-if "total_log" not in st.session_state:
-    st.session_state.total_log = {"time": [], "current": [], "speed": [], "torque": []}
 if "interlock_demo" not in st.session_state:
     st.session_state.interlock_demo = None
 
@@ -69,9 +92,71 @@ demo_interlocks = [
     {"Measurement": "VFD shunt", "Trip Condition": "≥6.0 A", "ID": "M2", "Reset": "L+MR", "Interlock": "Conveyor overload", "Action": "Stop conveyor", "Notes": "Overload condition"},
     {"Measurement": "Coolant Flow", "Trip Condition": "≤5 l/min", "ID": "C1", "Reset": "MR", "Interlock": "Low coolant", "Action": "Stop motor", "Notes": "Flow interruption"},
     {"Measurement": "Hydraulic Pressure", "Trip Condition": "≥220 bar", "ID": "H1", "Reset": "L+MR", "Interlock": "Hydraulic overpressure", "Action": "Dump valves", "Notes": "Excessive pressure"},
-    {"Measurement": "Fan Overcurrent", "Trip Condition": "≥12 A", "ID": "F1", "Reset": "L", "Interlock": "Fan overload", "Action": "Stop fan", "Notes": "Electrical overload"}
+    {"Measurement": "Fan Overcurrent", "Trip Condition": "≥9.5 A", "ID": "F1", "Reset": "L", "Interlock": "Fan overload", "Action": "Stop fan", "Notes": "Electrical overload"}
 ]
 
+# -------------------------------
+# Interlock rules: trip conditions above, evaluated on every acquisition sample
+# -------------------------------
+# Measurement -> telemetry channel. Device labels are the per-device currents
+# from the setpoint source; the others have no source yet and never trip.
+MEASUREMENT_CHANNELS = {
+    "CMVT on cutter motor": "cutter_motor_temp_f",
+    "CMTH @ panel": "panel_temp_f",
+    "PT16A @ nozzle": "nozzle_pressure_psi",
+    "PT16A @ pump": "pump_pressure_psi",
+    "BCF5": "muck_level",
+    "VFD motor-I": "Cutter Head Motor",
+    "VFD shunt": "Conveyor Motor",
+    "Coolant Flow": "coolant_flow_lpm",
+    "Hydraulic Pressure": "hydraulic_pressure_bar",
+    "Fan Overcurrent": "Primary Intake Fan",
+}
+
+# Interlock ID -> devices it stops (drives the Status column)
+RULE_DEVICES = {
+    "G1": ["Cutter Head Motor"],
+    "T2": ["Conveyor Motor", "Conditioner Pump"],
+    "P1": ["Conditioner Pump"],
+    "P2": ["Conditioner Pump"],
+    "B1": ["Cutter Head Motor"],
+    "M1": ["Cutter Head Motor"],
+    "M2": ["Conveyor Motor"],
+    "C1": ["Cutter Head Motor"],
+    "F1": ["Primary Intake Fan"],
+}
+RULE_STATE_EMOJI = {"OK": "🟢", "LATCHED": "🟠", "RESET REQUIRED": "🟡", "TRIPPED": "🔴"}
+# Rule state -> device severity: only a present trip condition is a TRIP
+RULE_STATE_SEVERITY = {"OK": "OK", "LATCHED": "HIGH", "RESET REQUIRED": "HIGH", "TRIPPED": "TRIP"}
+
+@st.cache_resource
+def get_rules() -> RuleEvaluator:
+    rules = RuleEvaluator(rules_from_table(demo_interlocks, MEASUREMENT_CHANNELS))
+
+    def evaluate(t: float, values: dict):
+        rules.evaluate_sample(values, t)
+        rules.auto_reset(t)
+
+    get_engine().add_sink(evaluate)
+    return rules
+
+rules = get_rules()
+
+def reset_rule(rule_id: str):
+    engine.read(lambda: rules.reset([rule_id], manual=True))
+
+# -------------------------------
+# Chart windows (history tier is picked to match)
+# -------------------------------
+CHART_WINDOWS = {
+    "1 min": 60,
+    "10 min": 600,
+    "1 h": 3600,
+    "8 h": 8 * 3600,
+    "24 h": 24 * 3600,
+}
+CHART_MAX_POINTS = CHART_POINTS
+
 # -------------------------------
 # Page/UI
 # -------------------------------
@@ -79,55 +164,88 @@ st.set_page_config(page_title="TBM Operator GUI", layout="wide")
 st.title("⚡ TBM Operator GUI")
 st.caption("Monitor, control, and tune powered subsystems")
 
-tabs = st.tabs(["Main Dashboard"] + list(tbm_data.keys()))
+show_diagnostics = diagnostics.visible()
+tabs = st.tabs(["Main Dashboard"] + list(catalog.categories) + (["Diagnostics"] if show_diagnostics else []))
 
 # -------------------------------
 # MAIN DASHBOARD
 # -------------------------------
-with tabs[0]:
+with tabs[0], perf.section("tab.main"):
     st.header("📊 Main Dashboard")
 
     st.markdown("### Status Key")
     st.write("🟢 **OK** — Normal")
     st.write("🟡 **LOW** — Low warning threshold crossed")
-    st.write("🟠 **HIGH** — High warning threshold crossed")
+    st.write("🟠 **HIGH** — High warning threshold crossed, or an interlock latched / awaiting reset")
     st.write("🔴 **TRIP** — Emergency shutdown condition")
 
+    rule_status = engine.read(lambda: {rid: rules.status(rid) for rid in rules.ids})
+    device_sev = {}
+    device_notes = {}
+    for rid, status in rule_status.items():
+        if status == "OK":
+            continue
+        for dev in RULE_DEVICES.get(rid, []):
+            device_sev[dev] = max_sev(device_sev.get(dev, "OK"), RULE_STATE_SEVERITY[status])
+            device_notes.setdefault(dev, []).append(f"{rid} {status.lower()}")
+
     device_status = []
-    for category in tbm_data.keys():
-        for item in tbm_data[category]:
-            label = item["Label"].replace("Screw Jack", "Screw Jack Motor")
-            if label not in st.session_state.device_states:
-                st.session_state.device_states[label] = {"on": False, "current": 0.0, "speed": 0, "torque": 0}
-
-            state = st.session_state.device_states[label]
-            current = state["current"] if state["on"] else 0.0
-            speed = state["speed"] if state["on"] else 0
-            torque = state["torque"] if state["on"] else 0
-
-            device_status.append({
-                "Device": label,
-                "Current (A)": round(current, 2),
-                "Torque (Nm)": round(torque, 1) if label in HAS_SPEED_TORQUE else "N/A",
-                "Speed (RPM)": round(speed, 1) if label in HAS_SPEED_TORQUE else "N/A",
-                "Status": f"🟢 OK",
-                "Notes": ""
-            })
+    for dev in catalog:
+        state = device_states.get(dev.label)
+        if state is None:
+            continue   # added to the catalog after the engine started
+        current = state["current"] if state["on"] else 0.0
+        speed = state["speed"] if state["on"] else 0
+        torque = state["torque"] if state["on"] else 0
+        sev = device_sev.get(dev.label, "OK")
+
+        device_status.append({
+            "Device": dev.name,
+            "Current (A)": round(current, 2),
+            "Torque (Nm)": round(torque, 1) if dev.has_speed_torque else "N/A",
+            "Speed (RPM)": round(speed, 1) if dev.has_speed_torque else "N/A",
+            "Status": f"{SEVERITY_EMOJI[sev]} {sev}",
+            "Notes": ", ".join(device_notes.get(dev.label, [])),
+        })
 
     st.subheader("📋 System Status Panel")
     st.dataframe(pd.DataFrame(device_status), use_container_width=True)
 
     st.subheader("📈 TBM Running Summary")
-    now = datetime.datetime.now().strftime("%H:%M:%S")
-    st.session_state.total_log["time"].append(now)
-    total_current = sum([s["current"] for s in st.session_state.device_states.values()])
-    st.session_state.total_log["current"].append(total_current)
+    st.select_slider("Chart window", options=list(CHART_WINDOWS), value="1 min", key="chart_window")
+    window_s = CHART_WINDOWS[st.session_state.chart_window]
 
-    df_summary = pd.DataFrame({
-        "Time": st.session_state.total_log["time"][-60:],
-        "Current (A)": st.session_state.total_log["current"][-60:],
-    })
-    st.line_chart(df_summary.set_index("Time"))
+    df_summary = engine.read(lambda: power_log.frame(
+        window_s, {"total_current": "Current (A)"}, max_points=CHART_MAX_POINTS
+    ))
+    st.line_chart(decimate_frame(df_summary))
+
+    st.subheader("🛡️ Interlock Rules")
+    rule_rows = engine.read(lambda: [
+        {
+            "ID": rid,
+            "Interlock": row["Interlock"],
+            "Measurement": row["Measurement"],
+            "Trip Condition": row["Trip Condition"],
+            "Reset": row["Reset"],
+            "Value": rules.last_value[rules.index[rid]],
+            "State": f"{RULE_STATE_EMOJI[rule_status[rid]]} {rule_status[rid]}",
+        }
+        for row in demo_interlocks
+        for rid in [row["ID"]]
+        if rid in rules.index
+    ])
+    st.dataframe(pd.DataFrame(rule_rows), use_container_width=True, hide_index=True)
+    latched = [rid for rid, status in rule_status.items() if status in ("LATCHED", "RESET REQUIRED")]
+    if latched:
+        reset_cols = st.columns(len(latched))
+        for col, rid in zip(reset_cols, latched):
+            col.button(f"Reset {rid}", key=f"reset_rule_{rid}", on_click=reset_rule, args=(rid,))
+    stats = rules.stats()
+    st.caption(
+        f"{stats['rules']} rules evaluated on every sample · last batch "
+        f"{stats['last_latency_ms']:.3f} ms · mean {stats['mean_latency_ms']:.3f} ms"
+    )
 
     st.subheader("🛑 Demo Interlock Trigger")
     if st.button("Trigger Demo Interlock"):
@@ -147,57 +265,51 @@ with tabs[0]:
 # -------------------------------
 # SUBSYSTEM TABS
 # -------------------------------
-for i, category in enumerate(tbm_data.keys()):
-    with tabs[i + 1]:
+for i, category in enumerate(catalog.categories):
+    with tabs[i + 1], perf.section(f"tab.{category}"):
         st.header(category)
 
-        for item in tbm_data[category]:
-            label = item["Label"].replace("Screw Jack", "Screw Jack Motor")
-            explanation = item["Explanation"]
-            model = item["Model"]
-            qty = item["Quantity"]
-
-            if label not in st.session_state.device_states:
-                st.session_state.device_states[label] = {"on": False, "current": 0.0, "speed": 0, "torque": 0}
-
-            state = st.session_state.device_states[label]
+        for dev in catalog.by_category[category]:
+            key, label = dev.label, dev.name
 
             st.subheader(label)
-            st.write(explanation)
-            st.write(f"Model: `{model}` | Qty: {qty}")
+            st.write(dev.explanation)
+            st.write(f"Model: `{dev.model}` | Qty: {dev.quantity}")
+
+            state = device_states.get(key)
+            if state is None:
+                st.caption("Added to the catalog after start-up; restart the server to sample it.")
+                continue
 
             col1, col2 = st.columns(2)
             if col1.button(f"ON {label}", key=f"on_{label}"):
                 state["on"] = True
+                engine.command(key, on=True)
             if col2.button(f"OFF {label}", key=f"off_{label}"):
                 state["on"] = False
+                engine.command(key, on=False)
 
             if state["on"]:
-                new_current = st.slider(f"Set Current (A) - {label}", 0.0, 10.0, state["current"], 0.1, key=f"slider_{label}")
-                state["current"] = new_current
+                # Widget mirrors the shared setpoint; edits go through the callback
+                st.session_state[f"slider_{label}"] = float(state["current"])
+                st.slider(f"Set Current (A) - {label}", 0.0, 10.0, step=0.1, key=f"slider_{label}",
+                          on_change=set_current, args=(key, label))
 
-                if label in HAS_SPEED_TORQUE:
-                    state["torque"] = round(new_current * 800, 1)
-                    state["speed"] = round(new_current * 600, 1)
-                else:
-                    state["torque"] = 0
-                    state["speed"] = 0
-
-                now = datetime.datetime.now().strftime("%H:%M:%S")
-                if label not in st.session_state.current_log[category]:
-                    st.session_state.current_log[category][label] = {"time": [], "values": []}
-                st.session_state.current_log[category][label]["time"].append(now)
-                st.session_state.current_log[category][label]["values"].append(new_current)
-
-                df = pd.DataFrame({
-                    "Time": st.session_state.current_log[category][label]["time"][-60:],
-                    "Current (A)": st.session_state.current_log[category][label]["values"][-60:]
-                })
-                st.line_chart(df.set_index("Time"))
-
-                if label in HAS_SPEED_TORQUE:
+                window_s = CHART_WINDOWS[st.session_state.get("chart_window", "1 min")]
+                df = engine.read(lambda: power_log.frame(
+                    window_s, {key: "Current (A)"}, max_points=CHART_MAX_POINTS
+                ))
+                st.line_chart(decimate_frame(df))
+
+                if dev.has_speed_torque:
                     st.write(f"**Current:** {state['current']} A | **Torque:** {state['torque']} Nm | **Speed:** {state['speed']} RPM")
                 else:
                     st.write(f"**Current:** {state['current']} A")
             else:
                 st.write("🔴 OFF")
+
+if show_diagnostics:
+    with tabs[-1]:
+        diagnostics.render()
+
+perf.stop("rerun", rerun_t0)
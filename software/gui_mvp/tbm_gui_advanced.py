@@ -1,11 +1,24 @@
-import json
-import random
 import datetime
-from pathlib import Path
+import logging
+import os
+from typing import List
 
+import numpy as np
 import pandas as pd
 import streamlit as st
-from streamlit_autorefresh import st_autorefresh
+
+import diagnostics
+import perf
+from acquisition import AcquisitionEngine, SimulatedSource, load_devices
+from catalog import get_catalog
+from decimate import CHART_POINTS, decimate_frame, minmax_decimate
+from fieldbus import ModbusSource
+from interlock_rules import RuleEvaluator, make_rule
+from interlocks import InterlockRegistry
+from journal import JournalRun, JournalWriter, device_channels, device_values, list_runs, open_run
+from simulator import BatchSource
+from state_hub import SYSTEM_MODES, MachineHub
+from telemetry import TelemetryStore
 
 # ------------------------------------------------------------
 # Page setup
@@ -14,16 +27,13 @@ st.set_page_config(
     page_title="TBM Control & Safety Dashboard",
     layout="wide",
 )
-
-# Auto-refresh every 1 second (1000 ms)
-st_autorefresh(interval=1000, key="tbm_refresh")
+rerun_t0 = perf.start()
 
 # ------------------------------------------------------------
-# Load TBM system data
+# TBM device catalog (parsed once, reloaded when the file changes)
 # ------------------------------------------------------------
-DATA_PATH = Path(__file__).parent / "tbm_systems_power.json"
-with open(DATA_PATH, "r") as f:
-    tbm_data = json.load(f)
+with perf.section("catalog"):
+    catalog = get_catalog()
 
 # ------------------------------------------------------------
 # Define safety interlocks (from safety architecture)
@@ -93,6 +103,9 @@ INTERLOCK_DEFS = [
         "condition": "Drive fault, overcurrent, or overtemp",
         "effect": "Block cutterhead RUN, raise alarm",
         "severity": "High",
+        "channel": "cutterhead_current",
+        "trip": ">14.8 A",
+        "reset": "L+MR",
     },
     {
         "id": "B4",
@@ -102,6 +115,9 @@ INTERLOCK_DEFS = [
         "condition": "Low pressure (dry) or high pressure",
         "effect": "Auto pump control, inhibit cutterhead start",
         "severity": "Medium",
+        "channel": "pressure",
+        "trip": ["<1.1 bar", ">4.9 bar"],
+        "reset": "MR",
     },
     {
         "id": "B5",
@@ -111,6 +127,9 @@ INTERLOCK_DEFS = [
         "condition": "Enclosure temperature above threshold",
         "effect": "Force fans ON; inhibit cutterhead if critical",
         "severity": "Medium",
+        "channel": "enclosure_temp",
+        "trip": ">44.5 °C",
+        "reset": "MR",
     },
     {
         "id": "B6",
@@ -207,124 +226,111 @@ INTERLOCK_DEFS = [
 
 CRITICAL_IDS = {"A1", "A2", "A3", "A4"}
 
-# ------------------------------------------------------------
-# Session state initialisation
-# ------------------------------------------------------------
-if "device_states" not in st.session_state:
-    # Expand json into a richer runtime structure
-    st.session_state.device_states = {}
-    for category, devices in tbm_data.items():
-        st.session_state.device_states[category] = {}
-        for dev in devices:
-            st.session_state.device_states[category][dev["Label"]] = {
-                "on": dev.get("State", "OFF") == "ON",
-                "current": 0.0,
-                "speed": 0.0,
-                "torque": 0.0,
-            }
-
-if "interlock_states" not in st.session_state:
-    # Track active/latching states and last trip times
-    st.session_state.interlock_states = {
-        d["id"]: {
-            "active": False,
-            "latched": False,
-            "last_trip": None,
-        }
-        for d in INTERLOCK_DEFS
-    }
-
-if "system_state" not in st.session_state:
-    st.session_state.system_state = "IDLE"  # IDLE / READY / RUNNING / FAULT
-
-if "system_mode" not in st.session_state:
-    st.session_state.system_mode = "AUTO"  # AUTO / MANUAL
-
-if "log_series" not in st.session_state:
-    st.session_state.log_series = {
-        "time": [],
-        "cutterhead_current": [],
-        "jack_current": [],
-        "pressure": [],
-        "enclosure_temp": [],
-    }
+# Interlocks with a "trip" condition (or a list of them, one rule each) are
+# also evaluated against every telemetry sample; the Trip buttons still
+# simulate field trips for the rest.  Thresholds sit in the top or bottom
+# few percent of SimulatedSource's ranges, so each fires now and then.
+def trip_conditions(interlock: dict) -> List[str]:
+    trip = interlock.get("trip", [])
+    return [trip] if isinstance(trip, str) else list(trip)
+
+
+INTERLOCK_RULES = [
+    make_rule(d["id"] if len(conds) == 1 else f"{d['id']}.{n}", d["channel"], cond, d["reset"],
+              interlock=d["id"])
+    for d in INTERLOCK_DEFS
+    for conds in [trip_conditions(d)]
+    for n, cond in enumerate(conds, 1)
+]
 
 # ------------------------------------------------------------
-# Helper functions
+# Shared machine model (one per server process, shared by all sessions).
+# Device, interlock and system state live in the hub; st.session_state only
+# holds this viewer's UI preferences and widget values.
 # ------------------------------------------------------------
-def any_critical_interlock_active() -> bool:
-    for iid in CRITICAL_IDS:
-        if st.session_state.interlock_states[iid]["active"]:
-            return True
-    return False
+ACQ_RATE_HZ = 1.0
 
+# Data source: "sim" (in-process simulation), "batch" (correlated NumPy
+# simulator from simulator.py) or "modbus" (PLC / IO-Link over Modbus TCP;
+# run sim_plc.py for a local stand-in).
+DATA_SOURCE = os.environ.get("TBM_DATA_SOURCE", "sim")
+MODBUS_HOST = os.environ.get("TBM_MODBUS_HOST", "127.0.0.1")
+MODBUS_PORT = int(os.environ.get("TBM_MODBUS_PORT", "5020"))
 
-def compute_safety_ok() -> bool:
-    # In real system this is from the safety PLC.
-    return not any_critical_interlock_active()
+# Live regions (status bar, snapshot, charts) are fragments that rerun at the
+# telemetry rate. Everything else renders only on a full rerun, which happens
+# on interaction or when the hub's config_version changes.
+LIVE_REFRESH_S = 1.0 / ACQ_RATE_HZ
 
+# Telemetry history: 4 h at 1 Hz, fixed memory for the whole process
+LOG_CHANNELS = ["cutterhead_current", "jack_current", "pressure", "enclosure_temp"]
+LOG_CAPACITY = 4 * 3600
+TREND_POINTS = 3600            # last hour, decimated to CHART_POINTS before charting
 
-def update_system_state():
-    safety_ok = compute_safety_ok()
-    old_state = st.session_state.system_state
 
-    if not safety_ok:
-        st.session_state.system_state = "FAULT"
-    else:
-        # Simple heuristic: RUNNING if cutterhead ON, else READY if safe
-        cutter_on = st.session_state.device_states["Cutter Head & Drive"]["Cutter Head Motor"]["on"]
-        if cutter_on:
-            st.session_state.system_state = "RUNNING"
-        else:
-            st.session_state.system_state = "READY"
-
-    if old_state != st.session_state.system_state:
-        st.session_state["state_changed_at"] = datetime.datetime.now()
+@st.cache_resource
+def get_log_series() -> TelemetryStore:
+    return TelemetryStore(LOG_CHANNELS, capacity=LOG_CAPACITY)
 
 
-def simulate_signals():
-    """
-    Simple simulation: if a device is ON, give it a random-ish current.
-    Also simulate one process pressure and enclosure temp.
-    """
-    now = datetime.datetime.now()
+@st.cache_resource
+def get_hub() -> MachineHub:
+    log_series = get_log_series()
 
-    # Cutterhead and jack currents
-    ch_state = st.session_state.device_states["Cutter Head & Drive"]["Cutter Head Motor"]
-    jack_state = st.session_state.device_states["Cutter Head & Drive"]["Screw Jack"]
+    def log_sample(t: float, values: dict):
+        log_series.append(np.datetime64(datetime.datetime.fromtimestamp(t), "ns"), values)
 
-    if ch_state["on"]:
-        ch_state["current"] = round(random.uniform(8.0, 15.0), 2)
-        ch_state["speed"] = round(random.uniform(300.0, 600.0), 1)
-        ch_state["torque"] = round(random.uniform(150.0, 400.0), 1)
-    else:
-        ch_state["current"] = 0.0
-        ch_state["speed"] = 0.0
-        ch_state["torque"] = 0.0
-
-    if jack_state["on"]:
-        jack_state["current"] = round(random.uniform(3.0, 6.0), 2)
-        jack_state["speed"] = round(random.uniform(5.0, 15.0), 1)
-        jack_state["torque"] = round(random.uniform(50.0, 200.0), 1)
+    devices = load_devices()
+    if DATA_SOURCE == "modbus":
+        source = ModbusSource(devices, host=MODBUS_HOST, port=MODBUS_PORT)
+    elif DATA_SOURCE == "batch":
+        source = BatchSource(rate_hz=ACQ_RATE_HZ)
     else:
-        jack_state["current"] = 0.0
-        jack_state["speed"] = 0.0
-        jack_state["torque"] = 0.0
+        source = SimulatedSource()
+    # Everything sampled is also journaled to disk for post-run review.
+    journal = JournalWriter(LOG_CHANNELS + device_channels(devices), name="advanced")
+
+    registry = InterlockRegistry(INTERLOCK_DEFS, CRITICAL_IDS)
+    registry.subscribe(
+        lambda e: logging.getLogger("tbm.interlocks").info(
+            "%s %s (active=%s latched=%s)", e.id, e.kind, e.active, e.latched
+        )
+    )
+    registry.subscribe(lambda e: journal.log_event(e.at.timestamp(), kind=e.kind, id=e.id))
 
-    # Process pressure & temp (pretend IO-Link PT/CTH)
-    pressure = round(random.uniform(1.0, 5.0), 2)  # bar
-    enclosure_temp = round(random.uniform(25.0, 45.0), 1)  # °C
+    def journal_sample(t: float, values: dict):
+        journal.append(t, {**values, **device_values(engine.devices)})
 
-    st.session_state.log_series["time"].append(now)
-    st.session_state.log_series["cutterhead_current"].append(ch_state["current"])
-    st.session_state.log_series["jack_current"].append(jack_state["current"])
-    st.session_state.log_series["pressure"].append(pressure)
-    st.session_state.log_series["enclosure_temp"].append(enclosure_temp)
+    engine = AcquisitionEngine([source], rate_hz=ACQ_RATE_HZ, devices=devices,
+                               sinks=[log_sample, journal_sample])
+    hub = MachineHub(engine, registry, rules=RuleEvaluator(INTERLOCK_RULES))
+    diagnostics.register_engine(engine, journal)
+    engine.sample()  # first sample before the first render
+    engine.start()
+    return hub
 
-    # Trim log to last N points
-    max_points = 300
-    for key in st.session_state.log_series:
-        st.session_state.log_series[key] = st.session_state.log_series[key][-max_points:]
+
+hub = get_hub()
+registry = hub.registry
+log_series = get_log_series()
+
+# ------------------------------------------------------------
+# Helper functions
+# ------------------------------------------------------------
+def trend_frame(n: int, columns: dict):
+    """Chart frame built once per hub version and shared by every viewer."""
+    key = f"trend:{n}:{','.join(columns)}"
+    return hub.memo(key, lambda: decimate_frame(log_series.to_frame(n, columns=columns, copy=True)))
+
+
+def reset_interlock(iid: str):
+    """Reset button callback: tell the operator when the hub refuses."""
+    if hub.reset(iid):
+        return
+    if hub.condition_present(iid):
+        st.toast(f"Reset {iid} refused: trip condition still present.", icon="⚠️")
+    else:
+        st.toast(f"{iid} is not tripped or latched; nothing to reset.", icon="ℹ️")
 
 
 def status_badge(text: str, level: str):
@@ -341,69 +347,143 @@ def status_badge(text: str, level: str):
 # ------------------------------------------------------------
 st.title("TBM Control, Power & Safety Dashboard")
 
-# Simulate signals for this refresh tick
-simulate_signals()
-update_system_state()
+# Snapshot for the static regions of this full rerun; live fragments take
+# their own fresh snapshot on every tick.
+with perf.section("hub.snapshot"):
+    snap = hub.snapshot()
+device_states = snap.devices
+st.session_state.rendered_config_version = snap.config_version
+
+cutter_on = device_states["Cutter Head Motor"]["on"]
+jack_on = device_states["Screw Jack"]["on"]
 
-safety_ok = compute_safety_ok()
-cutter_on = st.session_state.device_states["Cutter Head & Drive"]["Cutter Head Motor"]["on"]
-jack_on = st.session_state.device_states["Cutter Head & Drive"]["Screw Jack"]["on"]
 
 # ------- Top status bar ------------------------------------------------------
-top_col1, top_col2, top_col3, top_col4 = st.columns(4)
+@st.fragment(run_every=LIVE_REFRESH_S)
+@perf.timed("render.status_bar")
+def live_status_bar():
+    snap = hub.snapshot()
 
-with top_col1:
-    st.metric("System State", st.session_state.system_state)
-    st.caption("IDLE / READY / RUNNING / FAULT")
+    # Static regions are stale once commands or interlocks change (from this
+    # or another viewer): invalidate them with one full rerun.
+    if snap.config_version != st.session_state.get("rendered_config_version"):
+        st.rerun(scope="app")
 
-with top_col2:
-    if safety_ok:
-        status_badge("Safety OK", "ok")
-    else:
-        status_badge("SAFETY NOT OK", "bad")
-    st.caption("Derived from Safety PLC interlocks")
+    top_col1, top_col2, top_col3, top_col4 = st.columns(4)
 
-with top_col3:
-    status_badge(f"Mode: {st.session_state.system_mode}", "ok")
-    st.caption("AUTO selects interlocks and sequences automatically")
+    with top_col1:
+        st.metric("System State", snap.system_state)
+        st.caption("IDLE / READY / RUNNING / FAULT")
+
+    with top_col2:
+        if snap.safety_ok:
+            status_badge("Safety OK", "ok")
+        else:
+            status_badge("SAFETY NOT OK", "bad")
+        st.caption("Derived from Safety PLC interlocks")
+
+    with top_col3:
+        status_badge(f"Mode: {snap.system_mode}", "ok")
+        st.caption("AUTO selects interlocks and sequences automatically")
+
+    with top_col4:
+        ch_curr = snap.values.get("cutterhead_current", 0)
+        st.metric("Cutterhead Current (A)", ch_curr)
+        if DATA_SOURCE == "modbus":
+            source = hub.engine.sources[0]
+            if source.last_error:
+                st.caption(f"⚠️ Modbus {MODBUS_HOST}:{MODBUS_PORT}: {source.last_error}")
+            else:
+                st.caption(f"Modbus TCP {MODBUS_HOST}:{MODBUS_PORT}")
+        else:
+            st.caption("Simulated from SEW RF127R77 motor")
 
-with top_col4:
-    ch_curr = st.session_state.log_series["cutterhead_current"][-1] if st.session_state.log_series["cutterhead_current"] else 0
-    st.metric("Cutterhead Current (A)", ch_curr)
-    st.caption("Simulated from SEW RF127R77 motor")
+
+live_status_bar()
 
 # ------- Main content tabs ---------------------------------------------------
-tab_overview, tab_interlocks, tab_systems, tab_trends = st.tabs(
+show_diagnostics = diagnostics.visible()
+tab_overview, tab_interlocks, tab_systems, tab_trends, *tab_diagnostics = st.tabs(
     ["Overview", "Interlocks & Safety", "Systems & Power", "Trends & Telemetry"]
+    + (["Diagnostics"] if show_diagnostics else [])
 )
 
 # ------------------------------------------------------------
 # Tab 1: Overview (high-level control & status)
 # ------------------------------------------------------------
-with tab_overview:
+@st.fragment(run_every=LIVE_REFRESH_S)
+@perf.timed("render.system_snapshot")
+def live_system_snapshot():
+    snap = hub.snapshot()
+    ch = snap.devices["Cutter Head Motor"]
+    jk = snap.devices["Screw Jack"]
+
+    st.markdown("#### Cutterhead & Jack")
+    cc1, cc2, cc3 = st.columns(3)
+    with cc1:
+        status_badge(
+            f"Cutterhead: {'ON' if ch['on'] else 'OFF'}",
+            "ok" if ch["on"] else "bad",
+        )
+        st.write(f"Current: {ch['current']} A")
+    with cc2:
+        st.write(f"Speed: {ch['speed']} RPM")
+        st.write(f"Torque: {ch['torque']} Nm")
+    with cc3:
+        status_badge(
+            f"Screw Jack: {'ON' if jk['on'] else 'OFF'}",
+            "ok" if jk["on"] else "bad",
+        )
+        st.write(f"Current: {jk['current']} A")
+
+    st.markdown("#### Process Pressures & Enclosure Climate (Simulated)")
+    df_proc = trend_frame(
+        60,
+        {
+            "pressure": "Pressure (bar)",
+            "enclosure_temp": "Enclosure Temp (°C)",
+        },
+    )
+    st.line_chart(df_proc)
+
+
+with tab_overview, perf.section("tab.overview"):
     c1, c2 = st.columns([2, 3])
 
     with c1:
         st.subheader("High-level Controls (Simulated)")
         st.write("These would normally be bound to PLC tags rather than local state.")
 
+        # Widgets mirror the shared machine state; changes go to the hub
+        # through callbacks so every viewer sees the same commands.
+        st.session_state.system_mode = snap.system_mode
+        st.session_state.cmd_cutterhead_run = cutter_on
+        st.session_state.cmd_jack_run = jack_on
+
         # System mode
         st.radio(
             "Control Mode",
-            ["AUTO", "MANUAL"],
+            list(SYSTEM_MODES),
             key="system_mode",
             horizontal=True,
+            on_change=lambda: hub.set_mode(st.session_state.system_mode),
         )
 
         # Cutterhead control
         st.markdown("### Cutterhead")
-        ch_toggle = st.toggle("Cutterhead RUN command", value=cutter_on, key="cmd_cutterhead_run")
-        st.session_state.device_states["Cutter Head & Drive"]["Cutter Head Motor"]["on"] = ch_toggle
+        st.toggle(
+            "Cutterhead RUN command",
+            key="cmd_cutterhead_run",
+            on_change=lambda: hub.command("Cutter Head Motor", on=st.session_state.cmd_cutterhead_run),
+        )
 
         # Screw jack control
         st.markdown("### Screw Jack")
-        jack_toggle = st.toggle("Jack ENABLE command", value=jack_on, key="cmd_jack_run")
-        st.session_state.device_states["Cutter Head & Drive"]["Screw Jack"]["on"] = jack_toggle
+        st.toggle(
+            "Jack ENABLE command",
+            key="cmd_jack_run",
+            on_change=lambda: hub.command("Screw Jack", on=st.session_state.cmd_jack_run),
+        )
 
         st.divider()
         st.markdown("### Process Pumps & Cooling (Simulated)")
@@ -418,43 +498,13 @@ with tab_overview:
 
     with c2:
         st.subheader("System Snapshot")
-
-        ch = st.session_state.device_states["Cutter Head & Drive"]["Cutter Head Motor"]
-        jk = st.session_state.device_states["Cutter Head & Drive"]["Screw Jack"]
-
-        st.markdown("#### Cutterhead & Jack")
-        cc1, cc2, cc3 = st.columns(3)
-        with cc1:
-            status_badge(
-                f"Cutterhead: {'ON' if ch['on'] else 'OFF'}",
-                "ok" if ch["on"] else "bad",
-            )
-            st.write(f"Current: {ch['current']} A")
-        with cc2:
-            st.write(f"Speed: {ch['speed']} RPM")
-            st.write(f"Torque: {ch['torque']} Nm")
-        with cc3:
-            status_badge(
-                f"Screw Jack: {'ON' if jk['on'] else 'OFF'}",
-                "ok" if jk["on"] else "bad",
-            )
-            st.write(f"Current: {jk['current']} A")
-
-        st.markdown("#### Process Pressures & Enclosure Climate (Simulated)")
-        df_proc = pd.DataFrame(
-            {
-                "time": st.session_state.log_series["time"][-60:],
-                "Pressure (bar)": st.session_state.log_series["pressure"][-60:],
-                "Enclosure Temp (°C)": st.session_state.log_series["enclosure_temp"][-60:],
-            }
-        ).set_index("time")
-        st.line_chart(df_proc)
+        live_system_snapshot()
 
 
 # ------------------------------------------------------------
-# Tab 2: Interlocks & Safety
+# Tab 2: Interlocks & Safety (static; re-rendered only when config_version changes)
 # ------------------------------------------------------------
-with tab_interlocks:
+with tab_interlocks, perf.section("tab.interlocks"):
     st.subheader("Safety Interlocks & Trip Simulation")
     st.write(
         "This table reflects the Safety PLC, Main PLC, and Electrical interlocks that gate motion. "
@@ -463,19 +513,19 @@ with tab_interlocks:
     )
 
     # Filter by category
-    interlock_category_filter = st.multiselect(
+    interlock_category_filter = set(st.multiselect(
         "Filter by category",
-        options=sorted(set(d["category"] for d in INTERLOCK_DEFS)),
-        default=sorted(set(d["category"] for d in INTERLOCK_DEFS)),
-    )
+        options=registry.categories,
+        default=registry.categories,
+    ))
 
     # Render table row-by-row with controls
-    for interlock in INTERLOCK_DEFS:
+    for iid in registry.ids:
+        interlock = registry.defs[iid]
         if interlock["category"] not in interlock_category_filter:
             continue
 
-        iid = interlock["id"]
-        state = st.session_state.interlock_states[iid]
+        state = snap.interlocks[iid]
 
         with st.container(border=True):
             top_row = st.columns([1, 2, 2, 2, 2])
@@ -501,6 +551,9 @@ with tab_interlocks:
             with top_row[3]:
                 st.markdown("**Trip condition**")
                 st.write(interlock["condition"])
+                if "trip" in interlock:
+                    st.caption(f"Auto-trip: `{interlock['channel']}` {' or '.join(trip_conditions(interlock))} "
+                               f"({interlock['reset']})")
 
             with top_row[4]:
                 st.markdown("**Effect**")
@@ -508,16 +561,10 @@ with tab_interlocks:
 
             bcol1, bcol2, bcol3 = st.columns([1, 1, 2])
             with bcol1:
-                if st.button(f"Trip {iid}", key=f"trip_{iid}"):
-                    state["active"] = True
-                    state["latched"] = True
-                    state["last_trip"] = datetime.datetime.now()
+                st.button(f"Trip {iid}", key=f"trip_{iid}", on_click=hub.trip, args=(iid,))
 
             with bcol2:
-                if st.button(f"Reset {iid}", key=f"reset_{iid}"):
-                    # In real safety, reset usually only allowed if condition cleared
-                    state["active"] = False
-                    state["latched"] = False
+                st.button(f"Reset {iid}", key=f"reset_{iid}", on_click=reset_interlock, args=(iid,))
 
             with bcol3:
                 if state["last_trip"] is not None:
@@ -527,24 +574,76 @@ with tab_interlocks:
 
     st.divider()
     st.markdown("### Derived Safety Bits (Simulated)")
+    counts = snap.interlock_counts
     col_s1, col_s2, col_s3 = st.columns(3)
     with col_s1:
-        status_badge(f"SAFETY_OK = {compute_safety_ok()}", "ok" if compute_safety_ok() else "bad")
+        status_badge(f"SAFETY_OK = {snap.safety_ok}", "ok" if snap.safety_ok else "bad")
+        highest = counts["highest_active_severity"]
+        st.caption(f"Highest active severity: {highest or '—'}")
     with col_s2:
-        estop_latched = st.session_state.interlock_states["A1"]["latched"]
+        estop_latched = snap.interlocks["A1"]["latched"]
         status_badge(f"ESTOP_LATCHED = {estop_latched}", "bad" if estop_latched else "ok")
+        st.caption(f"Active: {counts['active']} · Latched: {counts['latched']}")
     with col_s3:
         st.write("These bits would normally be read from the Safety PLC and exposed to the main PLC & HMI.")
 
+    st.dataframe(
+        [
+            {
+                "Category": category,
+                "Active": counts["active_by_category"].get(category, 0),
+                "Latched": counts["latched_by_category"].get(category, 0),
+            }
+            for category in registry.categories
+        ],
+        hide_index=True,
+    )
+
+    st.markdown("### Recent Interlock Events")
+    events = snap.recent_events
+    if events:
+        st.dataframe(
+            [
+                {"Time": e.at.strftime("%H:%M:%S"), "ID": e.id, "Event": e.kind,
+                 "Active": e.active, "Latched": e.latched}
+                for e in events
+            ],
+            hide_index=True,
+        )
+    else:
+        st.caption("No interlock transitions yet.")
+
 
 # ------------------------------------------------------------
 # Tab 3: Systems & Power (device cards from JSON)
 # ------------------------------------------------------------
-with tab_systems:
+@st.fragment(run_every=LIVE_REFRESH_S)
+@perf.timed("render.device_readings")
+def live_device_readings():
+    devices = hub.snapshot().devices
+    on = np.flatnonzero(devices.on)
+    if len(on):
+        st.dataframe(pd.DataFrame({
+            "Device": [devices.labels[i] for i in on],
+            "Category": [devices.categories[i] for i in on],
+            "Current (A)": devices.current[on],
+            "Speed (RPM)": devices.speed[on],
+            "Torque (Nm)": devices.torque[on],
+        }), hide_index=True, use_container_width=True)
+        st.caption(f"Total current: {devices.total_current():.2f} A")
+    else:
+        st.caption("No devices running.")
+
+
+with tab_systems, perf.section("tab.systems"):
     st.subheader("Systems, Power, and Devices")
     st.write("Pulled directly from `tbm_systems_power.json` and combined with simulated runtime state.")
 
-    for category, devices in tbm_data.items():
+    st.markdown("#### Live readings")
+    live_device_readings()
+
+    # Spec cards are static: they change only with the catalog or ON/OFF commands
+    for category, devices in catalog.by_category.items():
         st.markdown(f"### {category}")
         cols = st.columns(3)
         idx = 0
@@ -552,20 +651,18 @@ with tab_systems:
             col = cols[idx % 3]
             idx += 1
 
-            label = dev["Label"]
-            runtime = st.session_state.device_states.get(category, {}).get(label, None)
+            runtime = device_states.get(dev.label)
 
             with col:
                 with st.container(border=True):
-                    st.markdown(f"**{label}**")
-                    st.caption(dev["Explanation"])
-                    st.write(f"Model: `{dev['Model']}`")
-                    st.write(f"Quantity: {dev['Quantity']}")
+                    st.markdown(f"**{dev.label}**")
+                    st.caption(dev.explanation)
+                    st.write(f"Model: `{dev.model}`")
+                    st.write(f"Quantity: {dev.quantity}")
 
                     if runtime is not None:
                         on = runtime["on"]
                         status_badge("ON" if on else "OFF", "ok" if on else "bad")
-                        st.write(f"Current: {runtime['current']} A")
                     else:
                         status_badge("MONITORED ONLY", "warn")
 
@@ -573,25 +670,147 @@ with tab_systems:
 # ------------------------------------------------------------
 # Tab 4: Trends & Telemetry
 # ------------------------------------------------------------
-with tab_trends:
-    st.subheader("Live Telemetry & Trends (Simulated)")
-
-    if len(st.session_state.log_series["time"]) > 1:
-        df_trend = pd.DataFrame(
+@st.fragment(run_every=LIVE_REFRESH_S)
+@perf.timed("render.trends")
+def live_trends():
+    if len(log_series) > 1:
+        df_trend = trend_frame(
+            TREND_POINTS,
             {
-                "time": st.session_state.log_series["time"],
-                "Cutterhead Current (A)": st.session_state.log_series["cutterhead_current"],
-                "Jack Current (A)": st.session_state.log_series["jack_current"],
-                "Pressure (bar)": st.session_state.log_series["pressure"],
-                "Enclosure Temp (°C)": st.session_state.log_series["enclosure_temp"],
-            }
-        ).set_index("time")
+                "cutterhead_current": "Cutterhead Current (A)",
+                "jack_current": "Jack Current (A)",
+                "pressure": "Pressure (bar)",
+                "enclosure_temp": "Enclosure Temp (°C)",
+            },
+        )
 
         st.line_chart(df_trend)
     else:
         st.info("Waiting for telemetry samples…")
 
+
+# Replay: recorded runs from the telemetry journal. Only the visible window
+# is read (zero-copy from the memory-mapped columns) and min/max decimated
+# to about the chart's pixel width, so long runs stay interactive.
+REPLAY_BUCKETS = CHART_POINTS // 2     # 2 points per bucket ≈ chart width in px
+REPLAY_WINDOWS = {"1 min": 60, "10 min": 600, "1 h": 3600, "4 h": 4 * 3600, "Full run": None}
+CHANNEL_LABELS = {
+    "cutterhead_current": "Cutterhead Current (A)",
+    "jack_current": "Jack Current (A)",
+    "pressure": "Pressure (bar)",
+    "enclosure_temp": "Enclosure Temp (°C)",
+}
+
+
+@st.cache_resource
+def get_replay_run(run_id: str) -> JournalRun:
+    return open_run(run_id)
+
+
+def seek_to_trip():
+    """Jump-to-trip callback: centre the replay window on the selected trip."""
+    t = st.session_state.get("replay_trip")
+    if t is not None:
+        st.session_state.replay_center = datetime.datetime.fromtimestamp(t)
+        if REPLAY_WINDOWS[st.session_state.replay_zoom] is None:
+            st.session_state.replay_zoom = "10 min"
+
+
+def render_replay():
+    runs = list_runs()
+    if not runs:
+        st.info("No recorded runs yet.")
+        return
+    run_id = st.selectbox("Recorded run", runs, key="replay_run")
+    run = get_replay_run(run_id)
+    run.refresh()   # the current run is still growing
+    if len(run) < 2:
+        st.info("This run has no samples yet.")
+        return
+
+    start, end = run.start, run.end
+    trips = [e for e in run.events() if e.get("kind") == "trip" and start <= e["t"] <= end]
+
+    c1, c2 = st.columns([1, 2])
+    with c1:
+        st.session_state.setdefault("replay_zoom", "10 min")
+        zoom = st.select_slider("Window", options=list(REPLAY_WINDOWS), key="replay_zoom")
+    with c2:
+        st.selectbox(
+            "Jump to interlock trip",
+            [None] + [e["t"] for e in trips],
+            format_func=lambda t: "—" if t is None else next(
+                f"{datetime.datetime.fromtimestamp(t):%H:%M:%S} · {e['id']}" for e in trips if e["t"] == t
+            ),
+            key="replay_trip",
+            on_change=seek_to_trip,
+        )
+    channels = st.multiselect(
+        "Channels",
+        run.channels,
+        default=[c for c in CHANNEL_LABELS if c in run.channels],
+        format_func=lambda c: CHANNEL_LABELS.get(c, c),
+        key="replay_channels",
+    )
+
+    width = REPLAY_WINDOWS[zoom]
+    t_min = datetime.datetime.fromtimestamp(start)
+    t_max = datetime.datetime.fromtimestamp(end)
+    if width is None or width >= end - start:
+        t0, t1 = start, end
+    else:
+        center = st.session_state.get("replay_center", t_max)
+        st.session_state.replay_center = min(max(center, t_min), t_max)
+        center = st.slider(
+            "Position",
+            min_value=t_min,
+            max_value=t_max,
+            step=datetime.timedelta(seconds=1),
+            format="HH:mm:ss",
+            key="replay_center",
+        ).timestamp()
+        t0 = min(max(center - width / 2, start), end - width)
+        t1 = t0 + width
+
+    if not channels:
+        st.info("Select at least one channel.")
+        return
+    times, cols = run.window(t0, t1, channels)
+    t_dec, cols_dec = minmax_decimate(times, cols, REPLAY_BUCKETS)
+    local_tz = datetime.datetime.now().astimezone().tzinfo
+    index = pd.to_datetime(t_dec, unit="s", utc=True).tz_convert(local_tz).tz_localize(None)
+    st.line_chart(pd.DataFrame(
+        {CHANNEL_LABELS.get(c, c): v for c, v in cols_dec.items()},
+        index=pd.Index(index, name="Time"),
+    ))
+
+    in_view = [e for e in trips if t0 <= e["t"] <= t1]
+    st.caption(
+        f"{len(times):,} samples in view, drawn as {len(t_dec):,} points · "
+        f"run {t_min:%Y-%m-%d %H:%M:%S} → {t_max:%H:%M:%S}"
+        + (" · trips in view: " + ", ".join(e["id"] for e in in_view) if in_view else "")
+    )
+
+
+with tab_trends, perf.section("tab.trends"):
+    st.subheader("Live Telemetry & Trends (Simulated)")
+
+    trend_mode = st.radio("View", ["Live", "Replay"], horizontal=True, key="trend_mode")
+    if trend_mode == "Live":
+        live_trends()
+    else:
+        render_replay()
+
     st.caption(
         "In a real deployment, these series would be driven by PLC tags and IO-Link data "
         "instead of random simulation."
     )
+
+# ------------------------------------------------------------
+# Tab 5: Diagnostics (hidden unless TBM_PERF=1 or ?diagnostics=1)
+# ------------------------------------------------------------
+if show_diagnostics:
+    with tab_diagnostics[0]:
+        diagnostics.render()
+
+perf.stop("rerun", rerun_t0)
@@ -0,0 +1,133 @@
+"""
+Fixed-capacity telemetry store backed by preallocated NumPy arrays.
+
+Each channel is one float64 block and the time column is one datetime64 block.
+Every sample is written twice (at ``i`` and ``i + capacity``) so that the most
+recent ``n <= capacity`` samples are always one contiguous slice.  That makes
+``append`` O(1) and ``last(n)`` a zero-copy view, regardless of how much
+history is kept.
+"""
+from typing import Dict, Iterable, Mapping, Optional
+
+import numpy as np
+import pandas as pd
+
+
+class TelemetryStore:
+    def __init__(self, channels: Iterable[str], capacity: int,
+                 time_dtype: str = "datetime64[ns]"):
+        if capacity <= 0:
+            raise ValueError("capacity must be positive")
+        self.channels = tuple(channels)
+        self.capacity = int(capacity)
+        self._time = np.zeros(2 * self.capacity, dtype=time_dtype)
+        self._data = {
+            name: np.zeros(2 * self.capacity, dtype=np.float64)
+            for name in self.channels
+        }
+        self._head = 0      # next write slot in [0, capacity)
+        self._count = 0     # number of valid samples (<= capacity)
+        self._total = 0     # samples appended since creation or the last clear()
+
+    # --------------------------------------------------------
+    # Writing
+    # --------------------------------------------------------
+    def append(self, t, values: Mapping[str, float]):
+        """Append one sample. Channels missing from ``values`` are stored as NaN."""
+        i = self._head
+        j = i + self.capacity
+        self._time[i] = self._time[j] = t
+        for name, arr in self._data.items():
+            v = values.get(name, np.nan)
+            arr[i] = arr[j] = v
+        self._advance(1)
+
+    def extend(self, times, values: Mapping[str, np.ndarray]):
+        """Append a block of samples (vectorised; used by batch sources)."""
+        times = np.asarray(times, dtype=self._time.dtype)
+        n = len(times)
+        if n == 0:
+            return
+        if n > self.capacity:
+            # Only the newest `capacity` samples can survive anyway.
+            skip = n - self.capacity
+            self._advance(skip)
+            times = times[skip:]
+            values = {k: np.asarray(v)[skip:] for k, v in values.items()}
+            n = self.capacity
+
+        idx = (self._head + np.arange(n)) % self.capacity
+        self._time[idx] = times
+        self._time[idx + self.capacity] = times
+        for name, arr in self._data.items():
+            col = values.get(name)
+            col = np.full(n, np.nan) if col is None else np.asarray(col, dtype=np.float64)
+            arr[idx] = col
+            arr[idx + self.capacity] = col
+        self._advance(n)
+
+    def _advance(self, n: int):
+        self._head = (self._head + n) % self.capacity
+        self._count = min(self._count + n, self.capacity)
+        self._total += n
+
+    def clear(self):
+        self._head = 0
+        self._count = 0
+        self._total = 0
+
+    # --------------------------------------------------------
+    # Reading
+    # --------------------------------------------------------
+    def __len__(self) -> int:
+        return self._count
+
+    @property
+    def total_appended(self) -> int:
+        return self._total
+
+    def _window(self, n: Optional[int]) -> slice:
+        n = self._count if n is None else max(0, min(int(n), self._count))
+        end = self._head + self.capacity
+        return slice(end - n, end)
+
+    def times(self, n: Optional[int] = None) -> np.ndarray:
+        """Read-only view of the last ``n`` timestamps (all if ``n`` is None)."""
+        view = self._time[self._window(n)]
+        view.flags.writeable = False
+        return view
+
+    def last(self, n: Optional[int] = None) -> Dict[str, np.ndarray]:
+        """Read-only views of the last ``n`` samples of every channel."""
+        window = self._window(n)
+        out = {}
+        for name, arr in self._data.items():
+            view = arr[window]
+            view.flags.writeable = False
+            out[name] = view
+        return out
+
+    def latest(self, name: str, default: float = 0.0) -> float:
+        if self._count == 0:
+            return default
+        return float(self._data[name][self._head + self.capacity - 1])
+
+    def to_frame(self, n: Optional[int] = None, columns: Optional[Mapping[str, str]] = None,
+                 copy: bool = False) -> pd.DataFrame:
+        """
+        DataFrame of the last ``n`` samples indexed by time.
+        ``columns`` optionally maps channel names to display names (and selects them).
+        Pass ``copy=True`` when the store may be written while the frame is in use.
+        """
+        data = self.last(n)
+        if columns is not None:
+            data = {label: data[name] for name, label in columns.items()}
+        return pd.DataFrame(data, index=pd.Index(self.times(n), name="time", copy=copy), copy=copy)
+
+    def to_arrow(self, n: Optional[int] = None):
+        """pyarrow Table of the last ``n`` samples (zero-copy from the views)."""
+        import pyarrow as pa
+
+        cols = {"time": pa.array(self.times(n))}
+        cols.update({name: pa.array(view) for name, view in self.last(n).items()})
+        return pa.table(cols)